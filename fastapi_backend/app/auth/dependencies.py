@@ -6,7 +6,7 @@ from fastapi import Request, Depends, HTTPException, status
 from typing import Optional
 
 from app.models.user_model import User
-from app.utils import jwt_utils
+from app.auth.session_cache import session_cache
 
 async def get_current_user_from_cookie(request: Request) -> User:
     """
@@ -32,7 +32,8 @@ async def get_current_user_from_cookie(request: Request) -> User:
         )
 
     try:
-        payload = jwt_utils.decode_session_jwt(token)
+        # Verified claims and the User document are served from session_cache when possible
+        payload = session_cache.get_claims(token)
         if payload is None: # Should be handled by decode_session_jwt raising exception, but double-check
              raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
@@ -40,8 +41,8 @@ async def get_current_user_from_cookie(request: Request) -> User:
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: Subject missing")
 
-        # Fetch user from database
-        user = await User.find_one(User.user_id == user_id)
+        # Fetch user from the cache, falling back to the database
+        user = await session_cache.get_user(user_id)
         if user is None:
             # This could happen if the user was deleted after the token was issued
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
@@ -0,0 +1,129 @@
+# app/auth/jwks.py
+# Auth0 JWKS key manager: a kid-indexed map of pre-built RSA keys with background refresh,
+# single-flight fetching, rate-limited refetch on unknown kids and stale serving on outages.
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+from jose import jwk
+from jose.backends.base import Key
+
+from app.utils.metrics import time_upstream
+
+
+class JWKSKeyManager:
+    """
+    Holds Auth0 signing keys indexed by `kid`, already constructed as jose Key objects so each
+    verification is a dict lookup plus a signature check.
+
+    - Keys are refreshed `refresh_margin` seconds before `ttl` by a background task (see start()).
+    - Concurrent callers that need a fetch share one in-flight request.
+    - An unknown `kid` triggers a refetch (key rotation), at most once per `min_refetch_interval`.
+    - If Auth0 is unreachable, the last good keys keep being served.
+    """
+
+    def __init__(self, jwks_url: Optional[str], algorithm: str = "RS256", ttl: float = 600.0,
+                 refresh_margin: float = 60.0, min_refetch_interval: float = 30.0, timeout: float = 5.0):
+        self.jwks_url = jwks_url
+        self.algorithm = algorithm
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at: Optional[float] = None # monotonic time of the last successful fetch
+        self._last_attempt: float = float("-inf") # monotonic time of the last fetch attempt
+        self._inflight: Optional[asyncio.Future] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.fetch_count = 0 # Successful + failed fetches, for diagnostics/benchmarks
+
+    # --- Lifecycle ---
+    async def start(self) -> None:
+        """Starts the proactive background refresh loop (call from the app lifespan)."""
+        if self.jwks_url and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            age = self._age()
+            due = 0.0 if age is None else self.ttl - self.refresh_margin - age
+            # After a failed attempt, wait out the refetch interval instead of retrying in a tight loop
+            retry_after = self._last_attempt + self.min_refetch_interval - time.monotonic()
+            await asyncio.sleep(max(due, retry_after, 0.0))
+            try:
+                await self.refresh()
+            except HTTPException:
+                pass # Nothing cached yet and Auth0 is down; retried after the interval
+
+    # --- Lookup ---
+    def _age(self) -> Optional[float]:
+        return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        """Returns the signing key for `kid`, fetching only when the cache is empty, expired or missing it."""
+        age = self._age()
+        if age is None or (age >= self.ttl and self._may_refetch()):
+            await self.refresh()
+        key = self._keys.get(kid)
+        if key is None and self._may_refetch():
+            await self.refresh() # Possibly a rotated key
+            key = self._keys.get(kid)
+        return key
+
+    def _may_refetch(self) -> bool:
+        return time.monotonic() - self._last_attempt >= self.min_refetch_interval
+
+    # --- Fetching ---
+    async def refresh(self) -> None:
+        """Fetches the JWKS, collapsing concurrent calls into a single request."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> None:
+        if not self.jwks_url:
+            raise HTTPException(status_code=500, detail="Auth0 configuration missing, cannot fetch JWKS.")
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        self._last_attempt = time.monotonic()
+        self.fetch_count += 1
+        try:
+            with time_upstream("auth0", "jwks"):
+                response = await self._client.get(self.jwks_url)
+                response.raise_for_status()
+            keys = self._build_keys(response.json())
+        except Exception as e:
+            if self._keys:
+                print(f"Failed to refresh JWKS, serving cached keys: {e}")
+                return
+            print(f"Failed to fetch JWKS: {e}")
+            raise HTTPException(status_code=503, detail="Could not fetch JWKS from authentication provider.")
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _build_keys(self, jwks: Dict[str, Any]) -> Dict[str, Key]:
+        keys = {}
+        for key in jwks.get("keys", []):
+            if "kid" not in key or key.get("kty") != "RSA" or key.get("use", "sig") != "sig":
+                continue
+            keys[key["kid"]] = jwk.construct(
+                {"kty": key["kty"], "kid": key["kid"], "use": key.get("use", "sig"), "n": key["n"], "e": key["e"]},
+                self.algorithm,
+            )
+        return keys
@@ -0,0 +1,89 @@
+# app/auth/plaid_webhook.py
+# Plaid webhook verification: the Plaid-Verification header is an ES256 JWT signed with a key
+# served by /webhook_verification_key/get (cached by kid) and carries the SHA-256 of the body.
+
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi import HTTPException, status
+from jose import jwk, jwt, exceptions as jose_exceptions
+from jose.backends.base import Key
+
+from app.core.config import settings
+from app.services.plaid_service import plaid_service
+from app.utils.singleflight import SingleFlight
+
+ALGORITHM = "ES256"
+MAX_AGE_SECONDS = 5 * 60 # Plaid's recommended bound on iat, so captured webhooks cannot be replayed later
+
+
+class PlaidWebhookVerifier:
+    """
+    Checks a webhook's Plaid-Verification JWT before anything is queued for it.
+
+    - Keys are fetched from Plaid on first use of a kid (concurrent requests share one fetch) and
+      kept for `key_ttl` seconds, so a key Plaid has since expired stops being accepted.
+    - A kid Plaid does not know, or reports as expired, is remembered for `unknown_kid_ttl`
+      seconds: forged headers with made-up kids do not each cost a Plaid call.
+    - The JWT must verify with that key, be at most MAX_AGE_SECONDS old and carry the SHA-256 of
+      the exact request body.
+    """
+
+    def __init__(self, key_ttl: float = 3600.0, unknown_kid_ttl: float = 60.0, maxsize: int = 1000):
+        self._keys: TTLCache = TTLCache(maxsize=maxsize, ttl=key_ttl)
+        self._unknown: TTLCache = TTLCache(maxsize=maxsize, ttl=unknown_kid_ttl)
+        self._fetches = SingleFlight()
+        self.counters = {"verified": 0, "rejected": 0, "key_fetches": 0}
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        key = self._keys.get(kid)
+        if key is None and kid not in self._unknown:
+            key = await self._fetches.do(kid, lambda: self._fetch(kid))
+        return key
+
+    async def _fetch(self, kid: str) -> Optional[Key]:
+        self.counters["key_fetches"] += 1
+        raw = await plaid_service.get_webhook_verification_key(kid) # 503/504 if Plaid is down; Plaid retries
+        if raw is None or raw.get("expired_at"):
+            self._unknown[kid] = True
+            return None
+        key = jwk.construct({name: raw[name] for name in ("kty", "crv", "x", "y") if name in raw}, ALGORITHM)
+        self._keys[kid] = key
+        return key
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.counters["rejected"] += 1
+        print(f"Rejected Plaid webhook: {reason}")
+        return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook verification")
+
+    async def verify(self, token: Optional[str], body: bytes) -> None:
+        """Raises 401 unless `token` is a valid Plaid-Verification JWT for `body`."""
+        if not token:
+            raise self._reject("missing Plaid-Verification header")
+        try:
+            header = jwt.get_unverified_header(token)
+        except jose_exceptions.JWTError as e:
+            raise self._reject(f"malformed header: {e}")
+        if header.get("alg") != ALGORITHM or not header.get("kid"):
+            raise self._reject(f"unexpected alg {header.get('alg')!r} or no kid")
+
+        key = await self.get_key(header["kid"])
+        if key is None:
+            raise self._reject(f"unknown or expired key {header['kid']!r}")
+        try:
+            claims = jwt.decode(token, key, algorithms=[ALGORITHM])
+        except jose_exceptions.JWTError as e:
+            raise self._reject(f"bad signature or claims: {e}")
+
+        if time.time() - claims.get("iat", 0) > MAX_AGE_SECONDS:
+            raise self._reject("issued more than 5 minutes ago")
+        if not hmac.compare_digest(str(claims.get("request_body_sha256", "")), hashlib.sha256(body).hexdigest()):
+            raise self._reject("body does not match request_body_sha256")
+        self.counters["verified"] += 1
+
+
+# Shared instance used by the webhook route
+plaid_webhook_verifier = PlaidWebhookVerifier(key_ttl=settings.PLAID_WEBHOOK_KEY_CACHE_SECONDS)
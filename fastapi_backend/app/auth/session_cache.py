@@ -0,0 +1,98 @@
+# app/auth/session_cache.py
+# In-process cache for session cookie authentication: verified claims by token digest and
+# User documents by user_id, so steady-state authenticated requests skip jwt.decode and MongoDB.
+
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.models.user_model import User
+from app.utils import jwt_utils
+
+
+class SessionCache:
+    """
+    Two bounded TTL caches in front of get_current_user_from_cookie.
+
+    - claims: sha256(token) -> (decoded claims, exp). Raw tokens are never kept. An entry is
+      dropped on lookup once the token's own `exp` has passed, whatever the cache TTL says.
+    - users: user_id -> User. Entries are invalidated by User's save/replace/delete event
+      actions (see user_model.py) and otherwise expire after `user_ttl` seconds, which bounds
+      staleness for writes made by other workers or by query-level updates that skip the events.
+    """
+
+    def __init__(self, maxsize: int = 10000, claims_ttl: float = 300.0, user_ttl: float = 60.0):
+        self._claims: TTLCache = TTLCache(maxsize=maxsize, ttl=claims_ttl)
+        self._users: TTLCache = TTLCache(maxsize=maxsize, ttl=user_ttl)
+        self.counters: Dict[str, int] = {
+            "claims_hits": 0, "claims_misses": 0, "user_hits": 0, "user_misses": 0, "user_invalidations": 0,
+        }
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get_claims(self, token: str) -> Dict[str, Any]:
+        """
+        Returns the verified claims for a session token, decoding it only on a miss.
+
+        Raises:
+            HTTPException 401: From jwt_utils.decode_session_jwt if the token is invalid or expired.
+        """
+        key = self._digest(token)
+        entry: Optional[Tuple[Dict[str, Any], Optional[float]]] = self._claims.get(key)
+        if entry is not None:
+            claims, exp = entry
+            if exp is None or exp > time.time():
+                self.counters["claims_hits"] += 1
+                return claims
+            self._claims.pop(key, None) # Expired since it was cached; decode again to get the 401
+
+        self.counters["claims_misses"] += 1
+        claims = jwt_utils.decode_session_jwt(token)
+        exp = claims.get("exp")
+        self._claims[key] = (claims, float(exp) if exp is not None else None)
+        return claims
+
+    async def get_user(self, user_id: str) -> Optional[User]:
+        """Returns the User for `user_id`, reading MongoDB only on a miss. Unknown users are not cached."""
+        user = self._users.get(user_id)
+        if user is not None:
+            self.counters["user_hits"] += 1
+            return user.model_copy() # Callers may mutate their copy without touching the cache
+
+        self.counters["user_misses"] += 1
+        user = await User.find_one(User.user_id == user_id)
+        if user is not None:
+            self._users[user_id] = user.model_copy()
+        return user
+
+    def invalidate_user(self, user_id: str) -> None:
+        if self._users.pop(user_id, None) is not None:
+            self.counters["user_invalidations"] += 1
+
+    def clear(self) -> None:
+        self._claims.clear()
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        claims_total = self.counters["claims_hits"] + self.counters["claims_misses"]
+        user_total = self.counters["user_hits"] + self.counters["user_misses"]
+        return {
+            **self.counters,
+            "claims_size": len(self._claims),
+            "user_size": len(self._users),
+            "claims_hit_ratio": round(self.counters["claims_hits"] / claims_total, 4) if claims_total else 0.0,
+            "user_hit_ratio": round(self.counters["user_hits"] / user_total, 4) if user_total else 0.0,
+        }
+
+
+# Shared instance used by app.auth.dependencies
+session_cache = SessionCache(
+    maxsize=settings.SESSION_CACHE_MAXSIZE,
+    claims_ttl=settings.SESSION_CLAIMS_CACHE_TTL_SECONDS,
+    user_ttl=settings.SESSION_USER_CACHE_TTL_SECONDS,
+)
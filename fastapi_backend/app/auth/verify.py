@@ -1,14 +1,13 @@
 # app/auth/verify.py
 # Handles Auth0 JWT verification.
 
-import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, exceptions as jose_exceptions
-from cachetools import TTLCache
 from typing import Dict, Any
 
 from app.core.config import settings
+from app.auth.jwks import JWKSKeyManager
 
 # --- Constants ---
 ALGORITHMS = ["RS256"]
@@ -22,35 +21,20 @@ if not AUTH0_DOMAIN or not API_AUDIENCE:
     # raise ValueError("Auth0 Domain and API Audience must be configured")
 
 ISSUER = f"https://{AUTH0_DOMAIN}/" if AUTH0_DOMAIN else None
-JWKS_URL = f"{ISSUER}.well-known/jwks.json" if ISSUER else None
+JWKS_URL = settings.AUTH0_JWKS_URL or (f"{ISSUER}.well-known/jwks.json" if ISSUER else None)
 
-# --- JWKS Caching ---
-jwks_cache = TTLCache(maxsize=1, ttl=600)
+# --- JWKS Key Manager (kid-indexed, refreshed in the background; started from the app lifespan) ---
+jwks_manager = JWKSKeyManager(
+    JWKS_URL,
+    algorithm=ALGORITHMS[0],
+    ttl=settings.JWKS_CACHE_TTL_SECONDS,
+    refresh_margin=settings.JWKS_REFRESH_MARGIN_SECONDS,
+    min_refetch_interval=settings.JWKS_MIN_REFETCH_SECONDS,
+)
 
 # --- HTTP Bearer Scheme ---
 token_auth_scheme = HTTPBearer()
 
-# --- Helper Functions ---
-async def get_jwks() -> Dict[str, Any]:
-    """Fetches JWKS from Auth0, using a cache."""
-    if not JWKS_URL:
-        raise HTTPException(status_code=500, detail="Auth0 configuration missing, cannot fetch JWKS.")
-
-    cached_jwks = jwks_cache.get("jwks")
-    if cached_jwks:
-        return cached_jwks
-
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(JWKS_URL)
-            response.raise_for_status()
-            jwks = response.json()
-            jwks_cache["jwks"] = jwks
-            return jwks
-        except Exception as e:
-            print(f"Failed to fetch JWKS: {e}")
-            raise HTTPException(status_code=503, detail="Could not fetch JWKS from authentication provider.")
-
 # --- FastAPI Dependency ---
 async def verify_token(token: HTTPAuthorizationCredentials = Depends(token_auth_scheme)) -> Dict[str, Any]:
     """
@@ -73,24 +57,12 @@ async def verify_token(token: HTTPAuthorizationCredentials = Depends(token_auth_
     )
 
     try:
-        jwks = await get_jwks()
         unverified_header = jwt.get_unverified_header(token.credentials)
-        rsa_key = {}
         if "kid" not in unverified_header:
             raise credentials_exception
 
-        for key in jwks.get("keys", []):
-            if key.get("kid") == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
-
-        if not rsa_key:
+        rsa_key = await jwks_manager.get_key(unverified_header["kid"])
+        if rsa_key is None:
             raise credentials_exception
 
         payload = jwt.decode(
@@ -109,7 +81,7 @@ async def verify_token(token: HTTPAuthorizationCredentials = Depends(token_auth_
     except jose_exceptions.JWTError as e:
         raise HTTPException(status_code=401, detail=f"Token validation error: {e}", headers={"WWW-Authenticate": "Bearer"})
     except HTTPException as e:
-        raise e # Re-raise specific HTTP exceptions (like from get_jwks)
+        raise e # Re-raise specific HTTP exceptions (like a JWKS fetch failure)
     except Exception as e:
         print(f"Unexpected error during token verification: {e}")
         raise HTTPException(status_code=500, detail="Internal server error during token validation")
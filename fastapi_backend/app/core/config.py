@@ -3,16 +3,84 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Optional
 
 class Settings(BaseSettings):
     """Loads environment variables for the application."""
     DATABASE_URL: str = Field(..., env='DATABASE_URL')
+    MONGO_DB_NAME: str = Field('DragonHacks', env='MONGO_DB_NAME')
+
+    # MongoDB client tuning (per worker); see app/db/database.py
+    MONGO_MAX_POOL_SIZE: int = Field(100, env='MONGO_MAX_POOL_SIZE') # Connections per server
+    MONGO_MIN_POOL_SIZE: int = Field(0, env='MONGO_MIN_POOL_SIZE') # Kept open while idle
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = Field(None, env='MONGO_MAX_IDLE_TIME_MS') # Close pooled connections idle this long
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = Field(None, env='MONGO_WAIT_QUEUE_TIMEOUT_MS') # Wait for a pooled connection before erroring
+    MONGO_CONNECT_TIMEOUT_MS: int = Field(5000, env='MONGO_CONNECT_TIMEOUT_MS')
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = Field(5000, env='MONGO_SERVER_SELECTION_TIMEOUT_MS') # Fail fast when no suitable server is reachable
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = Field(None, env='MONGO_SOCKET_TIMEOUT_MS') # None = no per-operation socket timeout
+    MONGO_READ_PREFERENCE: str = Field('primary', env='MONGO_READ_PREFERENCE') # primary, primaryPreferred, secondary, secondaryPreferred, nearest
+    MONGO_WRITE_CONCERN_W: str = Field('1', env='MONGO_WRITE_CONCERN_W') # A node count ('1') or 'majority'
+    MONGO_WRITE_CONCERN_JOURNAL: Optional[bool] = Field(None, env='MONGO_WRITE_CONCERN_JOURNAL') # None = server default
+    MONGO_WRITE_CONCERN_TIMEOUT_MS: Optional[int] = Field(None, env='MONGO_WRITE_CONCERN_TIMEOUT_MS')
+    MONGO_VERIFY_INDEXES: bool = Field(True, env='MONGO_VERIFY_INDEXES') # Check declared indexes exist at startup
+    MONGO_EXPLAIN_HOT_QUERIES: bool = Field(False, env='MONGO_EXPLAIN_HOT_QUERIES') # Print an explain() report at startup
+    MONGO_FAIL_ON_COLLSCAN: bool = Field(False, env='MONGO_FAIL_ON_COLLSCAN') # Refuse to start when a hot query scans a collection
     PLAID_CLIENT_ID: str = Field(..., env='PLAID_CLIENT_ID')
     PLAID_SECRET_KEY: str = Field(..., env='PLAID_SECRET_KEY')
     PLAID_ENV: str = Field('sandbox', env='PLAID_ENV') # e.g., 'sandbox', 'development', 'production'
+    PLAID_HOST: Optional[str] = Field(None, env='PLAID_HOST') # Overrides the PLAID_ENV host, e.g. a local fake Plaid server
+
+    # Plaid HTTP client tuning (per worker)
+    PLAID_TIMEOUT_SECONDS: float = Field(30.0, env='PLAID_TIMEOUT_SECONDS')
+    PLAID_MAX_CONNECTIONS: int = Field(20, env='PLAID_MAX_CONNECTIONS') # Keep-alive pool size
+    PLAID_MAX_CONCURRENCY: int = Field(10, env='PLAID_MAX_CONCURRENCY') # Max in-flight Plaid calls
+    PLAID_QUEUE_TIMEOUT_SECONDS: float = Field(10.0, env='PLAID_QUEUE_TIMEOUT_SECONDS') # Wait for a free slot before 503
+    PLAID_WEBHOOK_URL: Optional[str] = Field(None, env='PLAID_WEBHOOK_URL') # Public URL of /api/v1/plaid/webhook, sent with new link tokens
+    PLAID_WEBHOOK_KEY_CACHE_SECONDS: float = Field(3600.0, env='PLAID_WEBHOOK_KEY_CACHE_SECONDS') # How long a webhook verification key is trusted before it is fetched again
+    WEBHOOK_WORKERS: int = Field(4, env='WEBHOOK_WORKERS') # Concurrent webhook-driven syncs per worker; also the most items a write batch can gather
+    WEBHOOK_MAX_PENDING_ITEMS: int = Field(10000, env='WEBHOOK_MAX_PENDING_ITEMS') # Distinct queued items before webhooks get 503
+    WEBHOOK_WRITE_BATCH_ITEMS: int = Field(100, env='WEBHOOK_WRITE_BATCH_ITEMS') # Most items' change sets applied by one bulk_write
+    SANDBOX_FIXTURES_DIR: str = Field('app/db', env='SANDBOX_FIXTURES_DIR') # <name>.json override histories for create_custom_item
+    SANDBOX_DEFAULT_FIXTURE: str = Field('custom_gig_user', env='SANDBOX_DEFAULT_FIXTURE')
+    SANDBOX_FIXTURE_CACHE_MAX_BYTES: int = Field(64 * 1024 * 1024, env='SANDBOX_FIXTURE_CACHE_MAX_BYTES') # Total file size kept parsed in memory
+    SANDBOX_FIXTURE_STREAM_THRESHOLD_BYTES: int = Field(8 * 1024 * 1024, env='SANDBOX_FIXTURE_STREAM_THRESHOLD_BYTES') # Larger files are parsed element by element
+    PROVISION_CONCURRENCY: int = Field(20, env='PROVISION_CONCURRENCY') # Sandbox items in Plaid at once during bulk provisioning (PLAID_MAX_CONCURRENCY still applies)
+    PROVISION_BATCH_SIZE: int = Field(500, env='PROVISION_BATCH_SIZE') # Items per encrypt + insert_many batch
+    PROVISION_MAX_ITEMS: int = Field(10000, env='PROVISION_MAX_ITEMS') # Largest count accepted by the provisioning endpoint
+    METRICS_ENABLED: bool = Field(True, env='METRICS_ENABLED') # Request/upstream latency histograms served at GET /metrics
+    REFRESH_SCHEDULER_ENABLED: bool = Field(True, env='REFRESH_SCHEDULER_ENABLED') # Run the refresh scheduler in the API process (disable when running it as a separate worker)
+    REFRESH_INTERVAL_SECONDS: float = Field(60.0, env='REFRESH_INTERVAL_SECONDS') # Mean pause between scheduler passes (jittered)
+    REFRESH_STALE_AFTER_SECONDS: float = Field(3600.0, env='REFRESH_STALE_AFTER_SECONDS') # Items last synced longer ago are refreshed
+    REFRESH_CONCURRENCY: int = Field(4, env='REFRESH_CONCURRENCY') # Items synced at once by the scheduler
+    REFRESH_BATCH_SIZE: int = Field(200, env='REFRESH_BATCH_SIZE') # Most items refreshed per pass
+    REFRESH_JITTER: float = Field(0.2, env='REFRESH_JITTER') # +- fraction applied to the pass interval and per-item staleness
+    REFRESH_BACKOFF_BASE_SECONDS: float = Field(60.0, env='REFRESH_BACKOFF_BASE_SECONDS') # Delay after the first failed sync, doubled per failure
+    REFRESH_BACKOFF_MAX_SECONDS: float = Field(21600.0, env='REFRESH_BACKOFF_MAX_SECONDS')
+    SYNC_LEASE_SECONDS: float = Field(300.0, env='SYNC_LEASE_SECONDS') # Cross-process claim on an item while it syncs; outlives any sync, frees items of crashed processes
+    TRANSACTIONS_FANOUT_CONCURRENCY: int = Field(4, env='TRANSACTIONS_FANOUT_CONCURRENCY') # Items fetched at once per user request
+    TRANSACTIONS_RESULT_CACHE_TTL_SECONDS: float = Field(2.0, env='TRANSACTIONS_RESULT_CACHE_TTL_SECONDS') # Reuse of identical reads; 0 disables
+    TRANSACTIONS_RESULT_CACHE_MAXSIZE: int = Field(256, env='TRANSACTIONS_RESULT_CACHE_MAXSIZE')
+    TRANSACTIONS_STREAM_PAGE_SIZE: int = Field(1000, env='TRANSACTIONS_STREAM_PAGE_SIZE') # Rows per MongoDB batch / NDJSON chunk
+    TIMESERIES_CACHE_MAXSIZE: int = Field(1024, env='TIMESERIES_CACHE_MAXSIZE') # Users with cached chart series per worker
+    TIMESERIES_CACHE_TTL_SECONDS: float = Field(300, env='TIMESERIES_CACHE_TTL_SECONDS') # Also dropped when the user's transactions change
+    RECURRING_CACHE_MAXSIZE: int = Field(1024, env='RECURRING_CACHE_MAXSIZE') # Users with cached recurring series per worker
+    RECURRING_CACHE_TTL_SECONDS: float = Field(3600, env='RECURRING_CACHE_TTL_SECONDS') # Also dropped when the user's transactions change
+    FORECAST_HISTORY_DAYS: int = Field(365, env='FORECAST_HISTORY_DAYS') # Daily history behind each cash-flow forecast
+    FORECAST_CACHE_MAXSIZE: int = Field(1024, env='FORECAST_CACHE_MAXSIZE') # Users with forecasts computed on request, cached per worker
+    FORECAST_CACHE_TTL_SECONDS: float = Field(3600, env='FORECAST_CACHE_TTL_SECONDS') # Also dropped when the user's transactions change
+    FORECAST_PRECOMPUTE_WORKERS: int = Field(4, env='FORECAST_PRECOMPUTE_WORKERS') # Processes used by the nightly precompute job
+    FORECAST_PRECOMPUTE_CHUNK_SIZE: int = Field(500, env='FORECAST_PRECOMPUTE_CHUNK_SIZE') # Users per rollup query and per process-pool task
+    ACCESS_TOKEN_CACHE_MAXSIZE: int = Field(1000, env='ACCESS_TOKEN_CACHE_MAXSIZE') # Decrypted Plaid access tokens kept per worker
+    ACCESS_TOKEN_CACHE_TTL_SECONDS: float = Field(300, env='ACCESS_TOKEN_CACHE_TTL_SECONDS')
     AUTH0_DOMAIN: str = Field(..., env='AUTH0_DOMAIN')
     AUTH0_API_AUDIENCE: str = Field(..., env='AUTH0_API_AUDIENCE')
+    AUTH0_JWKS_URL: Optional[str] = Field(None, env='AUTH0_JWKS_URL') # Overrides the JWKS URL derived from AUTH0_DOMAIN, e.g. a local stub
+    AUTH0_TOKEN_URL: Optional[str] = Field(None, env='AUTH0_TOKEN_URL') # Overrides the /oauth/token URL derived from AUTH0_DOMAIN, e.g. a local stub
+    JWKS_CACHE_TTL_SECONDS: float = Field(600, env='JWKS_CACHE_TTL_SECONDS')
+    JWKS_REFRESH_MARGIN_SECONDS: float = Field(60, env='JWKS_REFRESH_MARGIN_SECONDS') # Background refresh this long before expiry
+    JWKS_MIN_REFETCH_SECONDS: float = Field(30, env='JWKS_MIN_REFETCH_SECONDS') # Rate limit for unknown-kid refetches
     # Add other settings as needed, e.g., SECRET_KEY for encryption
+    DEV_MODE: bool = Field(False, env='DEV_MODE') # Enables the dev-user shortcut in /api/v1/users/me
 
     # Auth0 client settings
     AUTH0_CLIENT_ID: str = Field(..., env='AUTH0_CLIENT_ID')
@@ -24,6 +92,13 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = Field("HS256", env='JWT_ALGORITHM')
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env='ACCESS_TOKEN_EXPIRE_MINUTES')
 
+    # Fernet key for stored Plaid access tokens. Must be identical in every process that reads or
+    # writes items: API workers, the refresh scheduler worker and the provisioning CLI
+    ENCRYPTION_KEY: str = Field(..., env='ENCRYPTION_KEY')
+    SESSION_CACHE_MAXSIZE: int = Field(10000, env='SESSION_CACHE_MAXSIZE') # Entries per cache (claims, users)
+    SESSION_CLAIMS_CACHE_TTL_SECONDS: float = Field(300, env='SESSION_CLAIMS_CACHE_TTL_SECONDS') # Token exp is always honored too
+    SESSION_USER_CACHE_TTL_SECONDS: float = Field(60, env='SESSION_USER_CACHE_TTL_SECONDS') # Bounds staleness across workers
+
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
@@ -1,29 +1,71 @@
 import motor.motor_asyncio
 from beanie import init_beanie
+from typing import Any, Dict
 from app.core.config import settings
+from app.db.indexes import explain_hot_queries, verify_indexes
+from app.utils.metrics import mongo_command_metrics
 from app.models.user_model import User
 from app.models.plaid_item_model import PlaidItem
+from app.models.transaction_model import Transaction
+from app.models.spending_rollup_model import SpendingRollup
+from app.models.budget_category_model import BudgetCategory
+from app.models.forecast_model import CashFlowForecast
 # Import other models as they are created
-# from app.models.budget_category_model import BudgetCategory
 
-async def init_db():
-    """Initializes the database connection and Beanie ODM."""
-    print(f"Connecting to MongoDB at: {settings.DATABASE_URL}") # For debugging startup
-    client = motor.motor_asyncio.AsyncIOMotorClient(
-        settings.DATABASE_URL
-    )
-    database = client["DragonHacks"] # Or client[DB_NAME] if not in URL
+# List all Beanie documents to initialize
+document_models = [
+    User,
+    PlaidItem,
+    Transaction,
+    SpendingRollup,
+    BudgetCategory,
+    CashFlowForecast,
+    # Add other models here
+]
+
+def client_options() -> Dict[str, Any]:
+    """Pool, timeout, read preference and write concern options for the Motor client, from settings."""
+    w = settings.MONGO_WRITE_CONCERN_W
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+        "w": int(w) if w.isdigit() else w,
+        # Optional values are only passed when set, leaving the driver/server defaults otherwise
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "journal": settings.MONGO_WRITE_CONCERN_JOURNAL,
+        "wTimeoutMS": settings.MONGO_WRITE_CONCERN_TIMEOUT_MS,
+        # Times every command (all Beanie queries) into upstream_request_duration_seconds
+        "event_listeners": [mongo_command_metrics] if settings.METRICS_ENABLED else None,
+    }
+    return {key: value for key, value in options.items() if value is not None}
 
-    # List all Beanie documents to initialize
-    document_models = [
-        User,
-        PlaidItem,
-        # BudgetCategory,
-        # Add other models here
-    ]
+async def init_db(client=None):
+    """
+    Initializes the database connection and Beanie ODM, then checks indexes.
+
+    Args:
+        client: Optional pre-built Motor-compatible client (e.g. an in-memory one for benchmarks).
+                Defaults to a client for settings.DATABASE_URL configured by client_options().
+    """
+    if client is None:
+        print(f"Connecting to MongoDB at: {settings.DATABASE_URL}") # For debugging startup
+        client = motor.motor_asyncio.AsyncIOMotorClient(
+            settings.DATABASE_URL, **client_options()
+        )
+    database = client[settings.MONGO_DB_NAME]
 
     await init_beanie(
         database=database,
         document_models=document_models
     )
-    print("Beanie ODM initialized successfully.")
\ No newline at end of file
+    print("Beanie ODM initialized successfully.")
+
+    if settings.MONGO_VERIFY_INDEXES:
+        await verify_indexes(document_models)
+    if settings.MONGO_EXPLAIN_HOT_QUERIES or settings.MONGO_FAIL_ON_COLLSCAN:
+        await explain_hot_queries(fail_on_collscan=settings.MONGO_FAIL_ON_COLLSCAN)
@@ -0,0 +1,141 @@
+# app/db/indexes.py
+# Startup index checks: verifies that the indexes declared on the models exist, and explains the
+# hot queries so a collection scan is caught before it reaches production. For CI:
+#   python -m app.db.indexes   (exits non-zero on a missing index or a COLLSCAN)
+
+import asyncio
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from beanie import Document
+from beanie.odm.fields import IndexModelField
+
+from app.models.user_model import User
+from app.models.plaid_item_model import PlaidItem
+from app.models.transaction_model import Transaction
+from app.models.spending_rollup_model import SpendingRollup
+from app.models.budget_category_model import BudgetCategory
+from app.models.forecast_model import CashFlowForecast
+
+# (label, model, filter, sort) for every query on a request or sync path. Values are placeholders:
+# only the shape of the query matters to the planner.
+HOT_QUERIES: List[Tuple[str, Type[Document], Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("User by user_id", User, {"user_id": "auth0|x"}, None),
+    ("PlaidItem by item_id", PlaidItem, {"item_id": "x"}, None),
+    ("PlaidItems by item_id $in", PlaidItem, {"item_id": {"$in": ["x", "y"]}}, None),
+    ("PlaidItems by user_id", PlaidItem, {"user_id": "x"}, None),
+    ("PlaidItems due for refresh", PlaidItem,
+     {"$or": [{"last_sync_time": None}, {"last_sync_time": {"$lt": datetime(2000, 1, 1)}}]}, None),
+    ("Transactions by transaction_id $in", Transaction, {"transaction_id": {"$in": ["x", "y"]}}, None),
+    ("Item transactions in range", Transaction,
+     {"item_id": "x", "date": {"$gte": "2024-01-01", "$lte": "2024-12-31"}}, [("date", -1), ("transaction_id", -1)]),
+    ("User transactions in range", Transaction,
+     {"user_id": "x", "date": {"$gte": "2024-01-01", "$lte": "2024-12-31"}}, [("date", -1), ("transaction_id", -1)]),
+    ("User transactions (rollup rebuild)", Transaction, {"user_id": "x"}, None),
+    ("User posted transactions (recurring)", Transaction, {"user_id": "x", "pending": {"$ne": True}}, None),
+    ("Spending rollups in range", SpendingRollup,
+     {"user_id": "x", "day": {"$gte": "2024-01-01", "$lte": "2024-12-31"}}, None),
+    ("Spending rollups in range, user batch (forecast precompute)", SpendingRollup,
+     {"user_id": {"$in": ["x", "y"]}, "day": {"$gte": "2024-01-01", "$lte": "2024-12-31"}}, None),
+    ("Budgets by user", BudgetCategory, {"user_id": "x"}, [("category", 1)]),
+    ("Budget by user and category", BudgetCategory, {"user_id": "x", "category": "Travel"}, None),
+    ("Precomputed forecast by user", CashFlowForecast, {"user_id": "x"}, None),
+]
+
+
+async def verify_indexes(models: List[Type[Document]]) -> List[str]:
+    """
+    Checks that every index declared in a model's Settings.indexes exists with the same keys and
+    options. init_beanie creates missing indexes, but a conflicting index with the same name (or a
+    failed build) is only reported here. Returns the missing index names; raises if any.
+    """
+    missing = []
+    for model in models:
+        declared = model.get_settings().indexes or []
+        existing = IndexModelField.from_motor_index_information(
+            await model.get_motor_collection().index_information()
+        )
+        for index in IndexModelField.list_difference(declared, existing):
+            missing.append(f"{model.get_settings().name}.{index.name}")
+    if missing:
+        raise RuntimeError(f"Declared MongoDB indexes are missing or differ: {', '.join(missing)}")
+    print(f"Verified declared indexes on {len(models)} collections.")
+    return missing
+
+
+def _stages(plan: Any) -> List[str]:
+    """All stage names in an explain() plan tree, outermost first."""
+    if isinstance(plan, dict):
+        found = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            found.extend(_stages(value))
+        return found
+    if isinstance(plan, list):
+        return [stage for value in plan for stage in _stages(value)]
+    return []
+
+
+def _index_names(plan: Any) -> List[str]:
+    if isinstance(plan, dict):
+        found = [plan["indexName"]] if "indexName" in plan else []
+        for value in plan.values():
+            found.extend(_index_names(value))
+        return found
+    if isinstance(plan, list):
+        return [name for value in plan for name in _index_names(value)]
+    return []
+
+
+async def explain_hot_queries(fail_on_collscan: bool = False) -> List[Dict[str, Any]]:
+    """
+    Runs explain() (query planner only, nothing is executed) on each HOT_QUERIES entry and prints
+    the winning plan. With fail_on_collscan, raises if any of them scans a whole collection.
+    """
+    report = []
+    for label, model, query, sort in HOT_QUERIES:
+        cursor = model.get_motor_collection().find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            explained = await cursor.explain()
+        except (AttributeError, NotImplementedError): # In-memory test clients (mongomock) have no query planner
+            report.append({"query": label, "stages": [], "indexes": [], "collscan": None})
+            continue
+        plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(dict.fromkeys(_stages(plan)))
+        report.append({
+            "query": label,
+            "stages": stages,
+            "indexes": list(dict.fromkeys(_index_names(plan))),
+            "collscan": "COLLSCAN" in stages,
+        })
+
+    print("Hot query plans:")
+    for row in report:
+        if row["collscan"] is None:
+            verdict = "not explained (no query planner)"
+        else:
+            verdict = ("COLLSCAN" if row["collscan"] else "ok") + f"  {'>'.join(row['stages'])}  {', '.join(row['indexes'])}"
+        print(f"  {row['query']:<40} {verdict}")
+
+    scans = [row["query"] for row in report if row["collscan"]]
+    if scans and fail_on_collscan:
+        raise RuntimeError(f"Hot queries scan whole collections: {', '.join(scans)}")
+    return report
+
+
+async def _main() -> int:
+    from app.db.database import init_db
+
+    try:
+        await init_db() # Creates and verifies the declared indexes
+        await explain_hot_queries(fail_on_collscan=True)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -2,12 +2,18 @@
 # Main FastAPI application instance and startup/shutdown logic.
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from app.db.database import init_db
 from app.core.config import settings # Import settings if needed elsewhere, e.g., for CORS origins
+from app.auth.verify import jwks_manager
+from app.services.webhook_service import webhook_processor
+from app.services.refresh_scheduler import refresh_scheduler
+from app.services.provisioning_service import provisioning_jobs
+from app.utils.metrics import MetricsMiddleware, render_metrics
 # Import routers
 # from app.routers import auth, plaid, budgets
-from app.routers import users, plaid  # Import the users and Plaid routers
+from app.routers import users, plaid, spending, budgets, insights  # Import the users, Plaid, spending, budgets and insights routers
 
 # Lifespan context manager for startup/shutdown events
 @asynccontextmanager
@@ -15,10 +21,18 @@ async def lifespan(app: FastAPI):
     # Code to run on startup
     print("Application startup...")
     await init_db()
+    await jwks_manager.start() # Keep Auth0 signing keys warm in the background
+    await webhook_processor.start() # Workers that turn Plaid webhooks into incremental syncs
+    if settings.REFRESH_SCHEDULER_ENABLED:
+        await refresh_scheduler.start() # Keeps linked items fresh so reads rarely wait on Plaid
     yield
     # Code to run on shutdown
     print("Application shutdown...")
-    # Add cleanup logic here if needed (e.g., close external connections)
+    await refresh_scheduler.stop()
+    await provisioning_jobs.stop()
+    await webhook_processor.stop()
+    await jwks_manager.stop()
+    await plaid.plaid_service.aclose() # Close the shared Plaid connection pool
 
 app = FastAPI(
     title="My FastAPI Backend",
@@ -41,6 +55,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost: times every request, CORS preflights included
+    app.add_middleware(MetricsMiddleware)
 
 # --- Routers ---
 # Include routers from the app/routers directory
@@ -48,7 +65,9 @@ app.add_middleware(
 app.include_router(users.router)  # Add the users router (prefix is defined in the router itself)
 # Mount Plaid endpoints under /api/v1/plaid
 app.include_router(plaid.router, prefix="/api/v1/plaid", tags=["Plaid"])
-# app.include_router(budgets.router, prefix="/budgets", tags=["Budgets"])
+app.include_router(spending.router) # Prefix /api/v1/spending is defined in the router
+app.include_router(budgets.router) # Prefix /api/v1/budgets is defined in the router
+app.include_router(insights.router) # Prefix /api/v1/insights is defined in the router
 # app.include_router(protected.router, prefix="/api/v1", tags=["Protected"]) # Keep commented out or remove
 
 # --- Root Endpoint ---
@@ -57,6 +76,12 @@ async def read_root():
     """Root endpoint providing basic API information."""
     return {"message": "Welcome to the FastAPI Finance Backend!"}
 
+# --- Metrics ---
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, upstream (Plaid, MongoDB, Auth0) and Fernet latency histograms in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # --- Optional: Startup event using decorator (alternative to lifespan) ---
 # @app.on_event("startup")
 # async def on_startup():
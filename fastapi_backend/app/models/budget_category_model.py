@@ -0,0 +1,34 @@
+# app/models/budget_category_model.py
+# Defines the BudgetCategory document model for MongoDB using Beanie.
+
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from enum import Enum
+from pymongo import IndexModel, ASCENDING
+
+class BudgetPeriod(str, Enum):
+    WEEKLY = "weekly" # Monday through Sunday
+    MONTHLY = "monthly" # Calendar month
+
+class BudgetCategory(Document):
+    """A per-user spending limit for one primary category, with a running total for the current period."""
+    user_id: str # Foreign key linking to User.user_id
+    category: str # Primary category, matching SpendingRollup.category (e.g. 'Food and Drink')
+    limit: float
+    period: BudgetPeriod = BudgetPeriod.MONTHLY
+    # Running total, advanced by ingestion deltas while the period is current.
+    # Dates are ISO 'YYYY-MM-DD' strings like Transaction.date.
+    period_start: str
+    period_end: str
+    spent_cents: int = 0
+    delta_seq: int = 0 # Bumped with every apply_deltas $inc; a rebase only writes if it is unchanged since its read
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "budget_categories" # MongoDB collection name
+        indexes = [
+            # One budget per category; also serves user_id-only queries (list_budgets)
+            IndexModel([("user_id", ASCENDING), ("category", ASCENDING)], unique=True),
+        ]
@@ -0,0 +1,28 @@
+# app/models/forecast_model.py
+# Defines the CashFlowForecast document model for MongoDB using Beanie.
+
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo import IndexModel, ASCENDING
+
+class CashFlowForecast(Document):
+    """
+    A user's precomputed cash-flow forecast, written by the nightly batch job
+    (forecast_service.precompute_forecasts) and marked stale when the user's rollups change. A user
+    whose rollups changed before any forecast was stored has a mark-only document (no as_of).
+    """
+    user_id: str
+    as_of: Optional[str] = None # ISO 'YYYY-MM-DD'; the first forecast day, history ends the day before
+    history_days: Optional[int] = None # Days from the first active day in the window to as_of
+    values: Optional[Dict[str, float]] = None # Flat forecast_matrix output for this user (dollars)
+    computed_at: datetime = Field(default_factory=datetime.utcnow) # When the rollups behind it were read
+    invalidated_at: Optional[datetime] = None # Set when the user's transactions changed; stale from then on
+    read_started_at: Optional[datetime] = None # Set by a precompute chunk before it reads the rollups; an older mark is refreshed on the next change
+
+    class Settings:
+        name = "cash_flow_forecasts" # MongoDB collection name
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], unique=True),
+        ]
@@ -1,27 +1,42 @@
 # app/models/plaid_item_model.py
 # Defines the PlaidItem document model for MongoDB using Beanie.
 
-from beanie import Document, Indexed # Keep Indexed for Annotated
+from beanie import Document
 from pydantic import Field
 from datetime import datetime
-from typing import Optional, Annotated # Import Annotated
-from pymongo import IndexModel # Import IndexModel if defining indexes explicitly
+from typing import Optional
+from pymongo import IndexModel, ASCENDING
 
 class PlaidItem(Document):
     """Represents a Plaid Item linked to a user."""
-    # Use Annotated for indexing
-    item_id: Annotated[str, Indexed(unique=True)] # Plaid's unique identifier for the item
-    user_id: Annotated[str, Indexed()] # Foreign key linking to User.user_id
+    item_id: str # Plaid's unique identifier for the item (unique index declared in Settings)
+    user_id: str # Foreign key linking to User.user_id
     access_token: str # Encrypted Plaid access token
     institution_name: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    # Add other relevant fields, e.g., last_sync_status, last_sync_time
+    transactions_cursor: Optional[str] = None # Plaid /transactions/sync cursor; None until the first sync
+    # Sync bookkeeping, written by every sync (read paths, webhooks and the refresh scheduler)
+    last_sync_time: Optional[datetime] = None # Last successful sync
+    last_sync_status: Optional[str] = None # "ok" or "error"
+    last_sync_duration_ms: Optional[float] = None
+    last_sync_error: Optional[str] = None
+    last_sync_changes: int = 0 # Added + modified + removed in the last successful sync (activity signal)
+    consecutive_failures: int = 0
+    next_sync_after: Optional[datetime] = None # Backoff: the scheduler leaves the item alone until then
+    # Set before a sync writes transaction rows, cleared once rollups and budgets followed; a sync
+    # that finds it set rebuilds the user's rollups and budget totals first
+    rollups_dirty: bool = False
+    sync_lease_until: Optional[datetime] = None # Claimed by the process syncing the item until then
+    sync_lease_token: Optional[str] = None # Random id of that claim; the cursor is only committed under it
 
     class Settings:
         name = "plaid_items" # MongoDB collection name
-        # Optional: Define indexes explicitly
-        # indexes = [
-        #     IndexModel([("item_id", 1)], unique=True),
-        #     IndexModel([("user_id", 1)], unique=False), # user_id is indexed but not unique across items
-        # ]
+        indexes = [
+            # Syncs, webhooks and the token cache look items up by Plaid id
+            IndexModel([("item_id", ASCENDING)], unique=True),
+            # A user's items (per-user reads and streams); also serves user_id-only queries
+            IndexModel([("user_id", ASCENDING), ("item_id", ASCENDING)]),
+            # Refresh scheduler: never-synced and stale items, scanned oldest first
+            IndexModel([("last_sync_time", ASCENDING)]),
+        ]
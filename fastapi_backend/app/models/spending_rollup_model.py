@@ -0,0 +1,23 @@
+# app/models/spending_rollup_model.py
+# Defines the SpendingRollup document model for MongoDB using Beanie.
+
+from beanie import Document
+from pymongo import IndexModel, ASCENDING
+
+class SpendingRollup(Document):
+    """
+    Materialized per-user, per-category, per-day spending totals.
+    Maintained by deltas on ingestion; amounts are integer cents so increments stay exact.
+    """
+    user_id: str
+    category: str # Primary category (category[0], falling back to personal_finance_category.primary)
+    day: str # ISO 'YYYY-MM-DD', same format as Transaction.date
+    spent_cents: int = 0 # Outflows (positive Plaid amounts)
+    income_cents: int = 0 # Inflows (negative Plaid amounts), stored positive
+    transaction_count: int = 0 # Not `count`, which would shadow Document.count()
+
+    class Settings:
+        name = "spending_rollups" # MongoDB collection name
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("day", ASCENDING), ("category", ASCENDING)], unique=True),
+        ]
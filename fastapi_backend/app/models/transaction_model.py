@@ -0,0 +1,50 @@
+# app/models/transaction_model.py
+# Defines the Transaction document model for MongoDB using Beanie.
+
+from beanie import Document, Indexed
+from typing import Optional, Annotated, List, Dict, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+class Transaction(Document):
+    """A Plaid transaction stored locally and kept current via /transactions/sync."""
+    transaction_id: Annotated[str, Indexed(unique=True)] # Plaid's unique identifier for the transaction
+    item_id: str # Foreign key linking to PlaidItem.item_id
+    user_id: str # Denormalized from the PlaidItem so per-user queries need no join
+    account_id: str
+    amount: float # Plaid convention: positive = money out, negative = money in
+    # Dates are kept as ISO 'YYYY-MM-DD' strings (Plaid's wire format); they sort and range-query correctly
+    date: str
+    authorized_date: Optional[str] = None
+    authorized_datetime: Optional[str] = None
+    datetime: Optional[str] = None
+    name: Optional[str] = None
+    merchant_name: Optional[str] = None
+    merchant_entity_id: Optional[str] = None
+    category: Optional[List[str]] = None
+    category_id: Optional[str] = None
+    personal_finance_category: Optional[Dict[str, Any]] = None
+    personal_finance_category_icon_url: Optional[str] = None
+    pending: bool = False
+    pending_transaction_id: Optional[str] = None
+    payment_channel: Optional[str] = None
+    iso_currency_code: Optional[str] = None
+    unofficial_currency_code: Optional[str] = None
+    account_owner: Optional[str] = None
+    check_number: Optional[str] = None
+    counterparties: Optional[List[Dict[str, Any]]] = None
+    location: Optional[Dict[str, Any]] = None
+    payment_meta: Optional[Dict[str, Any]] = None
+    logo_url: Optional[str] = None
+    website: Optional[str] = None
+    transaction_code: Optional[str] = None
+    transaction_type: Optional[str] = None
+
+    class Settings:
+        name = "transactions" # MongoDB collection name
+        indexes = [
+            # Dashboard reads: one item's transactions in a date range, newest first. transaction_id
+            # breaks ties within a day so keyset pagination over (date, transaction_id) is index-only
+            IndexModel([("item_id", ASCENDING), ("date", DESCENDING), ("transaction_id", DESCENDING)]),
+            # Per-user reads across all linked items
+            IndexModel([("user_id", ASCENDING), ("date", DESCENDING), ("transaction_id", DESCENDING)]),
+        ]
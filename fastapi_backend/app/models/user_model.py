@@ -1,25 +1,29 @@
 # app/models/user_model.py
 # Defines the User document model for MongoDB using Beanie.
 
-from beanie import Document, Indexed
+from beanie import Document, after_event, Delete, Replace, Save, SaveChanges, Update
 from pydantic import Field, EmailStr
 from datetime import datetime
-from typing import Optional, Annotated # Import Annotated
-from pymongo import IndexModel # Import IndexModel for creating indexes
+from typing import Optional
+from pymongo import IndexModel, ASCENDING
 
 class User(Document):
     """Represents a user in the database."""
-    # Use Annotated for indexing in Pydantic v2 / modern Beanie
-    user_id: Annotated[str, Indexed(unique=True)] # Corresponds to Auth0 'sub'
+    user_id: str # Corresponds to Auth0 'sub' (unique index declared in Settings)
     email: EmailStr
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     # Add other user-specific fields as needed, e.g., name, preferences
 
+    @after_event(Save, Replace, SaveChanges, Update, Delete)
+    def invalidate_session_cache(self):
+        """Drops this user from the auth cache whenever the document is written or deleted."""
+        from app.auth.session_cache import session_cache # Imported here: session_cache imports this model
+        session_cache.invalidate_user(self.user_id)
+
     class Settings:
         name = "users" # MongoDB collection name
-        # Optional: Define indexes explicitly if needed beyond simple Indexed annotation
-        # indexes = [
-        #     IndexModel([("user_id", 1)], unique=True),
-        #     IndexModel([("email", 1)], unique=False), # Example: if you want to index email
-        # ]
+        indexes = [
+            # Every authenticated request resolves the user by Auth0 sub (see app/db/indexes.py)
+            IndexModel([("user_id", ASCENDING)], unique=True),
+        ]
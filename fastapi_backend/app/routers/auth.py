@@ -52,7 +52,7 @@ async def login_for_session(auth_code: AuthCode, response: Response):
         user = await User.find_one(User.user_id == auth0_sub)
         if user is None:
             print(f"User {auth0_sub} not found, creating new user.")
-            user = User(user_id=auth0_sub, email=EmailStr(email))
+            user = User(user_id=auth0_sub, email=email) # Validated as EmailStr by the model
             await user.insert()
             print(f"User {auth0_sub} created successfully.")
         else:
@@ -0,0 +1,48 @@
+# app/routers/budgets.py
+# API endpoints for per-user category budgets and their evaluation.
+
+from fastapi import APIRouter, HTTPException, status, Body, Path, Query
+from datetime import date, datetime
+from typing import List, Optional
+
+from app.schemas.budget_schemas import (
+    BudgetUpsertRequest,
+    BudgetResponse,
+    BudgetEvaluationResponse,
+)
+from app.services import budget_service
+
+router = APIRouter(
+    prefix="/api/v1/budgets",
+    tags=["Budgets"],
+)
+
+@router.get("/users/{user_id}", response_model=List[BudgetResponse])
+async def list_budgets(user_id: str = Path(...)):
+    """Lists the user's category budgets."""
+    budgets = await budget_service.list_budgets(user_id)
+    return [BudgetResponse(category=b.category, limit=b.limit, period=b.period) for b in budgets]
+
+@router.put("/users/{user_id}", response_model=BudgetResponse)
+async def upsert_budget(user_id: str = Path(...), request: BudgetUpsertRequest = Body(...)):
+    """Creates or updates the limit for one category (replaces localStorage 'budgetLimits')."""
+    budget = await budget_service.upsert_budget(user_id, request.category, request.limit, request.period)
+    return BudgetResponse(category=budget.category, limit=budget.limit, period=budget.period)
+
+@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget(user_id: str = Path(...), category: str = Query(...)):
+    """Removes the budget for one category."""
+    if not await budget_service.delete_budget(user_id, category):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
+
+@router.get("/users/{user_id}/evaluation", response_model=BudgetEvaluationResponse)
+async def evaluate_budgets(user_id: str = Path(...), as_of: Optional[date] = Query(None)):
+    """Evaluates spent-vs-limit for every budget of the user in one call."""
+    as_of = as_of or datetime.utcnow().date()
+    statuses = await budget_service.evaluate_budgets(user_id, as_of)
+    return BudgetEvaluationResponse(
+        user_id=user_id,
+        as_of=as_of,
+        budgets=statuses,
+        over_budget=[s["category"] for s in statuses if s["over_budget"]],
+    )
@@ -0,0 +1,37 @@
+# app/routers/insights.py
+# API endpoints for cash-flow insights computed from stored transactions.
+
+from fastapi import APIRouter, Path, Query
+from datetime import date
+from typing import Optional
+
+from app.schemas.insights_schemas import ForecastResponse, RecurringResponse
+from app.services import forecast_service, recurring_service
+
+router = APIRouter(
+    prefix="/api/v1/insights",
+    tags=["Insights"],
+)
+
+@router.get("/users/{user_id}/recurring", response_model=RecurringResponse)
+async def get_recurring(
+    user_id: str = Path(...),
+    as_of: Optional[date] = Query(None, description="Evaluate activity as of this day (default: today)"),
+):
+    """
+    Recurring income (e.g. weekly gig payouts) and recurring expenses (subscriptions, bills)
+    detected from the user's stored transaction history, with their cadence and next expected date.
+    """
+    return await recurring_service.get_recurring(user_id, as_of)
+
+@router.get("/users/{user_id}/forecast", response_model=ForecastResponse)
+async def get_forecast(
+    user_id: str = Path(...),
+    as_of: Optional[date] = Query(None, description="First forecast day; history ends the day before (default: today)"),
+):
+    """
+    Smoothed monthly income and spending, and projected inflows, outflows and net cash flow over the
+    next 30, 60 and 90 days with 80% ranges. Precomputed nightly; computed on request when the
+    nightly forecast is missing or the user's transactions changed since.
+    """
+    return await forecast_service.get_forecast(user_id, as_of)
@@ -1,32 +1,42 @@
-import json  # required for custom item endpoint
-from fastapi import APIRouter, HTTPException, status, Body, Path
-from app.services.plaid_service import PlaidService
+from fastapi import APIRouter, HTTPException, status, Body, Path, Query, Header, Request
+import orjson
+from fastapi.responses import StreamingResponse
+from app.services.plaid_service import plaid_service, sample_sandbox_transactions
+from app.services import transaction_service, item_service
+from app.schemas.transaction_schemas import CompactTransaction
+from app.services.webhook_service import SYNC_WEBHOOK_CODES, webhook_processor
+from app.auth.plaid_webhook import plaid_webhook_verifier
+from app.services.refresh_scheduler import refresh_scheduler
+from app.services.fixture_service import fixture_loader
+from app.services.provisioning_service import provisioning_jobs
+from app.core.config import settings
 from app.models.plaid_item_model import PlaidItem
-from typing import List, Any, Dict
-from plaid.model.products import Products
+from typing import List, Any, AsyncIterator, Dict, Optional
 from app.schemas.plaid_schemas import (
     LinkTokenResponse,
     AccessTokenResponse,
     GetTransactionsRequest,
+    GetUserTransactionsRequest,
     TransactionsResponse,
     UserDataRequest,
+    SandboxProvisionRequest,
+    SandboxProvisionJob,
 )
-from app.utils.encryption import encrypt_token, decrypt_token
+from app.utils.responses import OrjsonResponse, dumps
 from datetime import datetime, date, timedelta
 
-# Initialize router and service
+# Initialize router (the Plaid service is a shared instance)
 router = APIRouter(
     tags=["Plaid"],
 )
-plaid_service = PlaidService()
 
 @router.post("/create_link_token", response_model=LinkTokenResponse)
 async def create_link_token(request: UserDataRequest = None):
     """Creates a Plaid Link token. No backend auth required."""
-    # Use user data sent from frontend or generate dev ID
-    user_id = request.user_id if request and request.user_id else get_dev_user_id(
-        request.email if request and request.email else None
-    )
+    # The frontend sends the Auth0 sub as user_id
+    user_id = request.user_id if request else None
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing user_id")
     print(f"Creating link token for user: {user_id}")
     link_token = await plaid_service.create_link_token(user_id)
     return LinkTokenResponse(link_token=link_token)
@@ -38,69 +48,143 @@ async def exchange_public_token(payload: dict = Body(...)):
     public_token = payload.get("public_token")
     if not public_token:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing public_token")
-    # Get user_id from payload or generate dev ID
-    email = payload.get("email")
-    user_id = payload.get("user_id") or get_dev_user_id(email)
-
-    access_token, item_id = await plaid_service.exchange_public_token(public_token)
-    encrypted_access_token = encrypt_token(access_token)
-    existing_item = await PlaidItem.find_one(PlaidItem.item_id == item_id)
-    if existing_item:
-        existing_item.access_token = encrypted_access_token
-        existing_item.updated_at = datetime.utcnow()
-        await existing_item.save()
-    else:
-        new_item = PlaidItem(
-            item_id=item_id,
-            user_id=user_id,
-            access_token=encrypted_access_token,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        await new_item.insert()
-    return AccessTokenResponse(access_token=access_token, item_id=item_id)
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing user_id")
 
-@router.post("/items/{item_id}/transactions", response_model=TransactionsResponse)
+    # One atomic upsert on item_id (new link or relink); duplicate submissions share the exchange
+    item = await item_service.link_public_token(public_token, user_id)
+    return AccessTokenResponse(item_id=item.item_id)
+
+@router.post("/items/{item_id}/transactions", response_model=TransactionsResponse, response_class=OrjsonResponse)
 async def get_transactions(item_id: str = Path(...), request: GetTransactionsRequest = Body(...)):
     """Fetches transactions. No backend auth required (relies on item_id ownership implicitly)."""
-    # Fetch the Plaid Item - anyone can fetch if they know the ID in this simplified model
+    # Anyone can fetch if they know the ID in this simplified model. The service syncs on first
+    # access (or when asked), serves from MongoDB and coalesces identical concurrent requests.
+    transactions, next_cursor = await transaction_service.read_item_transactions(
+        item_id, request.start_date, request.end_date, refresh=request.refresh,
+        page_size=request.page_size, cursor=request.cursor, fields=request.fields,
+    )
+    if not (request.page_size or request.cursor or request.fields):
+        # Sandbox sampling only applies to full-range reads
+        transactions = sample_sandbox_transactions(
+            transactions, request.min_transactions, request.max_transactions
+        )
+    # Returned as-is: orjson encodes the CompactTransaction dataclasses (as_dict) without revalidating them
+    return OrjsonResponse({"transactions": transactions, "total_transactions": None, "next_cursor": next_cursor})
+
+@router.post("/users/{user_id}/transactions", response_model=TransactionsResponse, response_class=OrjsonResponse)
+async def get_user_transactions(user_id: str = Path(...), request: GetUserTransactionsRequest = Body(...)):
+    """Fetches transactions across all of a user's linked items, merged newest first."""
+    transactions, next_cursor = await transaction_service.read_user_transactions(
+        user_id, request.start_date, request.end_date, refresh=request.refresh,
+        page_size=request.page_size, cursor=request.cursor, fields=request.fields,
+    )
+    total = None if (request.page_size or request.cursor or request.fields) else len(transactions)
+    return OrjsonResponse({"transactions": transactions, "total_transactions": total, "next_cursor": next_cursor})
+
+@router.post("/webhook")
+async def plaid_webhook(request: Request, plaid_verification: Optional[str] = Header(None)):
+    """
+    Receives Plaid webhooks. The Plaid-Verification JWT is checked against the raw body first, so
+    forged requests get 401 and queue nothing. Transaction update events are queued for a
+    background sync and acknowledged immediately; Plaid retries on non-2xx, so a full backlog
+    answers 503.
+    """
+    body = await request.body()
+    await plaid_webhook_verifier.verify(plaid_verification, body)
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Webhook body is not valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Webhook body must be a JSON object")
+    webhook_type = payload.get("webhook_type")
+    webhook_code = payload.get("webhook_code")
+    item_id = payload.get("item_id")
+    if webhook_type != "TRANSACTIONS" or webhook_code not in SYNC_WEBHOOK_CODES or not item_id:
+        print(f"Ignoring Plaid webhook {webhook_type}/{webhook_code} for item {item_id}")
+        return {"status": "ignored"}
+    if not webhook_processor.enqueue(item_id):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Webhook backlog is full")
+    return {"status": "queued"}
+
+@router.get("/webhook/stats")
+async def get_webhook_stats():
+    """Webhook queue, coalescing and end-to-end lag counters for this worker."""
+    return webhook_processor.stats()
+
+@router.get("/items/{item_id}/sync-status")
+async def get_item_sync_status(item_id: str = Path(...)):
+    """Outcome, duration and backoff state of an item's most recent sync."""
+    plaid_item = await PlaidItem.find_one(PlaidItem.item_id == item_id)
+    if not plaid_item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plaid item not found or access denied")
+    return plaid_item.model_dump(include={
+        "item_id", "last_sync_time", "last_sync_status", "last_sync_duration_ms", "last_sync_error",
+        "last_sync_changes", "consecutive_failures", "next_sync_after",
+    })
+
+@router.get("/refresh/stats")
+async def get_refresh_stats():
+    """Background refresh scheduler counters and last pass summary for this worker."""
+    return refresh_scheduler.stats()
+
+@router.get("/transactions/cache/stats")
+async def get_transactions_cache_stats():
+    """Request coalescing and result cache counters for this worker."""
+    return transaction_service.read_stats()
+
+async def _ndjson(pages: AsyncIterator[List[CompactTransaction]]) -> AsyncIterator[bytes]:
+    """Encodes pages of transactions as newline-delimited JSON, one chunk per page."""
+    async for page in pages:
+        yield b"".join(dumps(t) + b"\n" for t in page)
+
+@router.post("/items/{item_id}/transactions/stream")
+async def stream_transactions(item_id: str = Path(...), request: GetTransactionsRequest = Body(...)):
+    """
+    Streams an item's transactions as NDJSON (one transaction per line, newest first) with
+    O(page) memory. Unlike the list endpoint, no sandbox sampling is applied.
+    """
     plaid_item = await PlaidItem.find_one(PlaidItem.item_id == item_id)
     if not plaid_item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plaid item not found or access denied")
+    # Sync before the response starts so Plaid errors still map to a proper status code
+    if plaid_item.transactions_cursor is None or request.refresh:
+        await transaction_service.sync_item(plaid_item)
+    pages = transaction_service.iter_item_transactions(item_id, request.start_date, request.end_date)
+    return StreamingResponse(_ndjson(pages), media_type="application/x-ndjson")
 
-    # Decrypt access token and fetch transactions
-    access_token = decrypt_token(plaid_item.access_token)
-    transactions = await plaid_service.get_transactions(
-        access_token, request.start_date, request.end_date,
-        min_count=request.min_transactions,
-        max_count=request.max_transactions
+@router.post("/users/{user_id}/transactions/stream")
+async def stream_user_transactions(user_id: str = Path(...), request: GetUserTransactionsRequest = Body(...)):
+    """Streams transactions across all of a user's linked items as NDJSON, merged newest first."""
+    pages = transaction_service.iter_user_transactions(
+        user_id, request.start_date, request.end_date, refresh=request.refresh
     )
-    return TransactionsResponse(transactions=transactions)
+    first_page = await anext(pages, None) # Runs the syncs before the response starts
+
+    async def all_pages() -> AsyncIterator[List[CompactTransaction]]:
+        if first_page:
+            yield first_page
+            async for page in pages:
+                yield page
+
+    return StreamingResponse(_ndjson(all_pages()), media_type="application/x-ndjson")
 
 # Custom sandbox item endpoint
 @router.post("/create_custom_item")
-async def create_custom_item():
+async def create_custom_item(fixture: Optional[str] = Query(None, description="Fixture name (a <name>.json in SANDBOX_FIXTURES_DIR)")):
     """
     Generate a Plaid Sandbox public token for a new item seeded with custom transaction history.
-    Reads transaction data from custom_gig_user.json and uses Plaid's override_history option.
+    Reads transaction data from a named fixture (default: custom_gig_user.json) and uses Plaid's
+    override_history option. Fixtures are parsed once and cached until the file changes.
     """
-    # Correct path relative to the project root (where uvicorn usually runs)
-    json_path = "app/db/custom_gig_user.json"
-    try:
-        # WARNING: The structure of objects in custom_gig_user.json MUST match Plaid's override_history requirements.
-        # See: https://plaid.com/docs/api/sandbox/#sandboxpublictokencreate-request
-        with open(json_path, "r") as f:
-            transactions_data = json.load(f)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"File not found: {json_path}")
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid JSON in {json_path}: {str(e)}")
-
-    if not isinstance(transactions_data, list):
-        raise HTTPException(status_code=400, detail="custom_gig_user.json must contain a list of transaction objects.")
+    # WARNING: The structure of objects in the fixture MUST match Plaid's override_history requirements.
+    # See: https://plaid.com/docs/api/sandbox/#sandboxpublictokencreate-request
+    transactions_data = await fixture_loader.get(fixture or settings.SANDBOX_DEFAULT_FIXTURE)
 
     institution_id = "ins_109508"  # Plaid Test Bank
-    initial_products = [Products("transactions")]
+    initial_products = ["transactions"]
 
     try:
         public_token = await plaid_service.create_sandbox_custom_item(
@@ -109,4 +193,37 @@ async def create_custom_item():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create sandbox item: {str(e)}")
 
-    return {"public_token": public_token}
\ No newline at end of file
+    return {"public_token": public_token}
+
+@router.post("/sandbox/provision", response_model=SandboxProvisionJob, status_code=status.HTTP_202_ACCEPTED)
+async def provision_sandbox(request: SandboxProvisionRequest = Body(...)):
+    """
+    Starts a background job that creates and links `count` sandbox items in bulk (load-test
+    seeding): bounded-concurrency Plaid calls, batched token encryption and one bulk_write per
+    batch. Returns the job at once; poll GET /sandbox/provision/{job_id}. Not available in production.
+    """
+    if settings.PLAID_ENV == "production":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sandbox provisioning is disabled in production")
+    if request.count > settings.PROVISION_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"count must be at most {settings.PROVISION_MAX_ITEMS}; use the CLI for more",
+        )
+    if request.fixture:
+        await fixture_loader.get(request.fixture) # Unknown or invalid fixtures fail here, not in the job
+    return provisioning_jobs.start(
+        request.count, request.user_prefix, request.users, request.fixture, request.concurrency
+    )
+
+@router.get("/sandbox/provision/{job_id}", response_model=SandboxProvisionJob)
+async def get_provision_job(job_id: str = Path(...)):
+    """Status and counts so far of a provisioning job started by this worker."""
+    job = provisioning_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Provisioning job not found")
+    return job
+
+@router.get("/fixtures")
+async def list_fixtures():
+    """Named override histories available to create_custom_item, and the fixture cache state."""
+    return {"fixtures": fixture_loader.names(), "cache": fixture_loader.stats()}
\ No newline at end of file
@@ -0,0 +1,63 @@
+# app/routers/spending.py
+# API endpoints for server-side spending aggregation.
+
+from fastapi import APIRouter, HTTPException, Path, Query, status
+from datetime import date
+from typing import List, Optional
+
+from app.schemas.spending_schemas import SpendingGroupBy, SpendingSummaryResponse
+from app.schemas.timeseries_schemas import (
+    DownsampleMethod, TimeSeriesField, TimeSeriesResolution, TimeSeriesResponse,
+)
+from app.services import spending_service, rollup_service, timeseries_service
+
+router = APIRouter(
+    prefix="/api/v1/spending",
+    tags=["Spending"],
+)
+
+@router.get("/users/{user_id}", response_model=SpendingSummaryResponse)
+async def get_spending_summary(
+    user_id: str = Path(...),
+    start_date: date = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: date = Query(..., description="End date in YYYY-MM-DD format"),
+    group_by: List[SpendingGroupBy] = Query([SpendingGroupBy.CATEGORY], description="One or more groupings"),
+    limit: int = Query(50, ge=1, le=500, description="Max buckets for category/merchant groupings"),
+    include_pending: bool = Query(True),
+):
+    """
+    Returns spending totals for a user, grouped by category, detailed category, merchant,
+    day, week and/or month. Replaces summing raw transactions on the client.
+    """
+    groups = await spending_service.summarize_spending(
+        user_id, start_date, end_date, group_by, limit=limit, include_pending=include_pending
+    )
+    return SpendingSummaryResponse(user_id=user_id, start_date=start_date, end_date=end_date, groups=groups)
+
+@router.post("/users/{user_id}/rollups/check")
+async def check_rollups(user_id: str = Path(...), repair: bool = Query(False)):
+    """
+    Consistency check: rebuilds the user's rollups from raw transactions and reports any
+    missing, unexpected or mismatched buckets. With repair=true, replaces them with the rebuild.
+    """
+    return await rollup_service.check_user_rollups(user_id, repair=repair)
+
+@router.get("/users/{user_id}/timeseries", response_model=TimeSeriesResponse)
+async def get_time_series(
+    user_id: str = Path(...),
+    start_date: date = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: date = Query(..., description="End date in YYYY-MM-DD format"),
+    resolution: TimeSeriesResolution = Query(TimeSeriesResolution.DAY),
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Downsample to about this many points"),
+    method: DownsampleMethod = Query(DownsampleMethod.LTTB),
+    downsample_by: TimeSeriesField = Query(TimeSeriesField.BALANCE, description="Series that picks the kept points"),
+):
+    """
+    Spent, income, net and running balance per day/week/month for the chart components, so they
+    no longer need the raw transaction array. Optionally downsampled server-side.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    return await timeseries_service.get_time_series(
+        user_id, start_date, end_date, resolution, points, method, downsample_by
+    )
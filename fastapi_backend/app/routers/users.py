@@ -7,6 +7,7 @@ from typing import Optional
 from app.models.user_model import User
 from app.schemas.user_schemas import UserResponse
 from app.core.config import settings
+from app.auth.session_cache import session_cache
 
 router = APIRouter(
     prefix="/api/v1/users",
@@ -37,3 +38,8 @@ async def read_users_me():
         print("Accessing /me endpoint in non-dev mode - returning null.")
         return None
 
+
+@router.get("/session-cache/stats")
+async def read_session_cache_stats():
+    """Hit/miss counters and sizes of the session authentication cache for this worker."""
+    return session_cache.stats()
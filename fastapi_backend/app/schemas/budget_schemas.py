@@ -0,0 +1,35 @@
+# app/schemas/budget_schemas.py
+# Pydantic models for budget-related request/response validation.
+
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List
+
+from app.models.budget_category_model import BudgetPeriod
+
+class BudgetUpsertRequest(BaseModel):
+    category: str = Field(..., description="Primary category, e.g. 'Food and Drink'")
+    limit: float = Field(..., ge=0, description="Spending limit per period")
+    period: BudgetPeriod = BudgetPeriod.MONTHLY
+
+class BudgetResponse(BaseModel):
+    category: str
+    limit: float
+    period: BudgetPeriod
+
+class BudgetStatus(BaseModel):
+    category: str
+    period: BudgetPeriod
+    period_start: date
+    period_end: date
+    limit: float
+    spent: float
+    remaining: float
+    percent_used: float
+    over_budget: bool
+
+class BudgetEvaluationResponse(BaseModel):
+    user_id: str
+    as_of: date
+    budgets: List[BudgetStatus]
+    over_budget: List[str] # Categories currently over their limit
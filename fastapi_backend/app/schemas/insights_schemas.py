@@ -0,0 +1,74 @@
+# app/schemas/insights_schemas.py
+# Pydantic models for cash-flow insights: recurring income and subscription detection, and
+# income smoothing with 30/60/90-day cash-flow forecasts.
+
+from pydantic import BaseModel
+from datetime import date, datetime
+from enum import Enum
+from typing import List
+
+class RecurringKind(str, Enum):
+    INCOME = "income" # Regular inflows, e.g. weekly platform payouts
+    SUBSCRIPTION = "subscription" # Regular outflows at a fixed price
+    BILL = "bill" # Regular outflows whose amount varies (utilities, phone)
+
+class RecurringCadence(str, Enum):
+    WEEKLY = "weekly"
+    BIWEEKLY = "biweekly"
+    SEMIMONTHLY = "semimonthly"
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+    ANNUAL = "annual"
+    CUSTOM = "custom" # Regular, but not near a named cadence; see period_days
+
+class RecurringSeries(BaseModel):
+    merchant: str # Normalized merchant (reference codes removed, lowercase)
+    kind: RecurringKind
+    cadence: RecurringCadence
+    period_days: float # Median interval between occurrences
+    occurrences: int # Distinct days seen
+    first_date: date
+    last_date: date
+    next_expected_date: date
+    average_amount: float # Dollars, positive for both directions
+    amount_cv: float # Standard deviation / mean of the amounts
+    regularity: float # Share of intervals close to period_days (0-1)
+    confidence: float # 0-1
+    monthly_amount: float # average_amount scaled to an average month
+    active: bool # Seen within the last one and a half periods
+
+class RecurringResponse(BaseModel):
+    user_id: str
+    as_of: date
+    monthly_recurring_income: float # Sum of monthly_amount over active income series
+    monthly_recurring_expenses: float # Sum over active subscriptions and bills
+    series: List[RecurringSeries]
+
+class IncomeSmoothing(BaseModel):
+    smoothed_monthly_income: float # Trailing 90-day average daily inflow, scaled to an average month
+    smoothed_monthly_spending: float # The same for outflows
+    income_floor_monthly: float # 10th percentile of rolling 30-day inflow totals: a month you can count on
+    income_volatility: float # Coefficient of variation of rolling 30-day inflow totals (0 = steady paycheck)
+
+class ForecastHorizon(BaseModel):
+    days: int # 30, 60 or 90
+    end_date: date # Last forecast day (as_of + days - 1)
+    inflow: float # Expected totals over the horizon, in dollars
+    outflow: float
+    net: float
+    # 80% intervals from the residual spread after removing trend and seasonality; lows are never negative for flows
+    inflow_low: float
+    inflow_high: float
+    outflow_low: float
+    outflow_high: float
+    net_low: float
+    net_high: float
+
+class ForecastResponse(BaseModel):
+    user_id: str
+    as_of: date # First forecast day; history ends the day before
+    history_days: int # Days of history used (0 for a user without transactions)
+    precomputed: bool # Served from the nightly batch rather than computed on request
+    computed_at: datetime
+    smoothing: IncomeSmoothing
+    horizons: List[ForecastHorizon]
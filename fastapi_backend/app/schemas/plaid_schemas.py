@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Any, Dict
-from datetime import date
+from datetime import date, datetime
 
 class UserDataRequest(BaseModel):
     """User data from frontend for simplified authentication"""
@@ -24,7 +24,46 @@ class GetTransactionsRequest(BaseModel):
     min_transactions: Optional[int] = Field(70, description="Minimum number of transactions to return (sandbox only)")
     max_transactions: Optional[int] = Field(100, description="Maximum number of transactions to return (sandbox only)")
     user_data: Optional[UserDataRequest] = None # Pass user info if needed for dev mode
+    refresh: bool = Field(False, description="Sync new changes from Plaid before reading from the local store")
+    page_size: Optional[int] = Field(None, ge=1, le=5000, description="Keyset page size; omit for the whole range")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page")
+    fields: Optional[str] = Field(None, description="Comma-separated sparse fieldset, e.g. 'date,amount,category'")
+
+class GetUserTransactionsRequest(BaseModel):
+    start_date: date = Field(..., description="Start date for transactions in YYYY-MM-DD format")
+    end_date: date = Field(..., description="End date for transactions in YYYY-MM-DD format")
+    refresh: bool = Field(False, description="Sync every item from Plaid before reading from the local store")
+    page_size: Optional[int] = Field(None, ge=1, le=5000, description="Keyset page size; omit for the whole range")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page")
+    fields: Optional[str] = Field(None, description="Comma-separated sparse fieldset, e.g. 'date,amount,category'")
+
+class SandboxProvisionRequest(BaseModel):
+    count: int = Field(..., ge=1, description="Sandbox items to create and link")
+    users: int = Field(1, ge=1, description="Spread the items round-robin over this many users")
+    user_prefix: str = Field("sandbox-user", description="Items belong to '<user_prefix>-<n>'")
+    fixture: Optional[str] = Field(None, description="Override-history fixture name, e.g. custom_gig_user")
+    concurrency: Optional[int] = Field(None, ge=1, le=200, description="Items in Plaid at once (default PROVISION_CONCURRENCY)")
+
+class SandboxProvisionResponse(BaseModel):
+    requested: int
+    created: int = 0
+    existing: int = 0 # item_ids that were already stored (relinked)
+    failed: int = 0
+    batches: int = 0
+    failed_item_ids: List[str] = [] # Exchanged with Plaid but not confirmed written
+    errors: List[str] = [] # First few failures
+    elapsed_s: Optional[float] = None # Set when the run finishes
+    items_per_s: Optional[float] = None
+
+class SandboxProvisionJob(BaseModel):
+    job_id: str
+    status: str # running, succeeded or failed
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None # Why a failed job stopped
+    result: SandboxProvisionResponse # Counts so far while running
 
 class TransactionsResponse(BaseModel):
     transactions: List[Any]
     total_transactions: Optional[int] = None
+    next_cursor: Optional[str] = None # Set when a paginated request has more pages
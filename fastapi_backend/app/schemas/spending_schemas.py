@@ -0,0 +1,27 @@
+# app/schemas/spending_schemas.py
+# Pydantic models for server-side spending aggregation responses.
+
+from pydantic import BaseModel
+from datetime import date
+from enum import Enum
+from typing import Dict, List
+
+class SpendingGroupBy(str, Enum):
+    CATEGORY = "category" # Primary legacy category (category[0]), as used by BudgetTrackerCard
+    DETAILED_CATEGORY = "detailed_category" # personal_finance_category.detailed
+    MERCHANT = "merchant"
+    DAY = "day"
+    WEEK = "week" # Keyed by the Monday that starts the week
+    MONTH = "month" # Keyed by 'YYYY-MM'
+
+class SpendingBucket(BaseModel):
+    key: str
+    spent: float # Sum of outflows (positive Plaid amounts)
+    income: float # Sum of inflows (negative Plaid amounts), as a positive number
+    count: int
+
+class SpendingSummaryResponse(BaseModel):
+    user_id: str
+    start_date: date
+    end_date: date
+    groups: Dict[SpendingGroupBy, List[SpendingBucket]]
@@ -0,0 +1,38 @@
+# app/schemas/timeseries_schemas.py
+# Pydantic models for the downsampled cash-flow time series used by the charts.
+
+from pydantic import BaseModel
+from datetime import date
+from enum import Enum
+from typing import List, Optional
+
+class TimeSeriesResolution(str, Enum):
+    DAY = "day"
+    WEEK = "week" # Buckets start on Monday, like SpendingGroupBy.WEEK
+    MONTH = "month"
+
+class DownsampleMethod(str, Enum):
+    LTTB = "lttb" # Largest-Triangle-Three-Buckets: keeps the visual shape of a line
+    MINMAX = "minmax" # Min and max of each bucket: keeps every spike
+
+class TimeSeriesField(str, Enum):
+    NET = "net"
+    INCOME = "income"
+    SPENT = "spent"
+    BALANCE = "balance"
+
+class TimeSeriesPoint(BaseModel):
+    date: date # First day of the bucket
+    spent: float # Outflows (positive Plaid amounts)
+    income: float # Inflows (negative Plaid amounts), as a positive number
+    net: float # income - spent
+    balance: float # Running sum of net from start_date
+
+class TimeSeriesResponse(BaseModel):
+    user_id: str
+    start_date: date
+    end_date: date
+    resolution: TimeSeriesResolution
+    method: Optional[DownsampleMethod] = None # Set when the series was downsampled
+    source_points: int # Buckets before downsampling
+    points: List[TimeSeriesPoint]
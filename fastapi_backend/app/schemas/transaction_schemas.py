@@ -0,0 +1,88 @@
+# app/schemas/transaction_schemas.py
+# Compact internal representation of a stored transaction, serialized by orjson without the
+# keys of null-only sub-objects.
+
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sub-objects Plaid sends even when every value in them is null
+NULLABLE_SUB_OBJECTS = ("location", "payment_meta", "counterparties", "personal_finance_category")
+
+
+def _is_empty(value: Any) -> bool:
+    if isinstance(value, dict):
+        return all(v is None for v in value.values())
+    if isinstance(value, list):
+        return not value
+    return value is None
+
+
+@dataclass(slots=True)
+class CompactTransaction:
+    """
+    One transaction as returned by the read endpoints. A slots dataclass instead of a dict (no
+    per-row hash table), encoded by orjson via as_dict() without a Pydantic validation pass.
+    Null-only sub-objects (e.g. a `location` whose eight fields are all null) become None and
+    their keys are left out of the JSON. Field order and names match Transaction, minus the
+    storage-only ids.
+    """
+    transaction_id: str
+    account_id: str
+    amount: float
+    date: str
+    authorized_date: Optional[str] = None
+    authorized_datetime: Optional[str] = None
+    datetime: Optional[str] = None
+    name: Optional[str] = None
+    merchant_name: Optional[str] = None
+    merchant_entity_id: Optional[str] = None
+    category: Optional[List[str]] = None
+    category_id: Optional[str] = None
+    personal_finance_category: Optional[Dict[str, Any]] = None
+    personal_finance_category_icon_url: Optional[str] = None
+    pending: bool = False
+    pending_transaction_id: Optional[str] = None
+    payment_channel: Optional[str] = None
+    iso_currency_code: Optional[str] = None
+    unofficial_currency_code: Optional[str] = None
+    account_owner: Optional[str] = None
+    check_number: Optional[str] = None
+    counterparties: Optional[List[Dict[str, Any]]] = None
+    location: Optional[Dict[str, Any]] = None
+    payment_meta: Optional[Dict[str, Any]] = None
+    logo_url: Optional[str] = None
+    website: Optional[str] = None
+    transaction_code: Optional[str] = None
+    transaction_type: Optional[str] = None
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> "CompactTransaction":
+        """Builds from a raw stored document (extra keys such as _id or item_id are ignored)."""
+        values = {name: doc.get(name) for name in FIELD_NAMES}
+        for name in NULLABLE_SUB_OBJECTS:
+            if _is_empty(values[name]):
+                values[name] = None
+        values["pending"] = bool(values["pending"])
+        return cls(**values)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The JSON object for this transaction: every field except null-only sub-objects."""
+        row = dict(zip(FIELD_NAMES, _get_fields(self)))
+        for name in NULLABLE_SUB_OBJECTS:
+            if row[name] is None:
+                del row[name]
+        return row
+
+
+FIELD_NAMES = tuple(f.name for f in fields(CompactTransaction))
+_get_fields = attrgetter(*FIELD_NAMES)
+
+
+def sparse_row(doc: Dict[str, Any], names: Tuple[str, ...]) -> Dict[str, Any]:
+    """A dict with only `names` (a sparse fieldset), null-only sub-objects left out as in as_dict."""
+    row = {name: doc.get(name) for name in names}
+    for name in NULLABLE_SUB_OBJECTS:
+        if name in row and _is_empty(row[name]):
+            del row[name]
+    return row
@@ -0,0 +1,123 @@
+# app/services/access_token_cache.py
+# In-process cache of decrypted Plaid access tokens keyed by item_id, so hot items skip
+# the Fernet HMAC check + AES decrypt (and, via get_tokens, the PlaidItem lookup).
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.models.plaid_item_model import PlaidItem
+from app.utils.encryption import decrypt_tokens
+
+
+class _Entry:
+    __slots__ = ("encrypted", "secret", "expires_at")
+
+    def __init__(self, encrypted: str, secret: bytearray, expires_at: float):
+        self.encrypted = encrypted # Ciphertext the secret was decrypted from
+        self.secret = secret
+        self.expires_at = expires_at
+
+
+class AccessTokenCache:
+    """
+    Size-bounded LRU with a TTL mapping item_id -> decrypted access token.
+
+    Plaintext is held in a bytearray that is overwritten with zeros whenever an entry leaves the
+    cache (expiry, LRU eviction, invalidation or clear), so the cache's own copy never outlives its
+    entry. The str handed to callers is a short-lived per-request copy, as with decrypt_token.
+
+    Each entry remembers the ciphertext it came from. Lookups that already have the PlaidItem pass
+    its access_token and miss if it changed (e.g. a relink handled by another worker).
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    # --- Single entries ---
+    def get(self, item_id: str, encrypted: Optional[str] = None) -> Optional[str]:
+        entry = self._entries.get(item_id)
+        if entry is not None and (entry.expires_at <= time.monotonic()
+                                  or (encrypted is not None and entry.encrypted != encrypted)):
+            self._discard(item_id)
+            entry = None
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(item_id)
+        self.counters["hits"] += 1
+        return entry.secret.decode()
+
+    def put(self, item_id: str, encrypted: str, token: str) -> None:
+        self._discard(item_id)
+        self._entries[item_id] = _Entry(encrypted, bytearray(token.encode()), time.monotonic() + self.ttl)
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+            self.counters["evictions"] += 1
+
+    def invalidate(self, item_id: str) -> None:
+        self._discard(item_id)
+
+    def clear(self) -> None:
+        for item_id in list(self._entries):
+            self._discard(item_id)
+
+    def _discard(self, item_id: str) -> None:
+        entry = self._entries.pop(item_id, None)
+        if entry is not None:
+            entry.secret[:] = bytes(len(entry.secret)) # Zero the plaintext in place
+
+    # --- PlaidItem helpers ---
+    def tokens_for(self, items: Iterable[PlaidItem]) -> Dict[str, str]:
+        """Decrypted tokens for already-loaded items; misses are decrypted in one batch."""
+        tokens: Dict[str, str] = {}
+        misses: List[PlaidItem] = []
+        for item in items:
+            token = self.get(item.item_id, item.access_token)
+            if token is None:
+                misses.append(item)
+            else:
+                tokens[item.item_id] = token
+        tokens.update(self._decrypt(misses))
+        return tokens
+
+    def _decrypt(self, items: List[PlaidItem]) -> Dict[str, str]:
+        tokens = dict(zip((item.item_id for item in items), decrypt_tokens([item.access_token for item in items])))
+        for item in items:
+            self.put(item.item_id, item.access_token, tokens[item.item_id])
+        return tokens
+
+    def token_for(self, item: PlaidItem) -> str:
+        return self.tokens_for([item])[item.item_id]
+
+    async def get_tokens(self, item_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Decrypted tokens by item_id. Hits cost neither a MongoDB read nor a decrypt; misses are
+        loaded with one `$in` query and decrypted in one batch. Unknown item_ids are omitted.
+        """
+        tokens: Dict[str, str] = {}
+        missing: List[str] = []
+        for item_id in item_ids:
+            token = self.get(item_id)
+            if token is None:
+                missing.append(item_id)
+            else:
+                tokens[item_id] = token
+        if missing:
+            items = await PlaidItem.find({"item_id": {"$in": missing}}).to_list()
+            tokens.update(self._decrypt(items))
+        return tokens
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "size": len(self._entries)}
+
+
+# Shared instance used by the transaction and Plaid routes
+access_token_cache = AccessTokenCache(
+    maxsize=settings.ACCESS_TOKEN_CACHE_MAXSIZE,
+    ttl=settings.ACCESS_TOKEN_CACHE_TTL_SECONDS,
+)
@@ -7,6 +7,7 @@ from fastapi import HTTPException, status
 from typing import Dict, Any, Optional
 
 from app.core.config import settings
+from app.utils.metrics import time_upstream
 
 async def exchange_auth0_code(code: str, redirect_uri: str) -> Dict[str, Any]:
     """
@@ -23,7 +24,7 @@ async def exchange_auth0_code(code: str, redirect_uri: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If the code exchange or token validation fails.
     """
-    token_url = f"https://{settings.AUTH0_DOMAIN}/oauth/token"
+    token_url = settings.AUTH0_TOKEN_URL or f"https://{settings.AUTH0_DOMAIN}/oauth/token"
     payload = {
         'grant_type': 'authorization_code',
         'client_id': settings.AUTH0_CLIENT_ID,
@@ -35,8 +36,9 @@ async def exchange_auth0_code(code: str, redirect_uri: str) -> Dict[str, Any]:
 
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.post(token_url, data=payload, headers=headers)
-            response.raise_for_status() # Raise exception for 4XX/5XX responses
+            with time_upstream("auth0", "/oauth/token"):
+                response = await client.post(token_url, data=payload, headers=headers)
+                response.raise_for_status() # Raise exception for 4XX/5XX responses
             token_data = response.json()
         except httpx.RequestError as exc:
             print(f"Error requesting Auth0 token endpoint: {exc}")
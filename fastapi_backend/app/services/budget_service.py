@@ -0,0 +1,192 @@
+# app/services/budget_service.py
+# Service layer for budgets: per-user category limits with running totals that ingestion
+# advances by deltas, and bulk evaluation of spent-vs-limit for the current period.
+
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateMany
+from pymongo.errors import DuplicateKeyError
+
+from app.models.budget_category_model import BudgetCategory, BudgetPeriod
+from app.models.spending_rollup_model import SpendingRollup
+from app.services.rollup_service import BucketKey
+
+REBASE_ATTEMPTS = 5 # Conditional writes tried per budget while ingestion keeps moving its total
+
+
+def period_bounds(period: BudgetPeriod, as_of: date) -> Tuple[date, date]:
+    """First and last day of the budget period containing `as_of`."""
+    if period == BudgetPeriod.WEEKLY:
+        start = as_of - timedelta(days=as_of.weekday())
+        return start, start + timedelta(days=6)
+    last_day = calendar.monthrange(as_of.year, as_of.month)[1]
+    return as_of.replace(day=1), as_of.replace(day=last_day)
+
+
+async def apply_deltas(deltas: Dict[BucketKey, List[int]]) -> int:
+    """
+    Advances running totals from rollup deltas: each (user, category, day) spend delta is added to
+    the matching budget if the day falls inside its current period. One bulk_write per batch.
+    """
+    operations = [
+        UpdateMany(
+            {"user_id": user_id, "category": category,
+             "period_start": {"$lte": day}, "period_end": {"$gte": day}},
+            {"$inc": {"spent_cents": spent, "delta_seq": 1}},
+        )
+        for (user_id, category, day), (spent, _income, _transaction_count) in deltas.items()
+        if spent
+    ]
+    if operations:
+        await BudgetCategory.get_motor_collection().bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def _spent_from_rollups(user_id: str, categories: List[str], start: str, end: str) -> Dict[str, int]:
+    """Sums spent_cents per category over the rollup buckets in [start, end]."""
+    pipeline = [
+        {"$match": {"user_id": user_id, "category": {"$in": categories}, "day": {"$gte": start, "$lte": end}}},
+        {"$group": {"_id": "$category", "spent_cents": {"$sum": "$spent_cents"}}},
+    ]
+    rows = await SpendingRollup.aggregate(pipeline).to_list()
+    return {row["_id"]: row["spent_cents"] for row in rows}
+
+
+async def _rebase(budgets: List[BudgetCategory], as_of: date, persist: bool = True) -> None:
+    """
+    Moves budgets onto the period containing `as_of`, seeding the running total from rollups
+    (O(days x categories), never a transaction scan). With persist=False only the in-memory
+    objects change, e.g. for a historical evaluation.
+
+    Stored budgets are moved with a conditional update of the period fields only (see
+    _store_rebase), so the rest of the document is never overwritten by a whole-document save.
+    """
+    by_window: Dict[Tuple[str, str, str], List[BudgetCategory]] = {}
+    for budget in budgets:
+        start, end = period_bounds(budget.period, as_of)
+        by_window.setdefault((budget.user_id, start.isoformat(), end.isoformat()), []).append(budget)
+
+    for (user_id, start, end), group in by_window.items():
+        spent = await _spent_from_rollups(user_id, [b.category for b in group], start, end)
+        for budget in group:
+            previous_start = budget.period_start
+            budget.period_start, budget.period_end = start, end
+            budget.spent_cents = spent.get(budget.category, 0)
+            if not persist:
+                continue
+            budget.updated_at = datetime.utcnow()
+            if budget.id is None:
+                await budget.insert()
+                continue
+            await _store_rebase(budget, previous_start)
+
+
+async def _store_rebase(budget: BudgetCategory, previous_start: str) -> None:
+    """
+    Writes a rebased total on the period and delta_seq that were read before the rollups. If a
+    concurrent rebase moved the period first, its result is taken; if an apply_deltas $inc landed
+    in between (delta_seq changed), the budget and the rollups are read again and the write retried,
+    so no increment is lost to the overwrite.
+    """
+    collection = BudgetCategory.get_motor_collection()
+    for _ in range(REBASE_ATTEMPTS):
+        result = await collection.update_one(
+            # delta_seq is absent on budgets stored before the field existed
+            {"_id": budget.id, "period_start": previous_start, "delta_seq": budget.delta_seq or {"$in": [0, None]}},
+            {"$set": {"period_start": budget.period_start, "period_end": budget.period_end,
+                      "spent_cents": budget.spent_cents, "updated_at": budget.updated_at}},
+        )
+        if result.matched_count:
+            return
+        raw = await collection.find_one({"_id": budget.id})
+        if raw is None:
+            return # Deleted meanwhile
+        if raw["period_start"] != previous_start: # Another rebase got there first
+            budget.period_start, budget.period_end = raw["period_start"], raw["period_end"]
+            budget.spent_cents, budget.delta_seq = raw["spent_cents"], raw.get("delta_seq", 0)
+            return
+        budget.delta_seq = raw.get("delta_seq", 0)
+        spent = await _spent_from_rollups(budget.user_id, [budget.category], budget.period_start, budget.period_end)
+        budget.spent_cents = spent.get(budget.category, 0)
+    print(f"Budget rebase for {budget.user_id}/{budget.category} kept losing to ingestion; left for the next rebase")
+
+
+async def reseed_budgets(user_id: str) -> None:
+    """Re-derives a user's running totals for their current periods from the rollups, e.g. after a rollup repair."""
+    await _rebase(await list_budgets(user_id), datetime.utcnow().date())
+
+
+async def list_budgets(user_id: str) -> List[BudgetCategory]:
+    return await BudgetCategory.find(BudgetCategory.user_id == user_id).sort(+BudgetCategory.category).to_list()
+
+
+async def upsert_budget(user_id: str, category: str, limit: float, period: BudgetPeriod) -> BudgetCategory:
+    """
+    Creates or updates a budget. Its running total is seeded for the current period when the
+    budget is new or its period changed; a limit-only change keeps the running total.
+    Concurrent creates of the same budget cannot duplicate it (unique index); the one that loses
+    the insert race gets a duplicate key error and is retried as an update.
+    """
+    try:
+        return await _upsert_budget(user_id, category, limit, period)
+    except DuplicateKeyError:
+        return await _upsert_budget(user_id, category, limit, period)
+
+
+async def _upsert_budget(user_id: str, category: str, limit: float, period: BudgetPeriod) -> BudgetCategory:
+    today = datetime.utcnow().date()
+    budget = await BudgetCategory.find_one(BudgetCategory.user_id == user_id, BudgetCategory.category == category)
+    if budget is None:
+        budget = BudgetCategory(user_id=user_id, category=category, limit=limit, period=period,
+                                period_start="", period_end="")
+    else:
+        budget.limit = limit
+        budget.period = period
+        budget.updated_at = datetime.utcnow()
+        await BudgetCategory.get_motor_collection().update_one(
+            {"_id": budget.id},
+            {"$set": {"limit": limit, "period": period.value, "updated_at": budget.updated_at}},
+        )
+    start, end = period_bounds(period, today)
+    if (budget.period_start, budget.period_end) != (start.isoformat(), end.isoformat()):
+        await _rebase([budget], today)
+    return budget
+
+
+async def delete_budget(user_id: str, category: str) -> bool:
+    result = await BudgetCategory.find(
+        BudgetCategory.user_id == user_id, BudgetCategory.category == category
+    ).delete()
+    return bool(result and result.deleted_count)
+
+
+async def evaluate_budgets(user_id: str, as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Evaluates every budget for a user in one call. Budgets whose running total covers the period
+    containing `as_of` are answered from the stored total; only stale ones are rebased from rollups.
+    Stored totals only move forward to today's period; past dates are evaluated without saving.
+    """
+    today = datetime.utcnow().date()
+    as_of = as_of or today
+    budgets = await list_budgets(user_id)
+    stale = [b for b in budgets if not (b.period_start <= as_of.isoformat() <= b.period_end)]
+    if stale:
+        await _rebase(stale, as_of, persist=as_of == today)
+
+    statuses = []
+    for budget in budgets:
+        spent = budget.spent_cents / 100
+        statuses.append({
+            "category": budget.category,
+            "period": budget.period,
+            "period_start": date.fromisoformat(budget.period_start),
+            "period_end": date.fromisoformat(budget.period_end),
+            "limit": budget.limit,
+            "spent": round(spent, 2),
+            "remaining": round(budget.limit - spent, 2),
+            "percent_used": round(100 * spent / budget.limit, 1) if budget.limit else 0.0,
+            "over_budget": spent > budget.limit,
+        })
+    return statuses
@@ -0,0 +1,347 @@
+# app/services/forecast_service.py
+# Income smoothing and 30/60/90-day cash-flow forecasts from the daily spending rollups (the
+# materialized per-day totals of the stored transactions). The model runs on a users x days matrix:
+# trailing rolling means, an additive trend + weekday + day-of-month decomposition and the residual
+# spread, so a chunk of users is one NumPy call. Nightly, from cron, for the whole user base:
+#   python -m app.services.forecast_service --workers 4 --chunk-size 500
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.models.forecast_model import CashFlowForecast
+from app.models.spending_rollup_model import SpendingRollup
+from app.utils.versioned_cache import VersionedCache
+
+HORIZONS: Tuple[int, ...] = (30, 60, 90)
+TREND_WINDOW = 28 # Whole weeks, so the weekday pattern cancels out of the trend
+LEVEL_WINDOW = 90 # Trailing days averaged into the smoothed level the forecast starts from
+MONTH_WINDOW = 30 # Rolling inflow totals behind the income floor and volatility
+SEASONAL_SHRINK = 1.0 # Pseudo-observations pulling weekday/day-of-month effects with little data toward 0
+BACKFIT_PASSES = 3
+INTERVAL_Z = 1.2816 # Two-sided 80% normal interval
+FLOOR_PERCENTILE = 10
+AVERAGE_MONTH_DAYS = 30.44
+
+HORIZON_FIELDS = ("inflow", "outflow", "net", "inflow_low", "inflow_high", "outflow_low", "outflow_high",
+                  "net_low", "net_high")
+SMOOTHING_FIELDS = ("smoothed_monthly_income", "smoothed_monthly_spending", "income_floor_monthly",
+                    "income_volatility")
+
+_cache = VersionedCache(maxsize=settings.FORECAST_CACHE_MAXSIZE, ttl=settings.FORECAST_CACHE_TTL_SECONDS)
+
+_EPOCH = date(1970, 1, 1)
+
+# Forecasts whose mark needs (re)setting: unmarked, or marked before a precompute chunk read their
+# rollups (that chunk must not store). Anything else is already hidden and already blocks every
+# chunk that read earlier, so it is left alone
+_NEEDS_MARK = {"$expr": {"$or": [
+    {"$eq": [{"$ifNull": ["$invalidated_at", None]}, None]},
+    {"$lt": ["$invalidated_at", "$read_started_at"]},
+]}}
+
+
+async def invalidate_precomputed(user_ids: List[str]) -> None:
+    """
+    Marks stored forecasts stale; a nightly run that read the old rollups will not overwrite the mark.
+    Only marks that are missing or older than the last precompute read are written, so a user's
+    syncs between two nightly runs pay for one mark. A user with no stored forecast yet gets a
+    mark-only document, so a chunk computing their first forecast from the old rollups cannot
+    store it afterwards ($setOnInsert: a no-op for users who already have one).
+    """
+    now = datetime.utcnow()
+    collection = CashFlowForecast.get_motor_collection()
+    operations = [UpdateMany({"user_id": {"$in": user_ids}, **_NEEDS_MARK}, {"$set": {"invalidated_at": now}})]
+    operations += [UpdateOne({"user_id": user_id}, {"$setOnInsert": {"invalidated_at": now}}, upsert=True)
+                   for user_id in user_ids]
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        # A concurrent upsert (possibly a nightly chunk's) created the document first; mark it now
+        await collection.update_many(
+            {"user_id": {"$in": [user_ids[error["index"] - 1] for error in errors]}, **_NEEDS_MARK},
+            {"$set": {"invalidated_at": now}},
+        )
+
+
+# --- Model ---
+def _trailing_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Per row, the sum over the `window` columns ending at each column (fewer at the start)."""
+    cumulative = np.zeros((x.shape[0], x.shape[1] + 1))
+    np.cumsum(x, axis=1, out=cumulative[:, 1:])
+    ends = np.arange(1, x.shape[1] + 1)
+    return cumulative[:, ends] - cumulative[:, np.maximum(ends - window, 0)]
+
+
+def _calendar(first_day: int, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Weekday (Monday = 0) and day of month (0-30) of `length` consecutive epoch days."""
+    days = np.arange(first_day, first_day + length)
+    dates = days.astype("datetime64[D]")
+    # 1970-01-01 was a Thursday, so (days since epoch + 3) % 7 is the weekday with Monday = 0
+    return (days + 3) % 7, (dates - dates.astype("datetime64[M]")).astype(np.int64)
+
+
+def _seasonal_effect(values: np.ndarray, observed: np.ndarray, slot: np.ndarray, slots: int) -> np.ndarray:
+    """
+    Per row, the mean of `values` in each calendar slot (weekday or day of month), shrunk toward 0
+    by SEASONAL_SHRINK pseudo-observations and centered over the slots seen. Two matrix products
+    against a one-hot slot matrix, for every user at once.
+    """
+    onehot = np.zeros((len(slot), slots))
+    onehot[np.arange(len(slot)), slot] = 1
+    counts = observed @ onehot
+    effect = ((values * observed) @ onehot) / (counts + SEASONAL_SHRINK)
+    seen = counts > 0
+    center = (effect * seen).sum(axis=1, keepdims=True) / np.maximum(seen.sum(axis=1, keepdims=True), 1)
+    return np.where(seen, effect - center, 0.0)
+
+
+def forecast_matrix(inflow: np.ndarray, outflow: np.ndarray, first_active: np.ndarray, first_day: int,
+                    horizons: Sequence[int] = HORIZONS) -> Dict[str, np.ndarray]:
+    """
+    Forecasts for a batch of users in one pass. `inflow` and `outflow` are (users, days) daily
+    cents whose columns are consecutive days from epoch day `first_day` up to the day before the
+    first forecast day. `first_active` is each user's first column with history: earlier columns are
+    ignored, later days without transactions count as zero.
+
+    Per flow: trend = trailing TREND_WINDOW mean; weekday and then day-of-month effects are the
+    shrunk slot means of what the trend leaves; the residual spread gives the intervals. The
+    forecast is the trailing LEVEL_WINDOW mean plus the seasonal effects of each future day,
+    summed per horizon and clipped at 0. Returns arrays of one value per user (dollars), keyed
+    "history_days", "<field>_<horizon>" for HORIZON_FIELDS and the SMOOTHING_FIELDS.
+    """
+    users, length = inflow.shape
+    observed = (np.arange(length)[None, :] >= first_active[:, None]).astype(np.float64)
+    history_days = observed.sum(axis=1)
+    weekday, day_of_month = _calendar(first_day, length)
+    future_weekday, future_day_of_month = _calendar(first_day + length, max(horizons))
+    in_window = np.maximum(_trailing_sums(observed, TREND_WINDOW), 1)
+    level_days = np.maximum(observed[:, -LEVEL_WINDOW:].sum(axis=1), 1)
+
+    result: Dict[str, np.ndarray] = {"history_days": history_days}
+    totals: Dict[str, np.ndarray] = {}
+    sigma: Dict[str, np.ndarray] = {}
+    levels: Dict[str, np.ndarray] = {}
+    for flow, cents in (("inflow", inflow), ("outflow", outflow)):
+        x = cents.astype(np.float64) / 100 * observed
+        detrended = (x - _trailing_sums(x, TREND_WINDOW) / in_window) * observed
+        # Backfitting: each effect is re-estimated without the other, so monthly spikes (rent on
+        # the 1st) do not leak into the weekday effect of whichever weekdays they happened to fall on
+        monthly = np.zeros((users, 31))
+        for _ in range(BACKFIT_PASSES):
+            weekly = _seasonal_effect(detrended - monthly[:, day_of_month], observed, weekday, 7)
+            monthly = _seasonal_effect(detrended - weekly[:, weekday], observed, day_of_month, 31)
+        residual = (detrended - weekly[:, weekday] - monthly[:, day_of_month]) * observed
+        sigma[flow] = np.sqrt((residual ** 2).sum(axis=1) / np.maximum(history_days - 1, 1))
+        levels[flow] = x[:, -LEVEL_WINDOW:].sum(axis=1) / level_days
+        daily = levels[flow][:, None] + weekly[:, future_weekday] + monthly[:, future_day_of_month]
+        # Clipped as totals, not per day: clipping the quiet days between lumpy payouts would bias upward
+        totals[flow] = np.maximum(np.cumsum(daily, axis=1), 0)
+
+    for h in horizons:
+        for flow in ("inflow", "outflow"):
+            expected = totals[flow][:, h - 1]
+            band = INTERVAL_Z * sigma[flow] * np.sqrt(h)
+            result[f"{flow}_{h}"] = expected
+            result[f"{flow}_low_{h}"] = np.maximum(expected - band, 0)
+            result[f"{flow}_high_{h}"] = expected + band
+        net = totals["inflow"][:, h - 1] - totals["outflow"][:, h - 1]
+        band = INTERVAL_Z * np.hypot(sigma["inflow"], sigma["outflow"]) * np.sqrt(h)
+        result[f"net_{h}"] = net
+        result[f"net_low_{h}"] = net - band
+        result[f"net_high_{h}"] = net + band
+
+    # Income smoothing: what a month of this user's income looks like once the lumps are averaged out
+    monthly_income = _trailing_sums(inflow.astype(np.float64) / 100 * observed, MONTH_WINDOW)
+    full = _trailing_sums(observed, MONTH_WINDOW) >= MONTH_WINDOW
+    months = full.sum(axis=1)
+    mean = (monthly_income * full).sum(axis=1) / np.maximum(months, 1)
+    spread = np.sqrt((((monthly_income - mean[:, None]) * full) ** 2).sum(axis=1) / np.maximum(months, 1))
+    result["smoothed_monthly_income"] = levels["inflow"] * AVERAGE_MONTH_DAYS
+    result["smoothed_monthly_spending"] = levels["outflow"] * AVERAGE_MONTH_DAYS
+    # Under MONTH_WINDOW days of history there is no full month yet: fall back to the smoothed level
+    floor = result["smoothed_monthly_income"].copy()
+    has_month = months > 0
+    if has_month.any():
+        floor[has_month] = np.nanpercentile(np.where(full, monthly_income, np.nan)[has_month], FLOOR_PERCENTILE, axis=1)
+    result["income_floor_monthly"] = floor
+    result["income_volatility"] = np.where(mean > 0, spread / np.where(mean > 0, mean, 1), 0.0)
+    return result
+
+
+# --- Data ---
+async def _daily_matrix(user_ids: Sequence[str], as_of: date) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Dense (users, FORECAST_HISTORY_DAYS) inflow and outflow cents for the days before as_of from one
+    rollup aggregation, each user's first active column and the epoch day of column 0.
+    """
+    length = settings.FORECAST_HISTORY_DAYS
+    start = as_of - timedelta(days=length)
+    pipeline = [
+        {"$match": {"user_id": {"$in": list(user_ids)},
+                    "day": {"$gte": start.isoformat(), "$lt": as_of.isoformat()}}},
+        {"$group": {"_id": {"user_id": "$user_id", "day": "$day"},
+                    "spent": {"$sum": "$spent_cents"}, "income": {"$sum": "$income_cents"}}},
+    ]
+    rows = await SpendingRollup.aggregate(pipeline).to_list()
+
+    inflow = np.zeros((len(user_ids), length), dtype=np.int64)
+    outflow = np.zeros((len(user_ids), length), dtype=np.int64)
+    first_active = np.full(len(user_ids), length, dtype=np.int64) # No rows: no observed days
+    if rows:
+        index = {user_id: i for i, user_id in enumerate(user_ids)}
+        users = np.array([index[row["_id"]["user_id"]] for row in rows])
+        offsets = (np.array([row["_id"]["day"] for row in rows], dtype="datetime64[D]")
+                   - np.datetime64(start, "D")).astype(np.int64)
+        inflow[users, offsets] = [row["income"] for row in rows]
+        outflow[users, offsets] = [row["spent"] for row in rows]
+        np.minimum.at(first_active, users, offsets)
+    return inflow, outflow, first_active, (start - _EPOCH).days
+
+
+def _response(user_id: str, as_of: date, values: Dict[str, float], precomputed: bool,
+              computed_at: datetime) -> Dict[str, Any]:
+    """A ForecastResponse-shaped dict from one user's forecast_matrix values."""
+    return {
+        "user_id": user_id,
+        "as_of": as_of,
+        "history_days": int(values["history_days"]),
+        "precomputed": precomputed,
+        "computed_at": computed_at,
+        "smoothing": {
+            name: round(values[name], 3 if name == "income_volatility" else 2) for name in SMOOTHING_FIELDS
+        },
+        "horizons": [
+            {"days": h, "end_date": as_of + timedelta(days=h - 1),
+             **{name: round(values[f"{name}_{h}"], 2) for name in HORIZON_FIELDS}}
+            for h in HORIZONS
+        ],
+    }
+
+
+# --- Entry points ---
+async def get_forecast(user_id: str, as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    A user's forecast from as_of (default today) as a ForecastResponse-shaped dict. Served from the
+    nightly precompute when it exists for that day and no transactions changed since; otherwise
+    computed on request (one small rollup query and a one-row forecast_matrix). Cached until the TTL
+    or the next change to the user's transactions.
+    """
+    as_of = as_of or date.today()
+    version = _cache.version(user_id)
+    cached = _cache.get(user_id, as_of)
+    if cached is not None:
+        return cached
+
+    stored = await CashFlowForecast.get_motor_collection().find_one(
+        {"user_id": user_id, "as_of": as_of.isoformat(), "invalidated_at": None}
+    )
+    if stored:
+        values = {**stored["values"], "history_days": stored["history_days"]}
+        result = _response(user_id, as_of, values, True, stored["computed_at"])
+    else:
+        matrix = forecast_matrix(*await _daily_matrix([user_id], as_of))
+        result = _response(user_id, as_of, {name: float(v[0]) for name, v in matrix.items()}, False,
+                           datetime.utcnow())
+    _cache.put(user_id, as_of, result, version)
+    return result
+
+
+async def _store_chunk(user_ids: Sequence[str], as_of: date, matrix: Dict[str, np.ndarray],
+                       read_at: datetime, result: Dict[str, Any]) -> None:
+    """
+    Upserts one chunk's forecasts. A forecast invalidated after its rollups were read (`read_at`)
+    does not match the filter, so its upsert fails on the unique user_id and the mark is kept.
+    """
+    history_days = matrix.pop("history_days")
+    columns = {name: values.tolist() for name, values in matrix.items()}
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "$or": [{"invalidated_at": None}, {"invalidated_at": {"$lt": read_at}}]},
+            {"$set": {"as_of": as_of.isoformat(), "history_days": int(history_days[i]),
+                      "values": {name: values[i] for name, values in columns.items()},
+                      "computed_at": read_at, "invalidated_at": None}},
+            upsert=True,
+        )
+        for i, user_id in enumerate(user_ids)
+    ]
+    try:
+        written = await CashFlowForecast.get_motor_collection().bulk_write(operations, ordered=False)
+        result["written"] += written.upserted_count + written.matched_count
+    except BulkWriteError as e:
+        result["written"] += e.details.get("nUpserted", 0) + e.details.get("nMatched", 0)
+        result["skipped"] += len(e.details.get("writeErrors", []))
+
+
+async def precompute_forecasts(user_ids: Optional[Sequence[str]] = None, as_of: Optional[date] = None,
+                               workers: Optional[int] = None, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Forecasts every user with rollups (or `user_ids`) from as_of and stores them for get_forecast.
+
+    Users are processed in chunks of `chunk_size`: one rollup aggregation per chunk in this process,
+    then forecast_matrix for the whole chunk in a pool of `workers` processes, so the NumPy work runs
+    on every core while the next chunks are read. At most two chunks per worker are in memory.
+    Returns counts (users, chunks, written, skipped: invalidated while computing) and the timing.
+    """
+    as_of = as_of or date.today()
+    workers = workers or settings.FORECAST_PRECOMPUTE_WORKERS
+    chunk_size = chunk_size or settings.FORECAST_PRECOMPUTE_CHUNK_SIZE
+    if user_ids is None:
+        cursor = SpendingRollup.get_motor_collection().aggregate([{"$group": {"_id": "$user_id"}}])
+        user_ids = sorted([doc["_id"] async for doc in cursor])
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+    result: Dict[str, Any] = {"users": len(user_ids), "chunks": len(chunks), "written": 0, "skipped": 0}
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(2 * workers)
+    start = time.perf_counter()
+    # Spawned, not forked: workers only need NumPy and must not inherit the Motor client's threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        async def run_chunk(chunk: Sequence[str]) -> None:
+            async with semaphore:
+                read_at = datetime.utcnow()
+                # Before reading, so a change after this point refreshes an older mark and blocks the store
+                await CashFlowForecast.get_motor_collection().update_many(
+                    {"user_id": {"$in": list(chunk)}}, {"$set": {"read_started_at": read_at}}
+                )
+                arrays = await _daily_matrix(chunk, as_of)
+                matrix = await loop.run_in_executor(pool, forecast_matrix, *arrays)
+                await _store_chunk(chunk, as_of, matrix, read_at, result)
+
+        await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+
+    result["elapsed_s"] = round(time.perf_counter() - start, 2)
+    result["users_per_s"] = round(result["users"] / result["elapsed_s"], 1) if result["elapsed_s"] else None
+    print(f"Precomputed {result['written']}/{result['users']} forecasts as of {as_of} in {result['elapsed_s']}s "
+          f"({result['skipped']} skipped)")
+    return result
+
+
+async def _main() -> None:
+    from app.db.database import init_db
+
+    parser = argparse.ArgumentParser(description="Precompute cash-flow forecasts for all users")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="First forecast day (default: today)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--user", action="append", dest="user_ids", help="Only these users (repeatable)")
+    args = parser.parse_args()
+
+    await init_db()
+    await precompute_forecasts(args.user_ids, args.as_of, args.workers, args.chunk_size)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,90 @@
+# app/services/item_service.py
+# Stores linked Plaid items. Every flow that ends with an access token (Link, relink/update mode
+# and bulk provisioning) writes the PlaidItem through the same atomic upsert on the unique item_id.
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.models.plaid_item_model import PlaidItem
+from app.services.access_token_cache import access_token_cache
+from app.services.plaid_service import plaid_service
+from app.utils.encryption import encrypt_token
+from app.utils.singleflight import SingleFlight
+
+# Set on every link: a new token replaces the old one and clears any backoff left by failed
+# syncs (a relink is usually what fixes ITEM_LOGIN_REQUIRED)
+_LINK_SET_FIELDS = ("access_token", "updated_at", "consecutive_failures", "next_sync_after")
+_NOT_STORED = ("id", "revision_id")
+
+# Double-submitted public tokens (Link callbacks fire twice, users double-click) join the exchange
+# still in flight; keyed by owner too, so another user's submission never gets this user's item.
+# No result cache: Plaid rejects a later exchange of the single-use token itself
+_exchange_flights = SingleFlight()
+
+
+def link_update(item_id: str, user_id: str, encrypted_access_token: str,
+                now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Update document for upserting a linked item on {"item_id": item_id}. The new token is always
+    set; the owner, created_at and the other model defaults are only written when the item is new.
+    """
+    now = now or datetime.utcnow()
+    on_insert = {
+        name: field.get_default(call_default_factory=True)
+        for name, field in PlaidItem.model_fields.items()
+        if name not in _LINK_SET_FIELDS and name not in _NOT_STORED
+    }
+    on_insert.update(item_id=item_id, user_id=user_id, created_at=now)
+    return {
+        "$set": {"access_token": encrypted_access_token, "updated_at": now,
+                 "consecutive_failures": 0, "next_sync_after": None},
+        "$setOnInsert": on_insert,
+    }
+
+
+def link_upsert_op(item_id: str, user_id: str, encrypted_access_token: str,
+                   now: Optional[datetime] = None) -> UpdateOne:
+    """The same upsert as a bulk_write operation (bulk provisioning)."""
+    return UpdateOne({"item_id": item_id}, link_update(item_id, user_id, encrypted_access_token, now), upsert=True)
+
+
+async def upsert_linked_item(item_id: str, user_id: str, access_token: str,
+                             encrypted_access_token: Optional[str] = None) -> PlaidItem:
+    """
+    Creates or relinks an item in one findAndModify round trip and returns the stored document.
+    Concurrent upserts of the same item_id cannot create duplicates (unique index); the one that
+    loses the insert race gets a duplicate key error and is retried as an update.
+    """
+    encrypted = encrypted_access_token or encrypt_token(access_token)
+    collection = PlaidItem.get_motor_collection()
+    update = link_update(item_id, user_id, encrypted)
+    try:
+        raw = await collection.find_one_and_update(
+            {"item_id": item_id}, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raw = await collection.find_one_and_update(
+            {"item_id": item_id}, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    # Replace any cached token for this item (relink) with the one just stored
+    access_token_cache.put(item_id, encrypted, access_token)
+    return PlaidItem.model_validate(raw)
+
+
+async def link_public_token(public_token: str, user_id: str) -> PlaidItem:
+    """
+    Exchanges a Link public token and stores the item. Identical concurrent submissions by the same
+    user share one Plaid exchange and one write.
+    """
+    async def exchange() -> PlaidItem:
+        access_token, item_id = await plaid_service.exchange_public_token(public_token)
+        return await upsert_linked_item(item_id, user_id, access_token)
+
+    return await _exchange_flights.do((public_token, user_id), exchange)
+
+
+def stats() -> Dict[str, int]:
+    return _exchange_flights.stats()
@@ -0,0 +1,121 @@
+# app/services/plaid_client.py
+# Asynchronous HTTP client for the subset of the Plaid API used by PlaidService.
+# Replaces the blocking plaid-python SDK calls so a slow Plaid request never stalls the event loop.
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.utils.metrics import time_upstream, upstream_errors
+
+PLAID_API_VERSION = "2020-09-14"
+
+
+class PlaidApiError(Exception):
+    """Plaid answered with a non-2xx status. Mirrors plaid.ApiException's `status`/`body`."""
+
+    def __init__(self, status: int, body: Any):
+        super().__init__(f"Plaid API error ({status}): {body}")
+        self.status = status
+        self.body = body
+
+
+class PlaidUnavailableError(PlaidApiError):
+    """Plaid could not be reached in time (timeout, connection error or local back-pressure)."""
+
+
+class AsyncPlaidClient:
+    """
+    Thin async wrapper around Plaid's JSON-over-HTTP API.
+
+    One instance holds a single keep-alive connection pool that is shared by every request
+    on the worker. `max_concurrency` bounds the number of in-flight Plaid calls; callers that
+    cannot get a slot within `queue_timeout` seconds fail fast instead of piling up.
+    """
+
+    def __init__(self, host: str, client_id: str, secret: str,
+                 timeout: float = 30.0, max_connections: int = 20,
+                 max_concurrency: int = 10, queue_timeout: float = 10.0):
+        self.host = host.rstrip("/")
+        self._credentials = {"client_id": client_id, "secret": secret}
+        self._timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue_timeout = queue_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool is bound to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.host,
+                timeout=self._timeout,
+                limits=self._limits,
+                headers={"Plaid-Version": PLAID_API_VERSION},
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Closes the shared connection pool. Safe to call more than once."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POSTs `payload` (plus credentials) to a Plaid endpoint and returns the decoded JSON body."""
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self._queue_timeout)
+        except asyncio.TimeoutError:
+            raise PlaidUnavailableError(503, {"error_message": "Too many concurrent Plaid requests"})
+
+        try:
+            with time_upstream("plaid", path):
+                response = await self._get_client().post(path, json={**self._credentials, **payload})
+        except httpx.TimeoutException as e:
+            raise PlaidUnavailableError(504, {"error_message": f"Plaid request to {path} timed out: {e!r}"})
+        except httpx.TransportError as e:
+            raise PlaidUnavailableError(503, {"error_message": f"Could not reach Plaid at {path}: {e!r}"})
+        finally:
+            self._semaphore.release()
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        if response.status_code >= 400:
+            upstream_errors.inc(upstream="plaid", operation=path)
+            raise PlaidApiError(response.status_code, body)
+        return body
+
+    # --- Endpoints ---
+    async def link_token_create(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.post("/link/token/create", request)
+
+    async def item_public_token_exchange(self, public_token: str) -> Dict[str, Any]:
+        return await self.post("/item/public_token/exchange", {"public_token": public_token})
+
+    async def transactions_get(self, access_token: str, start_date: str, end_date: str,
+                               options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload = {"access_token": access_token, "start_date": start_date, "end_date": end_date}
+        if options:
+            payload["options"] = options
+        return await self.post("/transactions/get", payload)
+
+    async def webhook_verification_key_get(self, key_id: str) -> Dict[str, Any]:
+        return await self.post("/webhook_verification_key/get", {"key_id": key_id})
+
+    async def transactions_sync(self, access_token: str, cursor: Optional[str] = None,
+                                count: int = 500) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"access_token": access_token, "count": count}
+        if cursor:
+            payload["cursor"] = cursor
+        return await self.post("/transactions/sync", payload)
+
+    async def sandbox_public_token_create(self, institution_id: str, initial_products: List[str],
+                                          options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload = {"institution_id": institution_id, "initial_products": initial_products}
+        if options:
+            payload["options"] = options
+        return await self.post("/sandbox/public_token/create", payload)
@@ -1,22 +1,28 @@
-import plaid
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import HTTPException, status
-from plaid.api import plaid_api
-from plaid.model.products import Products
 from app.core.config import settings
-from plaid import ApiClient, Configuration  # removed Environment import
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-from plaid.model.link_token_create_request_update import LinkTokenCreateRequestUpdate
-from plaid.model.country_code import CountryCode
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
-from plaid.model.sandbox_public_token_create_request import SandboxPublicTokenCreateRequest
-from plaid.model.sandbox_public_token_create_request_options import SandboxPublicTokenCreateRequestOptions
+from app.services.plaid_client import AsyncPlaidClient, PlaidApiError, PlaidUnavailableError
 import random
 from datetime import date
 
+# Plaid error returned when the item changed while we were paging; the sync must restart from the first cursor
+SYNC_MUTATION_ERROR = "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"
+SYNC_PAGE_SIZE = 500 # Plaid's maximum page size for /transactions/sync
+
+def _unavailable(e: PlaidUnavailableError) -> HTTPException:
+    """Maps a timeout/back-pressure failure from the Plaid client to a 503/504 response."""
+    detail = e.body.get('error_message') if isinstance(e.body, dict) else str(e.body)
+    return HTTPException(status_code=e.status, detail=f"Plaid unavailable: {detail}")
+
+
+def sample_sandbox_transactions(transactions: List[Dict[str, Any]], min_count: int, max_count: int) -> List[Dict[str, Any]]:
+    """In sandbox, returns a random min_count..max_count subset so demo dashboards vary between loads."""
+    if settings.PLAID_ENV.lower() == 'sandbox' and len(transactions) >= min_count:
+        if len(transactions) > max_count:
+            count = random.randint(min_count, max_count)
+            transactions = random.sample(transactions, count)
+    return transactions
+
 
 class PlaidService:
     def __init__(self):
@@ -25,7 +31,9 @@ class PlaidService:
         print(f"[PlaidService Init] PLAID_ENV from settings: '{plaid_env_setting}'")
 
         # Determine the Plaid host URL directly from the setting string
-        if plaid_env_setting == "development":
+        if settings.PLAID_HOST: # Explicit override, e.g. a local fake Plaid server for benchmarks
+            plaid_host_url = settings.PLAID_HOST
+        elif plaid_env_setting == "development":
             plaid_host_url = "https://development.plaid.com"
         elif plaid_env_setting == "production":
             plaid_host_url = "https://production.plaid.com"
@@ -36,29 +44,37 @@ class PlaidService:
 
         print(f"[PlaidService Init] Using Plaid host URL: {plaid_host_url}")
 
-        configuration = Configuration(
-            host=plaid_host_url, # Pass the URL string directly
-            api_key={
-                'clientId': settings.PLAID_CLIENT_ID,
-                'secret': settings.PLAID_SECRET_KEY
-            }
+        self.client = AsyncPlaidClient(
+            host=plaid_host_url,
+            client_id=settings.PLAID_CLIENT_ID,
+            secret=settings.PLAID_SECRET_KEY,
+            timeout=settings.PLAID_TIMEOUT_SECONDS,
+            max_connections=settings.PLAID_MAX_CONNECTIONS,
+            max_concurrency=settings.PLAID_MAX_CONCURRENCY,
+            queue_timeout=settings.PLAID_QUEUE_TIMEOUT_SECONDS,
         )
-        api_client = ApiClient(configuration)
-        self.client = plaid_api.PlaidApi(api_client)
         print(f"Plaid client initialized successfully for environment: {settings.PLAID_ENV} -> {plaid_host_url}")
 
+    async def aclose(self) -> None:
+        """Releases the shared Plaid connection pool (called on application shutdown)."""
+        await self.client.aclose()
+
     async def create_link_token(self, user_id: str) -> str:
         try:
-            request = LinkTokenCreateRequest(
-                user=LinkTokenCreateRequestUser(client_user_id=user_id),
-                client_name="DragonHacks Finance App",
-                products=[Products("transactions")],
-                country_codes=[CountryCode("US")],
-                language="en",
-            )
-            response = self.client.link_token_create(request)
-            return response.link_token
-        except plaid.ApiException as e:
+            request = {
+                "user": {"client_user_id": user_id},
+                "client_name": "DragonHacks Finance App",
+                "products": ["transactions"],
+                "country_codes": ["US"],
+                "language": "en",
+            }
+            if settings.PLAID_WEBHOOK_URL: # Items linked with this token push SYNC_UPDATES_AVAILABLE
+                request["webhook"] = settings.PLAID_WEBHOOK_URL
+            response = await self.client.link_token_create(request)
+            return response["link_token"]
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError as e:
             if e.status == 400:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,17 +88,18 @@ class PlaidService:
 
     async def create_update_link_token(self, user_id: str, access_token: str) -> str:
         try:
-            request = LinkTokenCreateRequest(
-                user=LinkTokenCreateRequestUser(client_user_id=user_id),
-                client_name="DragonHacks Finance App",
-                country_codes=[CountryCode("US")],
-                language="en",
-                access_token=access_token,
-                update=LinkTokenCreateRequestUpdate()
-            )
-            response = self.client.link_token_create(request)
-            return response.link_token
-        except plaid.ApiException as e:
+            response = await self.client.link_token_create({
+                "user": {"client_user_id": user_id},
+                "client_name": "DragonHacks Finance App",
+                "country_codes": ["US"],
+                "language": "en",
+                "access_token": access_token,
+                "update": {},
+            })
+            return response["link_token"]
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError as e:
             if e.status == 400:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -96,60 +113,117 @@ class PlaidService:
 
     async def exchange_public_token(self, public_token: str) -> Tuple[str, str]:
         try:
-            request = ItemPublicTokenExchangeRequest(public_token=public_token)
-            response = self.client.item_public_token_exchange(request)
-            return response.access_token, response.item_id
-        except plaid.ApiException as e:
+            response = await self.client.item_public_token_exchange(public_token)
+            return response["access_token"], response["item_id"]
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Plaid API error: {e.body}"
             )
 
+    async def get_webhook_verification_key(self, key_id: str) -> Optional[Dict[str, Any]]:
+        """The JWK Plaid signs webhooks with under `key_id`, or None if Plaid does not know the key."""
+        try:
+            response = await self.client.webhook_verification_key_get(key_id)
+            return response["key"]
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError:
+            return None
+
     async def get_transactions(self, access_token: str, start_date: date, end_date: date,
                                min_count: int = 70, max_count: int = 100) -> List[Dict[str, Any]]:
         try:
-            request = TransactionsGetRequest(
-                access_token=access_token,
-                start_date=start_date,
-                end_date=end_date,
-                options=TransactionsGetRequestOptions(count=max_count)
+            response = await self.client.transactions_get(
+                access_token,
+                start_date.isoformat(),
+                end_date.isoformat(),
+                options={"count": max_count}
             )
-            response = self.client.transactions_get(request)
-            transactions = response.transactions
-            if settings.PLAID_ENV.lower() == 'sandbox' and len(transactions) >= min_count:
-                if len(transactions) > max_count:
-                    count = random.randint(min_count, max_count)
-                    transactions = random.sample(transactions, count)
-            return [t.to_dict() for t in transactions]
-        except plaid.ApiException as e:
+            return sample_sandbox_transactions(response["transactions"], min_count, max_count)
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError as e:
             detail = e.body.get('error_message') if isinstance(e.body, dict) else str(e.body)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Plaid API error: {detail}"
             )
 
-    async def create_sandbox_custom_item(self, institution_id: str, initial_products: List[Products], transaction_history: List[dict]) -> str:
+    async def sync_transactions(self, access_token: str, cursor: Optional[str]
+                                ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[str], str]:
+        """
+        Pages through /transactions/sync starting at `cursor` (None = full history).
+
+        Returns:
+            (added, modified, removed transaction_ids, next_cursor) accumulated over all pages.
+        """
+        start_cursor = cursor
+        added: List[Dict[str, Any]] = []
+        modified: List[Dict[str, Any]] = []
+        removed: List[str] = []
+        has_more = True
+        while has_more:
+            try:
+                page = await self.client.transactions_sync(access_token, cursor, count=SYNC_PAGE_SIZE)
+            except PlaidUnavailableError as e:
+                raise _unavailable(e)
+            except PlaidApiError as e:
+                if isinstance(e.body, dict) and e.body.get('error_code') == SYNC_MUTATION_ERROR:
+                    print(f"Transactions changed during sync pagination, restarting from cursor {start_cursor!r}")
+                    cursor, added, modified, removed, has_more = start_cursor, [], [], [], True
+                    continue
+                detail = e.body.get('error_message') if isinstance(e.body, dict) else str(e.body)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Plaid API error: {detail}"
+                )
+            added.extend(page.get("added", []))
+            modified.extend(page.get("modified", []))
+            removed.extend(r["transaction_id"] for r in page.get("removed", []))
+            cursor = page["next_cursor"]
+            has_more = page.get("has_more", False)
+        return added, modified, removed, cursor
+
+    async def create_sandbox_public_token(self, institution_id: str, initial_products: List[str],
+                                          options: Optional[Dict[str, Any]] = None) -> str:
+        """Create a Plaid Sandbox public token (quietly; bulk provisioning calls this per item)."""
+        try:
+            response = await self.client.sandbox_public_token_create(institution_id, initial_products, options)
+            return response["public_token"]
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Plaid API error: {e.body}"
+            )
+
+    async def create_sandbox_custom_item(self, institution_id: str, initial_products: List[str], transaction_history: List[dict]) -> str:
         """
         Create a Plaid Sandbox public token for a new item seeded with custom transaction history.
         Uses the /sandbox/public_token/create endpoint and override_history option.
         """
-        options = SandboxPublicTokenCreateRequestOptions(
-            override_history=transaction_history,
-            override_username="user_custom_gig"  # You can customize this username
-        )
-        request = SandboxPublicTokenCreateRequest(
-            institution_id=institution_id,
-            initial_products=initial_products,
-            options=options
-        )
+        options = {
+            "override_history": transaction_history,
+            "override_username": "user_custom_gig"  # You can customize this username
+        }
         try:
-            response = self.client.sandbox_public_token_create(request)
-            public_token = response.public_token
+            response = await self.client.sandbox_public_token_create(institution_id, initial_products, options)
+            public_token = response["public_token"]
             print(f"Created sandbox public token with custom history for institution {institution_id}")
             return public_token
-        except plaid.ApiException as e:
+        except PlaidUnavailableError as e:
+            raise _unavailable(e)
+        except PlaidApiError as e:
             print(f"Error creating sandbox public token with custom history: {e}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Plaid API error: {e.body}"
-            )
\ No newline at end of file
+            )
+
+
+# Shared instance: one connection pool per worker for routers and background services
+plaid_service = PlaidService()
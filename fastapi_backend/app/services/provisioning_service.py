@@ -0,0 +1,229 @@
+# app/services/provisioning_service.py
+# Bulk sandbox item provisioning for seeding load-test environments: creates and exchanges N sandbox
+# public tokens with bounded concurrency, encrypts the access tokens in batches and writes the
+# PlaidItems with one unordered bulk_write of link upserts per batch. The API runs it as a
+# background job (provisioning_jobs); from the command line:
+#   python -m app.services.provisioning_service --count 10000 --users 100 --fixture custom_gig_user
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.models.plaid_item_model import PlaidItem
+from app.services.fixture_service import fixture_loader
+from app.services.item_service import link_upsert_op
+from app.services.plaid_service import plaid_service
+from app.services.access_token_cache import access_token_cache
+from app.utils.encryption import encrypt_tokens
+
+SANDBOX_INSTITUTION_ID = "ins_109508" # Plaid Test Bank, as in create_custom_item
+MAX_REPORTED_ERRORS = 10
+UNAVAILABLE_RETRIES = 2
+TRANSIENT_STATUSES = (status.HTTP_503_SERVICE_UNAVAILABLE, status.HTTP_504_GATEWAY_TIMEOUT)
+
+
+async def _retry_unavailable(call: Callable[[], Awaitable[Any]]) -> Any:
+    """Runs a Plaid call, retrying transient unavailability (503/504) so a large seed run has no gaps."""
+    for attempt in range(UNAVAILABLE_RETRIES + 1):
+        try:
+            return await call()
+        except HTTPException as e:
+            if e.status_code not in TRANSIENT_STATUSES or attempt == UNAVAILABLE_RETRIES:
+                raise
+            await asyncio.sleep(0.5 * (attempt + 1))
+
+
+async def _write_batch(batch: List[Tuple[str, str, str]], result: Dict[str, Any]) -> None:
+    """
+    Encrypts a batch of (item_id, user_id, access_token) in one worker-thread call and writes it
+    with the same upsert as a single link, so item_ids that already exist are relinked.
+
+    A batch that fails (a network error, AutoReconnect, ...) is recorded in `result` and does not
+    stop the run: all its item_ids go to failed_item_ids, since it is unknown which of them landed.
+    """
+    created = existing = 0
+    failed_ids: List[str] = []
+    messages: List[str] = []
+    try:
+        encrypted = await asyncio.to_thread(encrypt_tokens, [access_token for _, _, access_token in batch])
+        now = datetime.utcnow()
+        operations = [
+            link_upsert_op(item_id, user_id, token, now) for (item_id, user_id, _), token in zip(batch, encrypted)
+        ]
+        # Unordered: one failed write does not stop the rest of the batch
+        written = await PlaidItem.get_motor_collection().bulk_write(operations, ordered=False)
+        created, existing = written.upserted_count, written.matched_count
+    except BulkWriteError as e:
+        created, existing = e.details.get("nUpserted", 0), e.details.get("nMatched", 0)
+        for error in e.details.get("writeErrors", []):
+            failed_ids.append(batch[error["index"]][0])
+            messages.append(error.get("errmsg", str(error)))
+    except Exception as e:
+        print(f"Provisioning batch of {len(batch)} items failed: {type(e).__name__}: {e}")
+        failed_ids = [item_id for item_id, _, _ in batch]
+        messages = [f"Batch of {len(batch)} items failed: {type(e).__name__}: {e}"]
+    result["failed"] += len(failed_ids)
+    result["failed_item_ids"].extend(failed_ids)
+    result["errors"].extend(messages[:MAX_REPORTED_ERRORS - len(result["errors"])])
+    for item_id, _, _ in batch:
+        access_token_cache.invalidate(item_id) # Relinked items must not serve a cached old token
+    result["created"] += created
+    result["existing"] += existing
+    result["batches"] += 1
+
+
+async def provision_sandbox_items(count: int, user_prefix: str = "sandbox-user", users: int = 1,
+                                  fixture: Optional[str] = None, concurrency: Optional[int] = None,
+                                  batch_size: Optional[int] = None,
+                                  result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Creates `count` linked sandbox items spread round-robin over `users` users
+    ("<user_prefix>-<n>"), optionally seeded with a named override-history fixture.
+
+    Up to `concurrency` items are in Plaid at once (create public token, then exchange it); the
+    shared Plaid client's own limit also applies. Exchanged tokens are buffered and written every
+    `batch_size` items, so Plaid calls and Mongo writes overlap and memory stays bounded.
+    Returns counts (created, existing item_ids relinked, failed), the item_ids exchanged but not
+    written, and the first few error messages. A `result` dict passed in is filled as the run
+    progresses, so a background job can report progress.
+    """
+    concurrency = concurrency or settings.PROVISION_CONCURRENCY
+    batch_size = batch_size or settings.PROVISION_BATCH_SIZE
+    options = None
+    if fixture:
+        options = {"override_history": await fixture_loader.get(fixture), "override_username": "user_custom_gig"}
+
+    result = result if result is not None else {}
+    result.update({"requested": count, "created": 0, "existing": 0, "failed": 0, "batches": 0,
+                   "failed_item_ids": [], "errors": []})
+    pending: List[Tuple[str, str, str]] = []
+    writes: List[asyncio.Task] = []
+    next_index = 0
+    start = time.perf_counter()
+
+    def fail(message: str) -> None:
+        result["failed"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append(message)
+
+    async def worker() -> None:
+        nonlocal next_index, pending
+        while next_index < count:
+            n = next_index
+            next_index += 1
+            user_id = f"{user_prefix}-{n % users}"
+            try:
+                public_token = await _retry_unavailable(lambda: plaid_service.create_sandbox_public_token(
+                    SANDBOX_INSTITUTION_ID, ["transactions"], options
+                ))
+                access_token, item_id = await _retry_unavailable(
+                    lambda: plaid_service.exchange_public_token(public_token)
+                )
+            except HTTPException as e:
+                fail(str(e.detail))
+                continue
+            pending.append((item_id, user_id, access_token))
+            if len(pending) >= batch_size:
+                batch, pending = pending, []
+                writes.append(asyncio.create_task(_write_batch(batch, result)))
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    if pending:
+        writes.append(asyncio.create_task(_write_batch(pending, result)))
+    await asyncio.gather(*writes)
+
+    result["elapsed_s"] = round(time.perf_counter() - start, 2)
+    result["items_per_s"] = round(result["created"] / result["elapsed_s"], 1) if result["elapsed_s"] else None
+    print(f"Provisioned {result['created']}/{count} sandbox items in {result['elapsed_s']}s "
+          f"({result['existing']} existing, {result['failed']} failed)")
+    return result
+
+
+class ProvisioningJobs:
+    """
+    Runs provision_sandbox_items in the background for the API, which returns a job id instead of
+    holding the request open for thousands of Plaid exchanges.
+
+    One job runs at a time per worker, so provisioning does not compete with itself for the Plaid
+    client's concurrency. Job state lives in this worker's memory; the last `keep` jobs are kept.
+    """
+
+    def __init__(self, keep: int = 20):
+        self.keep = keep
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, count: int, user_prefix: str, users: int, fixture: Optional[str],
+              concurrency: Optional[int]) -> Dict[str, Any]:
+        """Starts a job and returns its state; 409 if one is already running."""
+        if self.running():
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A provisioning job is already running")
+        job = {"job_id": uuid.uuid4().hex, "status": "running", "started_at": datetime.utcnow(),
+               "finished_at": None, "error": None, "result": {"requested": count}}
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > self.keep:
+            self._jobs.popitem(last=False)
+        self._task = asyncio.create_task(self._run(job, count, user_prefix, users, fixture, concurrency))
+        return job
+
+    async def _run(self, job: Dict[str, Any], *args: Any) -> None:
+        try:
+            await provision_sandbox_items(*args, result=job["result"])
+            job["status"] = "succeeded"
+        except asyncio.CancelledError:
+            job["status"], job["error"] = "failed", "Cancelled at shutdown"
+            raise
+        except Exception as e:
+            print(f"Provisioning job {job['job_id']} failed: {type(e).__name__}: {e}")
+            job["status"] = "failed"
+            job["error"] = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+        finally:
+            job["finished_at"] = datetime.utcnow()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Shared instance used by the provisioning routes
+provisioning_jobs = ProvisioningJobs()
+
+
+async def _main() -> None:
+    from app.db.database import init_db
+
+    parser = argparse.ArgumentParser(description="Create linked Plaid sandbox items in bulk")
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--users", type=int, default=1, help="Spread the items over this many users")
+    parser.add_argument("--user-prefix", default="sandbox-user")
+    parser.add_argument("--fixture", default=None, help="Override-history fixture name, e.g. custom_gig_user")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    await init_db()
+    try:
+        await provision_sandbox_items(args.count, args.user_prefix, args.users, args.fixture,
+                                      args.concurrency, args.batch_size)
+    finally:
+        await plaid_service.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,182 @@
+# app/services/recurring_service.py
+# Recurring income and subscription detection: groups a user's transactions by normalized merchant
+# and direction, then finds periodic series from inter-arrival intervals and amount spread using
+# a few vectorized NumPy passes over the whole history. Cached per user until transactions change.
+
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.transaction_model import Transaction
+from app.utils.versioned_cache import VersionedCache
+
+# Named cadences (days). A series whose median interval is within CADENCE_TOLERANCE of one of these
+# gets its name; regular series with other periods are reported as "custom"
+CADENCES: Tuple[Tuple[str, float], ...] = (
+    ("weekly", 7.0), ("biweekly", 14.0), ("semimonthly", 15.22), ("monthly", 30.44),
+    ("quarterly", 91.31), ("annual", 365.25),
+)
+CADENCE_TOLERANCE = 0.2
+MIN_OCCURRENCES = 3 # Distinct days; two points only give one interval
+MIN_REGULARITY = 0.6 # Share of intervals within INTERVAL_TOLERANCE of the median interval
+INTERVAL_TOLERANCE = 0.25 # Relative, with at least one day of slack for short periods
+FIXED_AMOUNT_CV = 0.1 # Amount coefficient of variation below which a charge is a fixed price
+AVERAGE_MONTH_DAYS = 30.44
+
+PROJECTION = {"_id": 0, "date": 1, "amount": 1, "merchant_name": 1, "name": 1}
+
+_cache = VersionedCache(maxsize=settings.RECURRING_CACHE_MAXSIZE, ttl=settings.RECURRING_CACHE_TTL_SECONDS)
+
+# Reference-like tokens (order numbers, client handles, store numbers) that differ per transaction
+_REFERENCE = re.compile(r"\b\w*\d\w*\b")
+_NON_LETTERS = re.compile(r"[^a-z ]+")
+
+
+def normalize_merchant(name: str) -> str:
+    """'Rover Booking - ABUTQ1 Pet Stay' -> 'rover booking pet stay'; 'Client_DEC77' -> 'client'."""
+    lowered = name.lower().replace("_", " ")
+    text = " ".join(_NON_LETTERS.sub(" ", _REFERENCE.sub(" ", lowered)).split())
+    return text or " ".join(lowered.split())
+
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _to_date(epoch_day: float) -> date:
+    return _EPOCH + timedelta(days=int(round(epoch_day)))
+
+
+def _cadence(period: float) -> str:
+    name, days = min(CADENCES, key=lambda cadence: abs(cadence[1] - period))
+    return name if abs(days - period) <= CADENCE_TOLERANCE * days else "custom"
+
+
+def _group_medians(values: np.ndarray, groups: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Median of `values` per group; `groups` must be sorted and every group non-empty."""
+    ordered = values[np.lexsort((values, groups))]
+    return (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+
+def detect_recurring(days: np.ndarray, amounts: np.ndarray, group: np.ndarray, labels: List[str],
+                     as_of: date) -> List[Dict[str, Any]]:
+    """
+    Periodic series in one history. `days` are epoch days (int64), `amounts` Plaid-signed dollars
+    and `group` an index into `labels` ("<direction>|<normalized merchant>") per row.
+
+    Rows are sorted by (group, day); same-day repeats count as one occurrence. Per group, the
+    median interval is the period, regularity is the share of intervals within tolerance of it,
+    and amounts give the mean and coefficient of variation. Everything is bincount/lexsort based,
+    so the cost is a handful of O(n log n) array passes regardless of the number of merchants.
+    """
+    if len(days) == 0:
+        return []
+    order = np.lexsort((days, group))
+    days, amounts, group = days[order], np.abs(amounts[order]), group[order]
+    n_groups = len(labels)
+
+    # Intervals between consecutive distinct days of the same group
+    gaps = np.diff(days)
+    same_group = group[1:] == group[:-1]
+    keep = same_group & (gaps > 0)
+    interval_group, intervals = group[1:][keep], gaps[keep].astype(np.float64)
+    interval_counts = np.bincount(interval_group, minlength=n_groups)
+    occurrences = interval_counts + 1
+
+    candidates = np.flatnonzero(occurrences >= MIN_OCCURRENCES)
+    if len(candidates) == 0:
+        return []
+    # Medians only for groups that have intervals (interval_group is sorted, as group was)
+    has_intervals = np.flatnonzero(interval_counts)
+    interval_starts = np.concatenate(([0], np.cumsum(interval_counts[has_intervals])[:-1]))
+    period = np.zeros(n_groups)
+    period[has_intervals] = _group_medians(intervals, interval_group, interval_starts, interval_counts[has_intervals])
+
+    tolerance = np.maximum(period * INTERVAL_TOLERANCE, 1.0)
+    on_time = np.abs(intervals - period[interval_group]) <= tolerance[interval_group]
+    regularity = np.bincount(interval_group, weights=on_time, minlength=n_groups) / np.maximum(interval_counts, 1)
+
+    rows = np.bincount(group, minlength=n_groups)
+    amount_mean = np.bincount(group, weights=amounts, minlength=n_groups) / rows
+    amount_var = np.bincount(group, weights=amounts ** 2, minlength=n_groups) / rows - amount_mean ** 2
+    amount_cv = np.sqrt(np.maximum(amount_var, 0.0)) / np.maximum(amount_mean, 1e-9)
+    # Every label occurs (labels are made from the rows), and rows are sorted by (group, day),
+    # so each group is one run
+    run_starts = np.flatnonzero(np.concatenate(([True], group[1:] != group[:-1])))
+    first_day = days[run_starts]
+    last_day = days[np.concatenate((run_starts[1:], [len(days)])) - 1]
+
+    today = (as_of - _EPOCH).days
+    series = []
+    for g in candidates[regularity[candidates] >= MIN_REGULARITY]:
+        direction, merchant = labels[g].split("|", 1)
+        p = float(period[g])
+        cv = float(amount_cv[g])
+        kind = "income" if direction == "in" else ("subscription" if cv <= FIXED_AMOUNT_CV else "bill")
+        # Confidence grows with regularity and history length and drops with amount noise
+        confidence = float(regularity[g]) * min(1.0, occurrences[g] / 6) * (1 - 0.5 * min(cv, 1.0))
+        series.append({
+            "merchant": merchant,
+            "kind": kind,
+            "cadence": _cadence(p),
+            "period_days": round(p, 1),
+            "occurrences": int(occurrences[g]),
+            "first_date": _to_date(first_day[g]),
+            "last_date": _to_date(last_day[g]),
+            "next_expected_date": _to_date(last_day[g] + p),
+            "average_amount": round(float(amount_mean[g]), 2),
+            "amount_cv": round(cv, 3),
+            "regularity": round(float(regularity[g]), 3),
+            "confidence": round(confidence, 3),
+            "monthly_amount": round(float(amount_mean[g]) * AVERAGE_MONTH_DAYS / p, 2),
+            # Still running unless more than one and a half periods have passed without it
+            "active": bool(today - last_day[g] <= 1.5 * p + tolerance[g]),
+        })
+    series.sort(key=lambda s: (-s["active"], -s["monthly_amount"]))
+    return series
+
+
+async def _history(user_id: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """Posted transactions as detect_recurring arguments (days, amounts, group, labels), from one query."""
+    docs = await Transaction.get_motor_collection().find(
+        {"user_id": user_id, "pending": {"$ne": True}}, PROJECTION
+    ).to_list(None)
+    normalized: Dict[str, str] = {} # Normalize each distinct description once
+    group_ids: Dict[str, int] = {}
+    group = np.empty(len(docs), dtype=np.int64)
+    for i, doc in enumerate(docs):
+        raw = doc.get("merchant_name") or doc.get("name") or "unknown"
+        merchant = normalized.get(raw)
+        if merchant is None:
+            merchant = normalized[raw] = normalize_merchant(raw)
+        group[i] = group_ids.setdefault(("in|" if doc["amount"] < 0 else "out|") + merchant, len(group_ids))
+    days = (np.array([doc["date"] for doc in docs], dtype="datetime64[D]") - np.datetime64(0, "D")).astype(np.int64)
+    amounts = np.array([doc["amount"] for doc in docs], dtype=np.float64)
+    return days, amounts, group, list(group_ids)
+
+
+async def get_recurring(user_id: str, as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    A user's recurring series as a RecurringResponse-shaped dict, with monthly totals of the
+    active income and expense series. Cached until the TTL or the next change to the user's
+    transactions.
+    """
+    as_of = as_of or date.today()
+    version = _cache.version(user_id)
+    cached = _cache.get(user_id, as_of)
+    if cached is not None:
+        return cached
+
+    series = detect_recurring(*await _history(user_id), as_of)
+    active = [s for s in series if s["active"]]
+    result = {
+        "user_id": user_id,
+        "as_of": as_of,
+        "monthly_recurring_income": round(sum(s["monthly_amount"] for s in active if s["kind"] == "income"), 2),
+        "monthly_recurring_expenses": round(sum(s["monthly_amount"] for s in active if s["kind"] != "income"), 2),
+        "series": series,
+    }
+    _cache.put(user_id, as_of, result, version)
+    return result
@@ -0,0 +1,163 @@
+# app/services/refresh_scheduler.py
+# Background refresh of linked Plaid items, so reads are served from MongoDB instead of waiting
+# on Plaid. Runs inside the API lifespan, or on its own with:
+#   python -m app.services.refresh_scheduler
+
+import asyncio
+import math
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING
+
+from app.core.config import settings
+from app.models.plaid_item_model import PlaidItem
+from app.services import transaction_service
+
+
+class RefreshScheduler:
+    """
+    Periodically syncs every item that is stale (last synced more than `stale_after` seconds ago,
+    or never). Each pass:
+
+    - loads one batch (`batch_size`) of due items, never synced and then least recently synced
+      first, skipping in the query those backing off after failures (PlaidItem.next_sync_after,
+      set by transaction_service on every failed sync) and those another process is syncing,
+    - orders the batch by priority: never synced first, then by how overdue they are weighted by
+      recent activity (last_sync_changes), so busy items are refreshed ahead of dormant ones,
+    - syncs them, `concurrency` at a time, through sync_item_by_id (a sync
+      already running for an item in this process is joined; an item claimed by another process
+      since it was loaded is skipped, see sync_item_by_id(wait=False)).
+
+    Pass intervals and per-item staleness are jittered so items linked together and several
+    processes started together do not refresh in lockstep.
+    """
+
+    def __init__(self, interval: float = 60.0, stale_after: float = 3600.0, concurrency: int = 4,
+                 batch_size: int = 200, jitter: float = 0.2):
+        self.interval = interval
+        self.stale_after = stale_after
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.jitter = jitter
+        self._task: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {"passes": 0, "synced": 0, "skipped": 0, "failed": 0}
+        self.last_pass: Dict[str, Any] = {}
+
+    # --- Lifecycle ---
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_forever(self) -> None:
+        # Random first delay: processes started together spread their passes out
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Refresh scheduler pass failed: {e}")
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    # --- Scheduling ---
+    def _stale_after(self, item_id: str) -> float:
+        """Per-item staleness threshold, spread deterministically over +-jitter."""
+        spread = zlib.crc32(item_id.encode()) / 0xFFFFFFFF * 2 - 1
+        return self.stale_after * (1 + self.jitter * spread)
+
+    async def due_items(self, now: Optional[datetime] = None) -> List[str]:
+        """Item ids to refresh now, highest priority first (at most batch_size)."""
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.stale_after * (1 - self.jitter))
+        query = {"$and": [
+            {"$or": [{"last_sync_time": None}, {"last_sync_time": {"$lt": cutoff}}]},
+            {"$or": [{"next_sync_after": None}, {"next_sync_after": {"$lte": now}}]}, # Not backing off
+            {"$or": [{"sync_lease_until": None}, {"sync_lease_until": {"$lt": now}}]}, # Not being synced elsewhere
+        ]}
+        projection = {"_id": 0, "item_id": 1, "last_sync_time": 1, "last_sync_changes": 1}
+        # Ascending last_sync_time puts never-synced (null) items first; walking its index in that
+        # order lets the limit stop the scan after one batch
+        cursor = (PlaidItem.get_motor_collection().find(query, projection)
+                  .sort("last_sync_time", ASCENDING).limit(self.batch_size))
+        ranked = []
+        async for doc in cursor:
+            last = doc.get("last_sync_time")
+            if last is None:
+                ranked.append((math.inf, doc["item_id"]))
+                continue
+            overdue = (now - last).total_seconds() / self._stale_after(doc["item_id"])
+            if overdue >= 1:
+                ranked.append((overdue * (1 + math.log1p(doc.get("last_sync_changes") or 0)), doc["item_id"]))
+        ranked.sort(reverse=True)
+        return [item_id for _, item_id in ranked]
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Runs one pass and returns its summary."""
+        started = time.perf_counter()
+        item_ids = await self.due_items()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = {"synced": 0, "skipped": 0, "failed": 0}
+
+        async def refresh(item_id: str) -> None:
+            async with semaphore:
+                try:
+                    # Several processes may pick the same item; only the one holding its lease syncs it
+                    counts = await transaction_service.sync_item_by_id(item_id, wait=False)
+                    results["synced" if counts is not None else "skipped"] += 1
+                except Exception as e:
+                    # Status and backoff are already recorded on the item by the sync itself
+                    results["failed"] += 1
+                    print(f"Scheduled refresh failed for item {item_id}: {getattr(e, 'detail', e)}")
+
+        await asyncio.gather(*(refresh(item_id) for item_id in item_ids))
+        self.counters["passes"] += 1
+        self.counters["synced"] += results["synced"]
+        self.counters["skipped"] += results["skipped"]
+        self.counters["failed"] += results["failed"]
+        self.last_pass = {
+            "finished_at": datetime.utcnow(),
+            "due": len(item_ids),
+            **results,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        return self.last_pass
+
+    # --- Diagnostics ---
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "running": self._task is not None, "last_pass": self.last_pass}
+
+
+# Shared instance; started by the app lifespan when REFRESH_SCHEDULER_ENABLED
+refresh_scheduler = RefreshScheduler(
+    interval=settings.REFRESH_INTERVAL_SECONDS,
+    stale_after=settings.REFRESH_STALE_AFTER_SECONDS,
+    concurrency=settings.REFRESH_CONCURRENCY,
+    batch_size=settings.REFRESH_BATCH_SIZE,
+    jitter=settings.REFRESH_JITTER,
+)
+
+
+async def _main() -> None:
+    from app.db.database import init_db
+    from app.services.plaid_service import plaid_service
+
+    await init_db()
+    try:
+        await refresh_scheduler.run_forever()
+    finally:
+        await plaid_service.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
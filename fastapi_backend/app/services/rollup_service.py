@@ -0,0 +1,134 @@
+# app/services/rollup_service.py
+# Service layer for materialized spending rollups: delta maintenance on ingestion and a
+# consistency checker that rebuilds a user's buckets from raw transactions.
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pymongo import DeleteMany, UpdateOne
+
+from app.models.spending_rollup_model import SpendingRollup
+from app.models.transaction_model import Transaction
+from app.services import forecast_service
+from app.utils import versioned_cache
+
+UNCATEGORIZED = "Uncategorized"
+
+# Fields of a stored transaction that determine its rollup contribution
+ROLLUP_PROJECTION = {"_id": 0, "transaction_id": 1, "user_id": 1, "amount": 1, "date": 1,
+                     "category": 1, "personal_finance_category": 1}
+
+BucketKey = Tuple[str, str, str] # (user_id, category, day)
+
+
+def primary_category(doc: Dict[str, Any]) -> str:
+    """Python twin of spending_service's primary-category expression."""
+    category = doc.get("category")
+    if category:
+        return category[0]
+    pfc = doc.get("personal_finance_category") or {}
+    return pfc.get("primary") or UNCATEGORIZED
+
+
+def to_cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+def compute_deltas(previous: Iterable[Dict[str, Any]], current: Iterable[Dict[str, Any]]
+                   ) -> Dict[BucketKey, List[int]]:
+    """
+    Bucket deltas [spent_cents, income_cents, transaction_count] for replacing `previous` rows with `current` rows.
+    A removed row appears only in `previous`; an added row only in `current`; a modified row in both.
+    """
+    deltas: Dict[BucketKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for sign, docs in ((-1, previous), (1, current)):
+        for doc in docs:
+            cents = to_cents(doc["amount"])
+            delta = deltas[(doc["user_id"], primary_category(doc), doc["date"])]
+            if cents > 0:
+                delta[0] += sign * cents
+            elif cents < 0:
+                delta[1] += sign * -cents
+            delta[2] += sign
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+async def apply_deltas(deltas: Dict[BucketKey, List[int]]) -> int:
+    """$inc-upserts each touched bucket in one bulk_write, then drops buckets that emptied out."""
+    if not deltas:
+        return 0
+    operations: List[Any] = [
+        UpdateOne(
+            {"user_id": user_id, "category": category, "day": day},
+            {"$inc": {"spent_cents": spent, "income_cents": income, "transaction_count": count}},
+            upsert=True,
+        )
+        for (user_id, category, day), (spent, income, count) in deltas.items()
+    ]
+    user_ids = sorted({key[0] for key in deltas})
+    operations.append(DeleteMany({"user_id": {"$in": user_ids}, "transaction_count": {"$lte": 0}}))
+    await SpendingRollup.get_motor_collection().bulk_write(operations, ordered=False)
+    await forecast_service.invalidate_precomputed(user_ids)
+    return len(deltas)
+
+
+async def _expected_buckets(user_id: str) -> Dict[Tuple[str, str], List[int]]:
+    """Recomputes a user's buckets from raw transactions: {(category, day): [spent, income, transaction_count]}."""
+    expected: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0, 0])
+    cursor = Transaction.get_motor_collection().find({"user_id": user_id}, ROLLUP_PROJECTION)
+    async for doc in cursor:
+        for (_, category, day), delta in compute_deltas([], [doc]).items():
+            bucket = expected[(category, day)]
+            for i in range(3):
+                bucket[i] += delta[i]
+    return expected
+
+
+async def check_user_rollups(user_id: str, repair: bool = False) -> Dict[str, Any]:
+    """
+    Rebuilds a user's rollups from raw transactions and diffs them against the maintained ones.
+
+    Args:
+        user_id: The user whose buckets to verify.
+        repair: If True, replace the user's buckets with the rebuilt ones when they differ.
+
+    Returns:
+        A report with the bucket counts and the missing, unexpected and mismatched buckets.
+    """
+    expected = await _expected_buckets(user_id)
+    actual: Dict[Tuple[str, str], List[int]] = {}
+    async for doc in SpendingRollup.get_motor_collection().find({"user_id": user_id}):
+        actual[(doc["category"], doc["day"])] = [doc["spent_cents"], doc["income_cents"], doc["transaction_count"]]
+
+    def describe(key: Tuple[str, str], values: List[int]) -> Dict[str, Any]:
+        return {"category": key[0], "day": key[1], "spent_cents": values[0],
+                "income_cents": values[1], "transaction_count": values[2]}
+
+    missing = [describe(k, v) for k, v in expected.items() if k not in actual]
+    unexpected = [describe(k, v) for k, v in actual.items() if k not in expected]
+    mismatched = [
+        {"expected": describe(k, v), "actual": describe(k, actual[k])}
+        for k, v in expected.items() if k in actual and actual[k] != v
+    ]
+    consistent = not (missing or unexpected or mismatched)
+
+    if repair and not consistent:
+        collection = SpendingRollup.get_motor_collection()
+        await collection.delete_many({"user_id": user_id})
+        if expected:
+            await collection.insert_many([
+                {"user_id": user_id, **describe(k, v)} for k, v in expected.items()
+            ])
+        versioned_cache.invalidate_user(user_id)
+        await forecast_service.invalidate_precomputed([user_id])
+
+    return {
+        "user_id": user_id,
+        "consistent": consistent,
+        "repaired": repair and not consistent,
+        "expected_buckets": len(expected),
+        "actual_buckets": len(actual),
+        "missing": missing,
+        "unexpected": unexpected,
+        "mismatched": mismatched,
+    }
@@ -0,0 +1,121 @@
+# app/services/spending_service.py
+# Service layer for spending aggregation. Category and calendar breakdowns are read from the
+# materialized rollups (O(buckets)); merchant and detailed-category breakdowns aggregate raw
+# transactions. Either way totals are computed inside MongoDB so responses stay small.
+
+from datetime import date
+from typing import Any, Dict, Iterable, List
+
+from app.models.spending_rollup_model import SpendingRollup
+from app.models.transaction_model import Transaction
+from app.schemas.spending_schemas import SpendingGroupBy
+from app.services.rollup_service import UNCATEGORIZED
+
+_PRIMARY_CATEGORY = {"$ifNull": [
+    {"$arrayElemAt": ["$category", 0]},
+    {"$ifNull": ["$personal_finance_category.primary", UNCATEGORIZED]},
+]}
+
+
+def _week_key(field: str) -> Dict[str, Any]:
+    """Monday that starts the week of an ISO date string field (requires MongoDB 5.0+)."""
+    return {"$dateToString": {"format": "%Y-%m-%d", "date": {"$dateTrunc": {
+        "date": {"$dateFromString": {"dateString": field}}, "unit": "week", "startOfWeek": "monday",
+    }}}}
+
+
+# Group key expressions over raw transactions; dates are stored as 'YYYY-MM-DD' strings
+GROUP_KEYS: Dict[SpendingGroupBy, Any] = {
+    SpendingGroupBy.CATEGORY: _PRIMARY_CATEGORY,
+    SpendingGroupBy.DETAILED_CATEGORY: {"$ifNull": ["$personal_finance_category.detailed", UNCATEGORIZED]},
+    SpendingGroupBy.MERCHANT: {"$ifNull": ["$merchant_name", {"$ifNull": ["$name", "Unknown"]}]},
+    SpendingGroupBy.DAY: "$date",
+    SpendingGroupBy.WEEK: _week_key("$date"),
+    SpendingGroupBy.MONTH: {"$substr": ["$date", 0, 7]},
+}
+
+# Group key expressions over SpendingRollup buckets
+ROLLUP_GROUP_KEYS: Dict[SpendingGroupBy, Any] = {
+    SpendingGroupBy.CATEGORY: "$category",
+    SpendingGroupBy.DAY: "$day",
+    SpendingGroupBy.WEEK: _week_key("$day"),
+    SpendingGroupBy.MONTH: {"$substr": ["$day", 0, 7]},
+}
+
+TIME_GROUPINGS = {SpendingGroupBy.DAY, SpendingGroupBy.WEEK, SpendingGroupBy.MONTH}
+
+_RAW_SUMS = {
+    "spent": {"$sum": {"$cond": [{"$gt": ["$amount", 0]}, "$amount", 0]}},
+    "income": {"$sum": {"$cond": [{"$lt": ["$amount", 0]}, {"$multiply": ["$amount", -1]}, 0]}},
+    "count": {"$sum": 1},
+}
+_ROLLUP_SUMS = {
+    "spent": {"$sum": {"$divide": ["$spent_cents", 100]}},
+    "income": {"$sum": {"$divide": ["$income_cents", 100]}},
+    "count": {"$sum": "$transaction_count"},
+}
+
+
+def _facets(group_by: Iterable[SpendingGroupBy], keys: Dict[SpendingGroupBy, Any],
+            sums: Dict[str, Any], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    """One $facet branch per grouping: categorical ones ranked by spend and capped, time ones chronological."""
+    facets = {}
+    for grouping in group_by:
+        stages: List[Dict[str, Any]] = [{"$group": {"_id": keys[grouping], **sums}}]
+        if grouping in TIME_GROUPINGS:
+            stages.append({"$sort": {"_id": 1}})
+        else:
+            stages += [{"$sort": {"spent": -1, "_id": 1}}, {"$limit": limit}]
+        facets[grouping.value] = stages
+    return facets
+
+
+def build_pipeline(user_id: str, start_date: date, end_date: date, group_by: Iterable[SpendingGroupBy],
+                   limit: int, include_pending: bool = True) -> List[Dict[str, Any]]:
+    """
+    Raw-transaction pipeline: one $match on the (user_id, date) index followed by a $facet,
+    so every requested breakdown comes back in a single round trip.
+    """
+    match: Dict[str, Any] = {
+        "user_id": user_id,
+        "date": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()},
+    }
+    if not include_pending:
+        match["pending"] = False
+    return [{"$match": match}, {"$facet": _facets(group_by, GROUP_KEYS, _RAW_SUMS, limit)}]
+
+
+def build_rollup_pipeline(user_id: str, start_date: date, end_date: date,
+                          group_by: Iterable[SpendingGroupBy], limit: int) -> List[Dict[str, Any]]:
+    """Rollup pipeline: reads only the user's (day, category) buckets in range."""
+    match = {"user_id": user_id, "day": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()}}
+    return [{"$match": match}, {"$facet": _facets(group_by, ROLLUP_GROUP_KEYS, _ROLLUP_SUMS, limit)}]
+
+
+async def summarize_spending(user_id: str, start_date: date, end_date: date,
+                             group_by: Iterable[SpendingGroupBy], limit: int = 50,
+                             include_pending: bool = True) -> Dict[SpendingGroupBy, List[Dict[str, Any]]]:
+    """Returns {grouping: [{key, spent, income, count}, ...]} for the user's transactions in range."""
+    group_by = list(dict.fromkeys(group_by)) # De-duplicate, keep order
+    # Rollups include pending transactions, so excluding them means going to the raw rows
+    from_rollups = [g for g in group_by if g in ROLLUP_GROUP_KEYS and include_pending]
+    from_raw = [g for g in group_by if g not in from_rollups]
+
+    facets: Dict[str, List[Dict[str, Any]]] = {}
+    if from_rollups:
+        pipeline = build_rollup_pipeline(user_id, start_date, end_date, from_rollups, limit)
+        results = await SpendingRollup.aggregate(pipeline).to_list()
+        facets.update(results[0] if results else {})
+    if from_raw:
+        pipeline = build_pipeline(user_id, start_date, end_date, from_raw, limit, include_pending)
+        results = await Transaction.aggregate(pipeline).to_list()
+        facets.update(results[0] if results else {})
+
+    return {
+        grouping: [
+            {"key": str(row["_id"]), "spent": round(row["spent"], 2),
+             "income": round(row["income"], 2), "count": row["count"]}
+            for row in facets.get(grouping.value, [])
+        ]
+        for grouping in group_by
+    }
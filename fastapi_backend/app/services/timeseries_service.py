@@ -0,0 +1,149 @@
+# app/services/timeseries_service.py
+# Service layer for chart time series: daily/weekly/monthly spent, income, net and running
+# balance built with NumPy from the daily spending rollups, optionally downsampled to a point
+# budget (LTTB or min/max buckets), and cached per (user, range, resolution, downsampling).
+
+import math
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.spending_rollup_model import SpendingRollup
+from app.schemas.timeseries_schemas import DownsampleMethod, TimeSeriesField, TimeSeriesResolution
+from app.utils.versioned_cache import VersionedCache
+
+_cache = VersionedCache(maxsize=settings.TIMESERIES_CACHE_MAXSIZE, ttl=settings.TIMESERIES_CACHE_TTL_SECONDS)
+
+
+# --- Series construction ---
+async def _daily_cents(user_id: str, start_date: date, end_date: date) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Dense per-day arrays over [start_date, end_date]: days (datetime64[D]), spent and income cents."""
+    pipeline = [
+        {"$match": {"user_id": user_id, "day": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()}}},
+        {"$group": {"_id": "$day", "spent": {"$sum": "$spent_cents"}, "income": {"$sum": "$income_cents"}}},
+    ]
+    rows = await SpendingRollup.aggregate(pipeline).to_list()
+
+    start = np.datetime64(start_date, "D")
+    days = np.arange(start, np.datetime64(end_date, "D") + 1)
+    spent = np.zeros(len(days), dtype=np.int64)
+    income = np.zeros(len(days), dtype=np.int64)
+    if rows:
+        offsets = (np.array([row["_id"] for row in rows], dtype="datetime64[D]") - start).astype(np.int64)
+        spent[offsets] = [row["spent"] for row in rows]
+        income[offsets] = [row["income"] for row in rows]
+    return days, spent, income
+
+
+def _bucket_starts(days: np.ndarray, resolution: TimeSeriesResolution) -> np.ndarray:
+    if resolution == TimeSeriesResolution.WEEK:
+        # 1970-01-01 was a Thursday, so (days since epoch + 3) % 7 is the weekday with Monday = 0
+        epoch_days = days.astype(np.int64)
+        return days - ((epoch_days + 3) % 7).astype("timedelta64[D]")
+    if resolution == TimeSeriesResolution.MONTH:
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days
+
+
+def build_series(days: np.ndarray, spent: np.ndarray, income: np.ndarray,
+                 resolution: TimeSeriesResolution) -> Dict[str, np.ndarray]:
+    """Sums daily cents into resolution buckets and derives net and the running balance (in cents)."""
+    starts = _bucket_starts(days, resolution)
+    keys, first = np.unique(starts, return_index=True) # days are sorted, so each bucket is one run
+    spent = np.add.reduceat(spent, first) if len(first) else spent
+    income = np.add.reduceat(income, first) if len(first) else income
+    net = income - spent
+    return {"date": keys, "spent": spent, "income": income, "net": net, "balance": np.cumsum(net)}
+
+
+# --- Downsampling ---
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over evenly spaced points. Keeps the first and last point and,
+    from each of threshold - 2 buckets, the point forming the largest triangle with the previously
+    kept point and the average of the next bucket. Each bucket is a vectorized NumPy step.
+    """
+    length = len(y)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+    y = y.astype(np.float64)
+    x = np.arange(length, dtype=np.float64)
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64) # threshold - 2 buckets
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (length - 1, length)
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Keeps the first and last point plus the min and max of each of ~threshold/2 equal buckets."""
+    length = len(y)
+    if threshold >= length or threshold < 4:
+        return np.arange(length)
+    size = math.ceil(length / max(1, (threshold - 2) // 2))
+    buckets = math.ceil(length / size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:length] = y
+    grid = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    return np.unique(np.concatenate((
+        [0, length - 1], offsets + np.nanargmin(grid, axis=1), offsets + np.nanargmax(grid, axis=1),
+    )))
+
+
+DOWNSAMPLERS = {
+    DownsampleMethod.LTTB: lttb_indices,
+    DownsampleMethod.MINMAX: minmax_indices,
+}
+
+
+# --- Entry point ---
+async def get_time_series(user_id: str, start_date: date, end_date: date,
+                          resolution: TimeSeriesResolution = TimeSeriesResolution.DAY,
+                          points: Optional[int] = None,
+                          method: DownsampleMethod = DownsampleMethod.LTTB,
+                          downsample_by: TimeSeriesField = TimeSeriesField.BALANCE) -> Dict[str, Any]:
+    """
+    Returns the series for a user as a TimeSeriesResponse-shaped dict. With `points`, buckets are
+    reduced to about that many by `method`, choosing points on the `downsample_by` series (every
+    field is reported for the chosen buckets). Results are cached until the TTL or the next change
+    to the user's transactions.
+    """
+    key = (start_date, end_date, resolution, points, method, downsample_by)
+    version = _cache.version(user_id)
+    cached = _cache.get(user_id, key)
+    if cached is not None:
+        return cached
+
+    series = build_series(*await _daily_cents(user_id, start_date, end_date), resolution)
+    source_points = len(series["date"])
+    downsampled = points is not None and points < source_points
+    if downsampled:
+        keep = DOWNSAMPLERS[method](series[downsample_by.value], points)
+        series = {name: values[keep] for name, values in series.items()}
+
+    dates = series["date"].astype(object).tolist() # datetime64[D] -> datetime.date
+    dollars = {name: (series[name] / 100).round(2).tolist() for name in ("spent", "income", "net", "balance")}
+    result = {
+        "user_id": user_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "resolution": resolution,
+        "method": method if downsampled else None,
+        "source_points": source_points,
+        "points": [
+            {"date": d, "spent": s, "income": i, "net": n, "balance": b}
+            for d, s, i, n, b in zip(dates, dollars["spent"], dollars["income"], dollars["net"], dollars["balance"])
+        ],
+    }
+    _cache.put(user_id, key, result, version)
+    return result
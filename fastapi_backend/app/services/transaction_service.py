@@ -0,0 +1,527 @@
+# app/services/transaction_service.py
+# Service layer for the local transaction store: cursor-based ingestion from Plaid's
+# /transactions/sync and indexed reads served from MongoDB.
+
+import asyncio
+import base64
+import heapq
+import json
+import random
+import time
+import uuid
+from operator import attrgetter
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from pymongo import DeleteMany, ReplaceOne, ReturnDocument
+
+from app.core.config import settings
+from app.models.plaid_item_model import PlaidItem
+from app.models.transaction_model import Transaction
+from app.schemas.transaction_schemas import FIELD_NAMES, CompactTransaction, sparse_row
+from app.services.plaid_service import plaid_service
+from app.services import rollup_service, budget_service
+from app.services.access_token_cache import access_token_cache
+from app.utils import versioned_cache
+from app.utils.singleflight import SingleFlight
+
+# Plaid fields copied verbatim into the store (everything the frontend reads today)
+PLAID_TRANSACTION_FIELDS = tuple(
+    name for name in Transaction.model_fields
+    if name not in ("id", "revision_id", "item_id", "user_id")
+)
+
+# One in-flight sync per item within this worker: concurrent callers share it, so two requests
+# never race on the same cursor and a burst of refreshes makes one Plaid call. Across processes
+# (API workers, the standalone scheduler) an item is claimed with PlaidItem.sync_lease_until
+_sync_flights = SingleFlight()
+LEASE_POLL_SECONDS = 0.25 # How often a sync waiting for another process's lease retries the claim
+# Coalesces identical concurrent reads and keeps their results briefly; see read_item_transactions
+_read_flights = SingleFlight(ttl=settings.TRANSACTIONS_RESULT_CACHE_TTL_SECONDS,
+                             maxsize=settings.TRANSACTIONS_RESULT_CACHE_MAXSIZE)
+
+
+def to_document(raw: Dict[str, Any], item_id: str, user_id: str) -> Dict[str, Any]:
+    """Builds the stored representation of a Plaid transaction payload."""
+    doc = {name: raw.get(name) for name in PLAID_TRANSACTION_FIELDS}
+    doc["pending"] = bool(doc["pending"])
+    doc["item_id"] = item_id
+    doc["user_id"] = user_id
+    return doc
+
+
+# (item_id, user_id, added, modified, removed) as returned by one /transactions/sync run
+ChangeSet = Tuple[str, str, List[Dict[str, Any]], List[Dict[str, Any]], List[str]]
+ApplyChanges = Callable[[str, str, List[Dict[str, Any]], List[Dict[str, Any]], List[str]], Awaitable[int]]
+
+
+async def apply_changes(item_id: str, user_id: str, added: List[Dict[str, Any]],
+                        modified: List[Dict[str, Any]], removed: List[str]) -> int:
+    """Applies one item's sync results; see apply_change_sets."""
+    return await apply_change_sets([(item_id, user_id, added, modified, removed)])
+
+
+async def apply_change_sets(change_sets: List[ChangeSet]) -> int:
+    """
+    Applies the sync results of one or more items with a single unordered bulk_write.
+    Added and modified rows are upserted on transaction_id; removed rows are deleted.
+    Spending rollups are then adjusted by the difference between the old and new rows, so a
+    pending->posted transition (removed pending id + added posted id) moves buckets without a rescan.
+    Rollup and budget deltas of all the change sets go out in one bulk_write each as well.
+
+    The row write and the rollup/budget $incs are separate steps, and a retry would read the
+    written rows as `previous` and compute no delta. So the items are marked rollups_dirty before
+    the rows are written and cleared after; if the rollup step fails the users' rollups are
+    rebuilt from the rows right away, and a mark left behind is rebuilt by the next sync.
+
+    Returns:
+        The number of write operations issued.
+    """
+    documents: List[Dict[str, Any]] = []
+    removed: List[str] = []
+    owners: Dict[str, str] = {} # item_id -> user_id of the change sets with anything to write
+    for item_id, user_id, added_rows, modified_rows, removed_ids in change_sets:
+        item_documents = [to_document(raw, item_id, user_id) for raw in (*added_rows, *modified_rows)]
+        if item_documents or removed_ids:
+            documents.extend(item_documents)
+            removed.extend(removed_ids)
+            owners[item_id] = user_id
+    if not owners:
+        return 0
+
+    collection = Transaction.get_motor_collection()
+    touched_ids = [doc["transaction_id"] for doc in documents] + removed
+    previous = await collection.find(
+        {"transaction_id": {"$in": touched_ids}}, rollup_service.ROLLUP_PROJECTION
+    ).to_list(None)
+
+    operations: List[Any] = [
+        ReplaceOne({"transaction_id": doc["transaction_id"]}, doc, upsert=True)
+        for doc in documents
+    ]
+    if removed:
+        operations.append(DeleteMany({"transaction_id": {"$in": removed}}))
+    items = PlaidItem.get_motor_collection()
+    item_ids = list(owners)
+    await items.update_many({"item_id": {"$in": item_ids}}, {"$set": {"rollups_dirty": True}})
+    await collection.bulk_write(operations, ordered=False)
+
+    user_ids = set(owners.values())
+    try:
+        deltas = rollup_service.compute_deltas(previous, documents)
+        await rollup_service.apply_deltas(deltas)
+        await budget_service.apply_deltas(deltas) # Advance running budget totals from the same deltas
+        await items.update_many({"item_id": {"$in": item_ids}}, {"$set": {"rollups_dirty": False}})
+    except Exception as e:
+        print(f"Rollup update failed for items {item_ids}, rebuilding their users from transactions: {e}")
+        for item_id, user_id in owners.items():
+            try:
+                await rebuild_rollups(item_id, user_id)
+            except Exception as repair_error:
+                print(f"Rollup rebuild failed for user {user_id}; the next sync retries it: {repair_error}")
+        raise
+    finally:
+        # Every write, not only rollup changes: pending->posted and merchant or name edits net to
+        # zero rollup deltas but still change what recurring detection reads. After the rollups,
+        # so a chart read in between cannot cache the old buckets under the new version
+        for user_id in user_ids:
+            versioned_cache.invalidate_user(user_id)
+    _read_flights.invalidate(lambda key: (key[0] == "item" and key[1] in owners)
+                             or (key[0] == "user" and key[1] in user_ids))
+    return len(operations)
+
+
+async def rebuild_rollups(item_id: str, user_id: str) -> None:
+    """Rebuilds a user's rollups and budget totals from the stored rows and clears the item's rollups_dirty mark."""
+    await rollup_service.check_user_rollups(user_id, repair=True)
+    await budget_service.reseed_budgets(user_id)
+    await PlaidItem.get_motor_collection().update_one({"item_id": item_id}, {"$set": {"rollups_dirty": False}})
+
+
+async def sync_item(plaid_item: PlaidItem) -> Dict[str, int]:
+    """
+    Pulls every change since the item's stored cursor from /transactions/sync, applies it to the
+    local store and persists the new cursor. Concurrent calls for the same item share one sync;
+    while another process is syncing it, the call waits for that process's lease.
+
+    Pages are accumulated before anything is written, as Plaid recommends, so a pagination
+    restart never leaves half of an update applied.
+
+    Returns:
+        Counts of added, modified and removed transactions.
+    """
+    counts, cursor = await _sync_flights.do(plaid_item.item_id, lambda: _sync(plaid_item.item_id))
+    plaid_item.transactions_cursor = cursor
+    return counts
+
+
+async def sync_item_by_id(item_id: str, fresh: bool = False, wait: bool = True,
+                          apply: ApplyChanges = apply_changes) -> Optional[Dict[str, int]]:
+    """
+    Syncs an item by id. With fresh=True a sync that was already running is not reused (it may
+    have started before the change the caller was told about); a new one runs after it.
+    With wait=False, returns None instead of waiting when another process holds the item's lease.
+    `apply` writes the fetched changes, e.g. a batching writer shared by several syncs.
+    """
+    if not wait:
+        counts, _ = await _sync_flights.do(("if-free", item_id), lambda: _sync(item_id, wait=False, apply=apply))
+    elif fresh:
+        counts, _ = await _sync_flights.do_fresh(item_id, lambda: _sync(item_id, apply=apply))
+    else:
+        counts, _ = await _sync_flights.do(item_id, lambda: _sync(item_id, apply=apply))
+    return counts
+
+
+def backoff_seconds(failures: int) -> float:
+    """Exponential backoff after `failures` consecutive failed syncs, capped and jittered (+-25%)."""
+    delay = min(settings.REFRESH_BACKOFF_MAX_SECONDS, settings.REFRESH_BACKOFF_BASE_SECONDS * 2 ** (failures - 1))
+    return delay * random.uniform(0.75, 1.25)
+
+
+async def _claim(item_id: str, wait: bool) -> Optional[PlaidItem]:
+    """
+    Atomically takes the item's sync lease under a new token and returns the item as claimed.
+    While another process holds it, polls until it is released or expires, or returns None right
+    away with wait=False.
+    """
+    collection = PlaidItem.get_motor_collection()
+    while True:
+        now = datetime.utcnow()
+        raw = await collection.find_one_and_update(
+            {"item_id": item_id, "$or": [{"sync_lease_until": None}, {"sync_lease_until": {"$lt": now}}]},
+            {"$set": {"sync_lease_until": now + timedelta(seconds=settings.SYNC_LEASE_SECONDS),
+                      "sync_lease_token": uuid.uuid4().hex}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if raw is not None:
+            return PlaidItem.model_validate(raw)
+        if await collection.count_documents({"item_id": item_id}, limit=1) == 0:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plaid item not found")
+        if not wait:
+            return None
+        await asyncio.sleep(LEASE_POLL_SECONDS)
+
+
+async def _renew_lease(item_id: str, token: str) -> bool:
+    """Extends the lease if this claim still holds it; False if it expired and was taken over."""
+    result = await PlaidItem.get_motor_collection().update_one(
+        {"item_id": item_id, "sync_lease_token": token},
+        {"$set": {"sync_lease_until": datetime.utcnow() + timedelta(seconds=settings.SYNC_LEASE_SECONDS)}},
+    )
+    return result.matched_count == 1
+
+
+async def _sync(item_id: str, wait: bool = True,
+                apply: ApplyChanges = apply_changes) -> Tuple[Optional[Dict[str, int]], Optional[str]]:
+    """
+    One sync under the item's lease, so processes never apply the same changes twice (rollup and
+    budget deltas would be counted once per process). Returns (None, None) if not claimed.
+    """
+    current = await _claim(item_id, wait)
+    if current is None:
+        return None, None
+    try:
+        return await _sync_claimed(current, apply)
+    finally:
+        # Only our own lease: after an expiry another process may hold a newer one
+        await PlaidItem.get_motor_collection().update_one(
+            {"item_id": item_id, "sync_lease_token": current.sync_lease_token},
+            {"$set": {"sync_lease_until": None, "sync_lease_token": None}},
+        )
+
+
+async def _sync_claimed(current: PlaidItem, apply: ApplyChanges) -> Tuple[Dict[str, int], Optional[str]]:
+    """
+    Fetches and applies the item's changes, then commits the new cursor only if this claim's lease
+    token still matches. The lease is renewed before writing, so a slow Plaid fetch cannot let
+    another process sync the same change set concurrently; if the lease is lost during the write
+    anyway, the cursor is not committed and the item is marked for a rollup rebuild.
+    """
+    item_id = current.item_id
+    lease = {"item_id": item_id, "sync_lease_token": current.sync_lease_token}
+    started = time.perf_counter()
+    try:
+        if current.rollups_dirty: # An earlier sync wrote rows but not their rollup deltas
+            await rebuild_rollups(current.item_id, current.user_id)
+        access_token = access_token_cache.token_for(current) # Decrypts only if not cached for this ciphertext
+        added, modified, removed, cursor = await plaid_service.sync_transactions(
+            access_token, current.transactions_cursor
+        )
+        if not await _renew_lease(item_id, current.sync_lease_token):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Sync lease expired and another process took over the item")
+        await apply(current.item_id, current.user_id, added, modified, removed)
+    except Exception as e:
+        # Record the failure (and when to try again) without touching the cursor, then re-raise;
+        # not if the lease was lost, the new holder's outcome is the one to keep
+        failures = current.consecutive_failures + 1
+        now = datetime.utcnow()
+        await PlaidItem.get_motor_collection().update_one(lease, {"$set": {
+            "last_sync_status": "error",
+            "last_sync_error": str(getattr(e, "detail", e))[:500],
+            "last_sync_duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "consecutive_failures": failures,
+            "next_sync_after": now + timedelta(seconds=backoff_seconds(failures)),
+            "updated_at": now,
+        }})
+        raise
+
+    counts = {"added": len(added), "modified": len(modified), "removed": len(removed)}
+    now = datetime.utcnow()
+    committed = await PlaidItem.get_motor_collection().update_one(lease, {"$set": {
+        "transactions_cursor": cursor,
+        "updated_at": now,
+        "last_sync_time": now,
+        "last_sync_status": "ok",
+        "last_sync_error": None,
+        "last_sync_duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "last_sync_changes": sum(counts.values()),
+        "consecutive_failures": 0,
+        "next_sync_after": None,
+    }})
+    if committed.matched_count == 0:
+        # The new holder syncs from the old cursor again: rows are upserts, but rollup and budget
+        # deltas may now be counted twice, so have the next sync rebuild them
+        print(f"Sync lease for item {item_id} was lost while writing; cursor not committed")
+        await PlaidItem.get_motor_collection().update_one({"item_id": item_id}, {"$set": {"rollups_dirty": True}})
+        return counts, current.transactions_cursor
+    return counts, cursor
+
+
+def _range_cursor(item_id: str, start_date: date, end_date: date):
+    """Motor cursor over one item's rows in [start_date, end_date], newest first, via the (item_id, date) index."""
+    return Transaction.get_motor_collection().find(
+        {"item_id": item_id, "date": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()}},
+        {"_id": 0, **{name: 1 for name in PLAID_TRANSACTION_FIELDS}},
+    ).sort("date", -1)
+
+
+async def get_item_transactions(item_id: str, start_date: date, end_date: date,
+                                limit: Optional[int] = None) -> List[CompactTransaction]:
+    """
+    Reads one item's transactions in [start_date, end_date], newest first. Raw rows are turned
+    straight into CompactTransaction objects; no Beanie model is built per row.
+    """
+    cursor = _range_cursor(item_id, start_date, end_date)
+    if limit:
+        cursor = cursor.limit(limit)
+    return [CompactTransaction.from_document(doc) for doc in await cursor.to_list(None)]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parses a comma-separated sparse fieldset such as "date,amount,category".
+
+    Raises:
+        HTTPException 400: If a name is not a transaction field.
+    """
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in FIELD_NAMES]
+    if unknown or not names:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown transaction fields: {', '.join(unknown) or fields}")
+    return names
+
+
+def encode_page_cursor(last_date: str, last_transaction_id: str) -> str:
+    """Opaque cursor for the position after (date, transaction_id) in newest-first order."""
+    raw = json.dumps([last_date, last_transaction_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_page_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_date, last_transaction_id = json.loads(raw)
+        if not isinstance(last_date, str) or not isinstance(last_transaction_id, str):
+            raise ValueError(cursor)
+        return last_date, last_transaction_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+async def get_transactions_page(scope: Dict[str, str], start_date: date, end_date: date,
+                                page_size: Optional[int] = None, cursor: Optional[str] = None,
+                                fields: Optional[str] = None
+                                ) -> Tuple[List[Union[CompactTransaction, Dict[str, Any]]], Optional[str]]:
+    """
+    Reads one page of transactions newest first, using keyset pagination over (date, transaction_id).
+
+    `scope` is {"item_id": ...} or {"user_id": ...}; either way the query walks the matching
+    (scope, date, transaction_id) index from the cursor position, so page N costs the same as
+    page 1 (no skip/offset). With `fields`, rows are dicts holding only those fields and MongoDB
+    projects only them (plus the cursor keys).
+
+    Returns:
+        The rows and the cursor for the next page (None on the last page).
+    """
+    names = parse_fields(fields)
+    query: Dict[str, Any] = {**scope, "date": {"$gte": start_date.isoformat(), "$lte": end_date.isoformat()}}
+    if cursor:
+        last_date, last_id = decode_page_cursor(cursor)
+        query["date"]["$lte"] = min(query["date"]["$lte"], last_date) # Tighter index bounds for the $or below
+        query["$or"] = [
+            {"date": {"$lt": last_date}},
+            {"date": last_date, "transaction_id": {"$lt": last_id}},
+        ]
+    projected = names + ("date", "transaction_id") if names else PLAID_TRANSACTION_FIELDS
+    db_cursor = Transaction.get_motor_collection().find(
+        query, {"_id": 0, **{name: 1 for name in projected}}
+    ).sort([("date", -1), ("transaction_id", -1)])
+    if page_size:
+        db_cursor = db_cursor.limit(page_size + 1) # One extra row tells us whether a next page exists
+    docs = await db_cursor.to_list(None)
+
+    next_cursor = None
+    if page_size and len(docs) > page_size:
+        docs = docs[:page_size]
+        next_cursor = encode_page_cursor(docs[-1]["date"], docs[-1]["transaction_id"])
+    if names:
+        return [sparse_row(doc, names) for doc in docs], next_cursor
+    return [CompactTransaction.from_document(doc) for doc in docs], next_cursor
+
+
+async def get_user_transactions(user_id: str, start_date: date, end_date: date,
+                                refresh: bool = False) -> List[CompactTransaction]:
+    """
+    Reads every linked item's transactions for a user as one newest-first stream.
+
+    Items are loaded with one query and fetched concurrently (at most
+    settings.TRANSACTIONS_FANOUT_CONCURRENCY at a time), so latency tracks the slowest item rather
+    than the sum. Each per-item list is already date-sorted by its index scan, so they are combined
+    with a k-way merge instead of concatenating and re-sorting.
+    """
+    items = await PlaidItem.find(PlaidItem.user_id == user_id).to_list()
+    # Decrypt the tokens needed by the syncs below in one batch; sync_item then hits the cache
+    access_token_cache.tokens_for([item for item in items if item.transactions_cursor is None or refresh])
+    semaphore = asyncio.Semaphore(settings.TRANSACTIONS_FANOUT_CONCURRENCY)
+
+    async def load(item: PlaidItem) -> List[CompactTransaction]:
+        async with semaphore:
+            if item.transactions_cursor is None or refresh:
+                await sync_item(item)
+            return await get_item_transactions(item.item_id, start_date, end_date)
+
+    per_item = await asyncio.gather(*(load(item) for item in items))
+    return list(heapq.merge(*per_item, key=attrgetter("date"), reverse=True))
+
+
+async def read_item_transactions(item_id: str, start_date: date, end_date: date, refresh: bool = False,
+                                 page_size: Optional[int] = None, cursor: Optional[str] = None,
+                                 fields: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Serves POST /items/{item_id}/transactions: syncs if the item was never synced (or on refresh,
+    first page only), then reads the whole range or one keyset page.
+
+    Identical concurrent requests (same item, range and options) share one execution, and the
+    result is reused for TRANSACTIONS_RESULT_CACHE_TTL_SECONDS or until the item's transactions
+    change. Refresh requests join an in-flight call but never take a cached result.
+
+    Returns:
+        The transactions and the next page cursor (None when not paginated or on the last page).
+    """
+    refresh = refresh and not cursor # Later pages continue the first page's snapshot
+
+    async def load() -> Tuple[List[Any], Optional[str]]:
+        plaid_item = await PlaidItem.find_one(PlaidItem.item_id == item_id)
+        if not plaid_item:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plaid item not found or access denied")
+        if plaid_item.transactions_cursor is None or refresh:
+            await sync_item(plaid_item)
+        if page_size or cursor or fields:
+            return await get_transactions_page({"item_id": item_id}, start_date, end_date, page_size, cursor, fields)
+        return await get_item_transactions(item_id, start_date, end_date), None
+
+    key = ("item", item_id, start_date, end_date, refresh, page_size, cursor, fields)
+    return await _read_flights.do(key, load, use_cache=not refresh)
+
+
+async def read_user_transactions(user_id: str, start_date: date, end_date: date, refresh: bool = False,
+                                 page_size: Optional[int] = None, cursor: Optional[str] = None,
+                                 fields: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """Per-user counterpart of read_item_transactions, with the same coalescing and caching."""
+    refresh = refresh and not cursor
+
+    async def load() -> Tuple[List[Any], Optional[str]]:
+        if page_size or cursor or fields:
+            # One (user_id, date, transaction_id) index walk instead of a per-item fan-out
+            items = await PlaidItem.find(PlaidItem.user_id == user_id).to_list()
+            await sync_stale_items(items, refresh)
+            return await get_transactions_page({"user_id": user_id}, start_date, end_date, page_size, cursor, fields)
+        return await get_user_transactions(user_id, start_date, end_date, refresh=refresh), None
+
+    key = ("user", user_id, start_date, end_date, refresh, page_size, cursor, fields)
+    return await _read_flights.do(key, load, use_cache=not refresh)
+
+
+def read_stats() -> Dict[str, Dict[str, int]]:
+    """Coalescing/caching counters for this worker."""
+    return {"reads": _read_flights.stats(), "syncs": _sync_flights.stats()}
+
+
+async def sync_stale_items(items: List[PlaidItem], refresh: bool = False) -> None:
+    """Syncs the items that were never synced (or all of them with refresh), bounded like the fan-out."""
+    stale = [item for item in items if item.transactions_cursor is None or refresh]
+    if not stale:
+        return
+    access_token_cache.tokens_for(stale)
+    semaphore = asyncio.Semaphore(settings.TRANSACTIONS_FANOUT_CONCURRENCY)
+
+    async def sync(item: PlaidItem) -> None:
+        async with semaphore:
+            await sync_item(item)
+
+    await asyncio.gather(*(sync(item) for item in stale))
+
+
+async def iter_item_transactions(item_id: str, start_date: date, end_date: date,
+                                 page_size: Optional[int] = None) -> AsyncIterator[List[CompactTransaction]]:
+    """
+    Streams one item's transactions in [start_date, end_date], newest first, in pages of
+    `page_size`. Rows come straight off the Motor cursor with a projection (no Beanie model per
+    row), so memory stays O(page) however large the range is.
+    """
+    page_size = page_size or settings.TRANSACTIONS_STREAM_PAGE_SIZE
+    cursor = _range_cursor(item_id, start_date, end_date).batch_size(page_size)
+    while True:
+        page = await cursor.to_list(page_size)
+        if not page:
+            return
+        yield [CompactTransaction.from_document(doc) for doc in page]
+
+
+async def iter_user_transactions(user_id: str, start_date: date, end_date: date, refresh: bool = False,
+                                 page_size: Optional[int] = None) -> AsyncIterator[List[CompactTransaction]]:
+    """
+    Streaming counterpart of get_user_transactions: merges the per-item streams newest first while
+    holding at most one page per item, and yields pages of `page_size` transactions.
+    """
+    page_size = page_size or settings.TRANSACTIONS_STREAM_PAGE_SIZE
+    items = await PlaidItem.find(PlaidItem.user_id == user_id).to_list()
+    await sync_stale_items(items, refresh)
+
+    streams = [iter_item_transactions(item.item_id, start_date, end_date, page_size) for item in items]
+    first_pages = await asyncio.gather(*(anext(stream, None) for stream in streams))
+    heads = {i: (page, 0) for i, page in enumerate(first_pages) if page}
+    out: List[CompactTransaction] = []
+    while heads:
+        # Few items per user, so a linear pick over the stream heads beats maintaining a heap
+        i = max(heads, key=lambda j: heads[j][0][heads[j][1]].date)
+        page, pos = heads[i]
+        out.append(page[pos])
+        if pos + 1 < len(page):
+            heads[i] = (page, pos + 1)
+        else:
+            next_page = await anext(streams[i], None)
+            if next_page:
+                heads[i] = (next_page, 0)
+            else:
+                del heads[i]
+        if len(out) >= page_size:
+            yield out
+            out = []
+    if out:
+        yield out
@@ -0,0 +1,189 @@
+# app/services/webhook_service.py
+# Plaid webhook ingestion: the receiver only enqueues, a pool of workers turns queued items into
+# incremental /transactions/sync runs (coalescing repeated events per item), and a writer stage
+# applies the change sets the workers fetched, several items per bulk_write.
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services import transaction_service
+
+# TRANSACTIONS webhook codes that mean "there is something new to pull". SYNC_UPDATES_AVAILABLE is
+# sent to /transactions/sync integrations; the others are the legacy /transactions/get codes.
+SYNC_WEBHOOK_CODES = {
+    "SYNC_UPDATES_AVAILABLE", "DEFAULT_UPDATE", "INITIAL_UPDATE", "HISTORICAL_UPDATE", "TRANSACTIONS_REMOVED",
+}
+
+
+class ChangeWriter:
+    """
+    Writer stage: change sets fetched by the sync workers wait here, and every set that is ready
+    when a write starts (up to `max_batch`) is applied by one transaction_service.apply_change_sets
+    call: one bulk_write for the rows of all those items, one for their rollups, one for budgets.
+
+    A write starts as soon as the previous one finished, so a lone change set is not held back and
+    batches grow with the backlog. Each caller gets the batch's outcome; on failure every item in
+    the batch records it, as its own sync would have.
+    """
+
+    def __init__(self, max_batch: int = 100):
+        self.max_batch = max_batch
+        self._pending: List[Tuple[transaction_service.ChangeSet, asyncio.Future]] = []
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {"write_batches": 0, "batched_items": 0}
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+
+    async def apply(self, item_id: str, user_id: str, added: List[Dict[str, Any]],
+                    modified: List[Dict[str, Any]], removed: List[str]) -> int:
+        """Drop-in for transaction_service.apply_changes: returns once the batch holding this set is written."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((item_id, user_id, added, modified, removed), future))
+        self._ready.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._ready.wait()
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if not self._pending:
+                self._ready.clear()
+            batch = [(change_set, future) for change_set, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                written = await transaction_service.apply_change_sets([change_set for change_set, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(written)
+            self.counters["write_batches"] += 1
+            self.counters["batched_items"] += len(batch)
+
+
+class WebhookProcessor:
+    """
+    Queue + workers behind POST /api/v1/plaid/webhook.
+
+    An item appears in the queue at most once. Further events for an item that is still waiting
+    are coalesced into that entry; an event that arrives while the item is being synced queues a
+    new pass, and that pass does not reuse the running sync (see sync_item_by_id(fresh=True)), so
+    no update is missed. The same holds across processes: a pass for an item another process is
+    syncing waits for that process's lease and then syncs again. What each pass fetched is written
+    by the shared ChangeWriter, batched with the passes of other items that finished fetching.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 10000, write_batch: int = 100):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.writer = ChangeWriter(max_batch=write_batch)
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._waiting: Dict[str, List[float]] = {} # item_id -> receipt times of events not yet picked up
+        self._tasks: List[asyncio.Task] = []
+        self._lags: Deque[float] = deque(maxlen=10000) # Receipt -> covering sync completed, seconds
+        self.counters: Dict[str, int] = {
+            "received": 0, "coalesced": 0, "rejected": 0, "syncs": 0, "failures": 0, "transactions": 0,
+        }
+
+    # --- Lifecycle ---
+    async def start(self) -> None:
+        if not self._tasks:
+            await self.writer.start()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.writer.stop()
+
+    async def drain(self) -> None:
+        """Waits until every queued item has been processed (tests and benchmarks)."""
+        await self._queue.join()
+
+    # --- Intake ---
+    def enqueue(self, item_id: str) -> bool:
+        """Records an update for `item_id`. Returns False when the backlog is full (caller answers 503)."""
+        now = time.monotonic()
+        waiting = self._waiting.get(item_id)
+        if waiting is not None:
+            waiting.append(now)
+            self.counters["received"] += 1
+            self.counters["coalesced"] += 1
+            return True
+        if len(self._waiting) >= self.max_pending:
+            self.counters["rejected"] += 1
+            return False
+        self._waiting[item_id] = [now]
+        self._queue.put_nowait(item_id)
+        self.counters["received"] += 1
+        return True
+
+    # --- Workers ---
+    async def _worker(self) -> None:
+        while True:
+            item_id = await self._queue.get()
+            # From here on, new events for this item queue another pass
+            received = self._waiting.pop(item_id, [])
+            try:
+                counts = await transaction_service.sync_item_by_id(item_id, fresh=True, apply=self.writer.apply)
+                done = time.monotonic()
+                self._lags.extend(done - t for t in received)
+                self.counters["syncs"] += 1
+                self.counters["transactions"] += sum(counts.values())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["failures"] += 1
+                print(f"Webhook sync failed for item {item_id}: {getattr(e, 'detail', e)}")
+            finally:
+                self._queue.task_done()
+
+    # --- Diagnostics ---
+    def stats(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+
+        def pct(p: float) -> Optional[float]:
+            return round(lags[min(len(lags) - 1, int(p / 100 * len(lags)))] * 1000, 1) if lags else None
+
+        return {
+            **self.counters,
+            **self.writer.counters,
+            "queued_items": len(self._waiting),
+            "lag_p50_ms": pct(50),
+            "lag_p95_ms": pct(95),
+            "lag_p99_ms": pct(99),
+            "lag_max_ms": round(lags[-1] * 1000, 1) if lags else None,
+        }
+
+
+# Shared instance; started and stopped by the app lifespan
+webhook_processor = WebhookProcessor(
+    workers=settings.WEBHOOK_WORKERS,
+    max_pending=settings.WEBHOOK_MAX_PENDING_ITEMS,
+    write_batch=settings.WEBHOOK_WRITE_BATCH_ITEMS,
+)
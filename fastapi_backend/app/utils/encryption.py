@@ -2,19 +2,15 @@
 # Utilities for encrypting and decrypting sensitive data like Plaid access tokens.
 
 from cryptography.fernet import Fernet
-import base64
-import os
+import time
+from typing import List
 from app.core.config import settings
+from app.utils.metrics import crypto_duration
 
 # We should store this key securely, ideally in a key management system
-# For development, we'll use an environment variable
-ENCRYPTION_KEY = settings.ENCRYPTION_KEY.encode() if hasattr(settings, 'ENCRYPTION_KEY') else None
-
-if not ENCRYPTION_KEY:
-    # Generate a key if not provided (this should be stored and reused)
-    ENCRYPTION_KEY = base64.urlsafe_b64encode(os.urandom(32))
-    print("WARNING: No encryption key found in settings. Generated a temporary one.")
-    print(f"Set ENCRYPTION_KEY={ENCRYPTION_KEY.decode()} in your environment for persistence.")
+# For development, we'll use an environment variable. It is required: a per-process random key
+# would make tokens written by one process (e.g. the provisioning CLI) unreadable by the others
+ENCRYPTION_KEY = settings.ENCRYPTION_KEY.encode()
 
 # Initialize Fernet with the key
 fernet = Fernet(ENCRYPTION_KEY)
@@ -32,9 +28,25 @@ def encrypt_token(token: str) -> str:
     if not token:
         return ""
     
-    encrypted_token = fernet.encrypt(token.encode())
+    with crypto_duration.time(operation="encrypt"):
+        encrypted_token = fernet.encrypt(token.encode())
     return encrypted_token.decode()
 
+def encrypt_tokens(tokens: List[str]) -> List[str]:
+    """
+    Encrypt several tokens in one call, preserving order (e.g. when provisioning items in bulk).
+    All tokens share one timestamp; each still gets its own random IV.
+
+    Args:
+        tokens: The plaintext tokens to encrypt
+
+    Returns:
+        The encrypted tokens ("" for empty inputs, like encrypt_token)
+    """
+    now = int(time.time())
+    with crypto_duration.time(operation="encrypt_batch"):
+        return [fernet.encrypt_at_time(t.encode(), now).decode() if t else "" for t in tokens]
+
 def decrypt_token(encrypted_token: str) -> str:
     """
     Decrypt an encrypted token (e.g., Plaid access token).
@@ -48,5 +60,19 @@ def decrypt_token(encrypted_token: str) -> str:
     if not encrypted_token:
         return ""
     
-    decrypted_token = fernet.decrypt(encrypted_token.encode())
-    return decrypted_token.decode()
\ No newline at end of file
+    with crypto_duration.time(operation="decrypt"):
+        decrypted_token = fernet.decrypt(encrypted_token.encode())
+    return decrypted_token.decode()
+
+def decrypt_tokens(encrypted_tokens: List[str]) -> List[str]:
+    """
+    Decrypt several encrypted tokens in one call, preserving order.
+
+    Args:
+        encrypted_tokens: The encrypted token strings
+
+    Returns:
+        The decrypted plaintext tokens ("" for empty inputs, like decrypt_token)
+    """
+    with crypto_duration.time(operation="decrypt_batch"):
+        return [fernet.decrypt(t.encode()).decode() if t else "" for t in encrypted_tokens]
@@ -0,0 +1,235 @@
+# app/utils/metrics.py
+# In-process latency metrics in the Prometheus text format: per-route request histograms and
+# in-flight gauges (MetricsMiddleware), plus timers for upstream calls (Plaid, MongoDB commands,
+# JWKS fetches) and Fernet operations. Served by GET /metrics (see app/main.py).
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pymongo import monitoring
+
+# Seconds; spans cache hits (sub-millisecond) to slow Plaid syncs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        # Observations come from the event loop and from pymongo's monitoring callbacks
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return super().render() + [f"{self.name}{_format_labels(self.labelnames, k)} {v:g}" for k, v in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {} # per-bucket counts, then sum and count
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        """Observations recorded so far for one label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the duration of the block, also when it raises (works around awaits too)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        lines = super().render()
+        for key, values in series:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative:g}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {values[-1]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-1]:g}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+# --- Metrics ---
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"))
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+upstream_duration = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to Plaid, MongoDB and Auth0.", ("upstream", "operation"))
+upstream_errors = Counter(
+    "upstream_errors_total", "Failed upstream calls.", ("upstream", "operation"))
+crypto_duration = Histogram(
+    "fernet_operation_duration_seconds", "Fernet encryption/decryption time.", ("operation",),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1))
+
+
+@contextmanager
+def time_upstream(upstream: str, operation: str) -> Iterator[None]:
+    """Times one upstream call; exceptions are counted in upstream_errors_total and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        upstream_errors.inc(upstream=upstream, operation=operation)
+        raise
+    finally:
+        upstream_duration.observe(time.perf_counter() - start, upstream=upstream, operation=operation)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# --- HTTP ---
+def _route_template(scope: Dict[str, Any]) -> str:
+    """
+    The matched route template, e.g. /api/v1/plaid/items/{item_id}/transactions. FastAPI releases
+    that copy routes in include_router store this prefixed path on the route; newer ones keep the
+    router's own route (/items/{item_id}/transactions) and record the include prefix in
+    scope["fastapi"]["included_router"], which is added back here.
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return "<unmatched>"
+    included = scope.get("fastapi", {}).get("included_router")
+    return getattr(getattr(included, "include_context", None), "prefix", "") + path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task overhead, streaming bodies untouched).
+    Labels requests with the matched route template (e.g. /api/v1/plaid/items/{item_id}/transactions)
+    so ids do not explode the label space; the time
+    covers the full response, including streamed bodies.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method=method)
+            http_request_duration.observe(
+                time.perf_counter() - start, method=method, route=_route_template(scope), status=str(status["code"]),
+            )
+
+
+# --- MongoDB ---
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener: times every command sent by Motor (every Beanie query and the raw
+    collection calls alike), labelled "<command> <collection>", e.g. "find transactions".
+    """
+
+    def __init__(self) -> None:
+        self._operations: Dict[Tuple[Any, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        target = event.command.get(event.command_name)
+        operation = f"{event.command_name} {target}" if isinstance(target, str) else event.command_name
+        self._operations[(event.connection_id, event.request_id)] = operation
+
+    def _finish(self, event: Any, failed: bool) -> None:
+        operation = self._operations.pop((event.connection_id, event.request_id), event.command_name)
+        upstream_duration.observe(event.duration_micros / 1e6, upstream="mongodb", operation=operation)
+        if failed:
+            upstream_errors.inc(upstream="mongodb", operation=operation)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+
+mongo_command_metrics = MongoCommandMetrics()
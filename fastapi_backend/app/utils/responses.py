@@ -0,0 +1,36 @@
+# app/utils/responses.py
+# Response classes used by the transaction endpoints.
+
+import dataclasses
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from app.schemas.transaction_schemas import CompactTransaction
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, CompactTransaction):
+        return obj.as_dict() # Leaves out null-only sub-objects
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson.dumps with the options and dataclass handling of OrjsonResponse (also used for NDJSON lines)."""
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Dataclasses (e.g. CompactTransaction, via as_dict()),
+    datetimes and numpy scalars are encoded directly, so route handlers can return them without a
+    Pydantic validation/serialization pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,84 @@
+# app/utils/singleflight.py
+# Request coalescing: concurrent calls with the same key share one execution, and successful
+# results can be kept for a short TTL so bursts of identical reads hit MongoDB/Plaid once.
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+
+
+class SingleFlight:
+    """
+    In-process single-flight group with an optional short-TTL result cache.
+
+    - do(key, fn): if a call for `key` is already running, await its result instead of calling
+      fn again. The shared task is shielded, so one waiter being cancelled (client disconnect)
+      does not cancel it for the others.
+    - Exceptions are shared by the waiters of that flight but never cached.
+    - With ttl > 0, a successful result is served for `ttl` seconds unless use_cache=False
+      (the caller still joins an in-flight call) or invalidate() drops it.
+    - Each in-flight key has a generation that invalidate() bumps; a call whose key was
+      invalidated while it ran still answers its waiters but its result is not cached, since it
+      may have read data from before the write that caused the invalidation.
+    """
+
+    def __init__(self, ttl: float = 0.0, maxsize: int = 256):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generations: Dict[Hashable, int] = {} # Only for in-flight keys
+        self._results: Optional[TTLCache] = TTLCache(maxsize=maxsize, ttl=ttl) if ttl > 0 else None
+        self.counters: Dict[str, int] = {"calls": 0, "executions": 0, "shared": 0, "cache_hits": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], use_cache: bool = True) -> Any:
+        self.counters["calls"] += 1
+        if use_cache and self._results is not None and key in self._results:
+            self.counters["cache_hits"] += 1
+            return self._results[key]
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            self.counters["executions"] += 1
+            flight = asyncio.ensure_future(fn())
+            self._inflight[key] = flight
+            generation = self._generations.setdefault(key, 0)
+            flight.add_done_callback(lambda f: self._finish(key, f, generation))
+        else:
+            self.counters["shared"] += 1
+        return await asyncio.shield(flight)
+
+    async def do_fresh(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Like do(), but never reuses a call that was already running when this one arrived (its
+        input may predate the caller's): waits for it to finish, then runs or joins the next one.
+        """
+        flight = self._inflight.get(key)
+        if flight is not None:
+            try:
+                await asyncio.shield(flight)
+            except Exception:
+                pass # Its failure is reported to its own callers; we start a new call below
+        return await self.do(key, fn, use_cache=False)
+
+    def _finish(self, key: Hashable, flight: asyncio.Future, generation: int) -> None:
+        current = self._generations.get(key)
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+            self._generations.pop(key, None)
+        if (self._results is not None and current == generation
+                and not flight.cancelled() and flight.exception() is None):
+            self._results[key] = flight.result()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Drops cached results whose key matches `predicate`. In-flight calls for those keys are left
+        to finish, but their results will not be cached.
+        """
+        if self._results is not None:
+            for key in [k for k in list(self._results.keys()) if predicate(k)]:
+                self._results.pop(key, None)
+        for key in [k for k in self._generations if predicate(k)]:
+            self._generations[key] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "in_flight": len(self._inflight),
+                "cached": len(self._results) if self._results is not None else 0}
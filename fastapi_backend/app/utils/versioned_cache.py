@@ -0,0 +1,53 @@
+# app/utils/versioned_cache.py
+# Per-user caches of results derived from a user's transactions (chart series, recurring series,
+# forecasts), all dropped for a user by one invalidate_user() call from the write path.
+
+from typing import Any, Hashable, List, Optional
+
+from cachetools import LRUCache, TTLCache
+
+
+class VersionedCache:
+    """
+    Results cached per (user_id, key) for `ttl` seconds, at most `maxsize` users and `per_user`
+    keys per user.
+
+    Each user's results and version share one TTLCache slot, so the version is evicted with the
+    results instead of outliving them. invalidate() replaces the slot with an empty one at the next
+    version; callers read version() before loading and pass it to put(), so a result built from data
+    read before an invalidation is never stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, per_user: int = 16):
+        self._users: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl) # user_id -> (version, LRUCache)
+        self.per_user = per_user
+        _caches.append(self)
+
+    def version(self, user_id: str) -> int:
+        slot = self._users.get(user_id)
+        return slot[0] if slot is not None else 0
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        slot = self._users.get(user_id)
+        return slot[1].get(key) if slot is not None else None
+
+    def put(self, user_id: str, key: Hashable, value: Any, version: int) -> None:
+        slot = self._users.get(user_id)
+        if slot is None:
+            if version != 0:
+                return # Invalidated and since expired; the caller read before that
+            slot = self._users[user_id] = (0, LRUCache(maxsize=self.per_user))
+        if slot[0] == version:
+            slot[1][key] = value
+
+    def invalidate(self, user_id: str) -> None:
+        self._users[user_id] = (self.version(user_id) + 1, LRUCache(maxsize=self.per_user))
+
+
+_caches: List[VersionedCache] = []
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drops everything cached for a user in every VersionedCache; call after their data is written."""
+    for cache in _caches:
+        cache.invalidate(user_id)
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Benchmarks and load tests run against local stand-ins for Plaid (and MongoDB when no URL is given).
+# Run from fastapi_backend/, e.g. `python -m benchmarks.bench_event_loop`.
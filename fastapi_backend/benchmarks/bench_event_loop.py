@@ -0,0 +1,120 @@
+# benchmarks/bench_event_loop.py
+# Measures latency of unrelated routes (`/`, `/api/v1/users/me`) while N transaction fetches
+# are in flight against a slow local fake Plaid server.
+#
+#   python -m benchmarks.bench_event_loop                 # async Plaid client (current code)
+#   python -m benchmarks.bench_event_loop --blocking      # baseline: blocking HTTP call, like the old SDK path
+#
+# Pass --mongo-url to use a real MongoDB; the in-memory default does its work on the event loop
+# and inflates the numbers for both modes.
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import ServerProcess, configure_env, init_bench_db, summarize
+
+
+def install_blocking_baseline(plaid_service, plaid_host: str) -> None:
+    """Replaces sync_transactions with synchronous HTTP calls, reproducing the old plaid-python behaviour."""
+    import requests
+
+    session = requests.Session()
+
+    async def blocking_sync_transactions(access_token, cursor):
+        added, has_more = [], True
+        while has_more:
+            page = session.post(f"{plaid_host}/transactions/sync", json={
+                "access_token": access_token, "cursor": cursor, "count": 500,
+            }).json()
+            added.extend(page["added"])
+            cursor, has_more = page["next_cursor"], page["has_more"]
+        return added, [], [], cursor
+
+    plaid_service.sync_transactions = blocking_sync_transactions
+
+
+async def run(args: argparse.Namespace, plaid_url: str) -> Dict[str, Dict[str, float]]:
+    from app.main import app
+    from app.models.plaid_item_model import PlaidItem
+    from app.models.user_model import User
+    from app.routers import plaid as plaid_router
+    from app.utils.encryption import encrypt_token
+
+    await init_bench_db(args.mongo_url)
+    await User(user_id="dev-user-123", email="dev@example.com").insert()
+    # One item per fetch: per-item sync locks would otherwise serialize the fetches
+    for i in range(args.fetches):
+        await PlaidItem(item_id=f"bench-item-{i}", user_id="dev-user-123",
+                        access_token=encrypt_token(f"access-sandbox-bench-{i}")).insert()
+    if args.blocking:
+        install_blocking_baseline(plaid_router.plaid_service, plaid_url)
+
+    transport = httpx.ASGITransport(app=app)
+    latencies: Dict[str, List[float]] = {"/": [], "/api/v1/users/me": [], "transactions": []}
+    in_flight = asyncio.Event()
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def fetch_transactions(i: int) -> None:
+            start = time.perf_counter()
+            in_flight.set()
+            await asyncio.sleep(0)  # Let the probes start before a blocking call can grab the loop
+            response = await client.post(f"/api/v1/plaid/items/bench-item-{i}/transactions",
+                                         json={"start_date": "2000-01-01", "end_date": "2100-01-01",
+                                               "refresh": True})
+            response.raise_for_status()
+            latencies["transactions"].append(time.perf_counter() - start)
+
+        async def probe(path: str) -> None:
+            # Latency is measured from the *scheduled* send time, so time spent waiting for a
+            # blocked event loop counts against the route (no coordinated omission).
+            await in_flight.wait()
+            interval = args.probe_interval_ms / 1000.0
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                # Always yield: in-process ASGI calls may never suspend on their own
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                response = await client.get(path)
+                response.raise_for_status()
+                finished = time.perf_counter()
+                latencies[path].append(finished - scheduled)
+                scheduled = max(scheduled + interval, finished)  # Skip slots missed during a stall
+
+        probes = [asyncio.create_task(probe(path)) for path in ("/", "/api/v1/users/me")]
+        await asyncio.gather(*(fetch_transactions(i) for i in range(args.fetches)))
+        done.set()
+        await asyncio.gather(*probes)
+
+    await plaid_router.plaid_service.aclose()
+    return {route: summarize(values) for route, values in latencies.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event-loop responsiveness under in-flight Plaid fetches")
+    parser.add_argument("--fetches", type=int, default=100, help="Concurrent transaction fetches")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake Plaid response latency")
+    parser.add_argument("--transactions-per-item", type=int, default=5,
+                        help="Keep small with the in-memory store, whose writes scan the whole collection")
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0)
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB URL (default: in-memory)")
+    parser.add_argument("--blocking", action="store_true", help="Run the blocking-call baseline")
+    args = parser.parse_args()
+
+    with ServerProcess("benchmarks.fake_plaid", "--latency-ms", str(args.latency_ms),
+                       "--transactions-per-item", str(args.transactions_per_item)) as fake_plaid:
+        configure_env(PLAID_HOST=fake_plaid.url, PLAID_MAX_CONCURRENCY=str(args.fetches),
+                      PLAID_MAX_CONNECTIONS=str(args.fetches))
+        results = asyncio.run(run(args, fake_plaid.url))
+
+    mode = "blocking baseline" if args.blocking else "async client"
+    print(json.dumps({"mode": mode, "fetches": args.fetches, "plaid_latency_ms": args.latency_ms,
+                      "routes": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
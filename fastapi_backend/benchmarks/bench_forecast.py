@@ -0,0 +1,85 @@
+# benchmarks/bench_forecast.py
+# CPU cost of nightly forecast precompute for a whole user base: forecast_service.forecast_matrix
+# called once per user (the on-request path, in a loop), once per chunk of users in one process,
+# and per chunk across a process pool as precompute_forecasts runs it. Daily series are synthetic
+# gig-income users (lumpy weekly payouts, rent on the 1st, daily spending); no database involved.
+#
+#   python -m benchmarks.bench_forecast --users 20000 --chunk-size 500 --workers 4
+
+import argparse
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.common import configure_env
+
+
+def synthetic_users(users: int, days: int, seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(inflow, outflow, first_active) daily cents for `users` users over `days` days."""
+    rng = np.random.default_rng(seed)
+    column = np.arange(days)
+    payday = rng.integers(0, 7, users)[:, None]
+    payout = rng.uniform(200, 900, (users, 1))
+    inflow = np.where((column[None, :] - payday) % 7 == 0, rng.normal(payout, payout * 0.3), 0)
+    inflow = np.where(rng.random((users, days)) < 0.1, 0, np.maximum(inflow, 0)) # Missed payouts
+    outflow = rng.gamma(2, rng.uniform(10, 40, (users, 1)), (users, days))
+    outflow[:, column % 30 == 0] += rng.uniform(800, 2000, (users, 1))
+    first_active = np.where(rng.random(users) < 0.2, rng.integers(0, days, users), 0) # Some new users
+    return (inflow * 100).astype(np.int64), (outflow * 100).astype(np.int64), first_active
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.services.forecast_service import forecast_matrix
+
+    inflow, outflow, first_active = synthetic_users(args.users, args.days, args.seed)
+    first_day = 19000
+    chunks = [slice(i, i + args.chunk_size) for i in range(0, args.users, args.chunk_size)]
+    results: List[Dict[str, Any]] = []
+
+    sample = min(args.users, args.per_user_sample)
+    start = time.perf_counter()
+    for i in range(sample):
+        forecast_matrix(inflow[i:i + 1], outflow[i:i + 1], first_active[i:i + 1], first_day)
+    per_user = (time.perf_counter() - start) / sample
+    results.append({"path": "per_user_loop", "users_per_s": round(1 / per_user, 1),
+                    "projected_s": round(per_user * args.users, 2), "measured_users": sample})
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        forecast_matrix(inflow[chunk], outflow[chunk], first_active[chunk], first_day)
+    elapsed = time.perf_counter() - start
+    results.append({"path": "chunked_one_process", "users_per_s": round(args.users / elapsed, 1),
+                    "elapsed_s": round(elapsed, 2)})
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(forecast_matrix, [inflow[:1]] * args.workers, [outflow[:1]] * args.workers,
+                      [first_active[:1]] * args.workers, [first_day] * args.workers)) # Start the workers
+        start = time.perf_counter()
+        list(pool.map(forecast_matrix, [inflow[c] for c in chunks], [outflow[c] for c in chunks],
+                      [first_active[c] for c in chunks], [first_day] * len(chunks)))
+        elapsed = time.perf_counter() - start
+    results.append({"path": f"chunked_pool_{args.workers}", "users_per_s": round(args.users / elapsed, 1),
+                    "elapsed_s": round(elapsed, 2)})
+    return {"users": args.users, "days": args.days, "chunk_size": args.chunk_size, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Forecast precompute throughput")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=365, help="History per user (FORECAST_HISTORY_DAYS)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-user-sample", type=int, default=500, help="Users timed on the per-user path")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    configure_env()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
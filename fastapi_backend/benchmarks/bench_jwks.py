@@ -0,0 +1,136 @@
+# benchmarks/bench_jwks.py
+# Throughput of verify_token while the JWKS cache keeps expiring, against a local JWKS stub.
+# Compares the kid-indexed JWKSKeyManager with the previous TTLCache + linear-scan path.
+#
+#   python -m benchmarks.bench_jwks --ttl 0.5 --duration 5 --concurrency 200
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+import httpx
+
+from benchmarks.common import ServerProcess, configure_env
+from benchmarks.fake_auth0 import generate_signing_key
+
+AUDIENCE = "https://bench-api"
+DOMAIN = "bench.auth0.local"
+
+
+def make_legacy_verifier(jwks_url: str, ttl: float):
+    """The verification path as it was before JWKSKeyManager: TTLCache, client per miss, linear kid scan."""
+    from cachetools import TTLCache
+    from jose import jwt
+
+    cache = TTLCache(maxsize=1, ttl=ttl)
+
+    async def get_jwks() -> Dict[str, Any]:
+        cached = cache.get("jwks")
+        if cached:
+            return cached
+        async with httpx.AsyncClient() as client:
+            response = await client.get(jwks_url)
+            response.raise_for_status()
+            jwks = response.json()
+            cache["jwks"] = jwks
+            return jwks
+
+    async def verify(token: str) -> Dict[str, Any]:
+        jwks = await get_jwks()
+        kid = jwt.get_unverified_header(token)["kid"]
+        rsa_key = {}
+        for key in jwks.get("keys", []):
+            if key.get("kid") == kid:
+                rsa_key = {k: key[k] for k in ("kty", "kid", "use", "n", "e")}
+                break
+        return jwt.decode(token, rsa_key, algorithms=["RS256"], audience=AUDIENCE, issuer=f"https://{DOMAIN}/")
+
+    return verify
+
+
+async def run(args: argparse.Namespace, stub_url: str, token: str) -> Dict[str, Any]:
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.auth import verify as verify_module
+
+    if args.legacy:
+        legacy = make_legacy_verifier(f"{stub_url}/.well-known/jwks.json", args.ttl)
+        verify = legacy
+    else:
+        manager = verify_module.jwks_manager
+        await manager.start()
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        async def verify(_token: str) -> Dict[str, Any]:
+            return await verify_module.verify_token(credentials)
+
+    completed = 0
+    errors = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker() -> None:
+        nonlocal completed, errors
+        while time.perf_counter() < deadline:
+            try:
+                await verify(token)
+                completed += 1
+            except Exception:
+                errors += 1
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if not args.legacy:
+        await verify_module.jwks_manager.stop()
+
+    async with httpx.AsyncClient() as client:
+        fetches = (await client.get(f"{stub_url}/stats")).json()["jwks_fetches"]
+    return {
+        "verifications": completed,
+        "errors": errors,
+        "verifications_per_s": round(completed / elapsed, 1),
+        "jwks_fetches": fetches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="verify_token throughput under JWKS cache expiry")
+    parser.add_argument("--ttl", type=float, default=0.5, help="JWKS cache TTL in seconds (short = frequent expiry)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="JWKS stub response latency")
+    parser.add_argument("--legacy", action="store_true", help="Benchmark the previous TTLCache + scan path")
+    args = parser.parse_args()
+
+    private_pem, jwks = generate_signing_key()
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(jwks, f)
+    try:
+        with ServerProcess("benchmarks.fake_auth0", "--jwks-file", f.name,
+                           "--latency-ms", str(args.latency_ms)) as stub:
+            configure_env(
+                AUTH0_DOMAIN=DOMAIN, AUTH0_API_AUDIENCE=AUDIENCE,
+                AUTH0_JWKS_URL=f"{stub.url}/.well-known/jwks.json",
+                JWKS_CACHE_TTL_SECONDS=str(args.ttl),
+                JWKS_REFRESH_MARGIN_SECONDS=str(args.ttl / 5),
+                JWKS_MIN_REFETCH_SECONDS=str(args.ttl / 5),
+            )
+            from jose import jwt
+            token = jwt.encode(
+                {"sub": "auth0|bench", "aud": AUDIENCE, "iss": f"https://{DOMAIN}/", "exp": int(time.time()) + 3600},
+                private_pem, algorithm="RS256", headers={"kid": jwks["keys"][0]["kid"]},
+            )
+            results = asyncio.run(run(args, stub.url, token))
+    finally:
+        os.unlink(f.name)
+
+    print(json.dumps({"mode": "legacy TTLCache" if args.legacy else "JWKSKeyManager",
+                      "ttl_s": args.ttl, "concurrency": args.concurrency, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_link_exchange.py
+# Public token exchange under concurrent duplicate submissions (each token submitted --duplicates
+# times at once, as with double-fired Link callbacks). Compares the previous flow (exchange, then
+# find_one + save()/insert()) with item_service.link_public_token (shared exchange, one atomic
+# upsert): throughput, failed submissions, Plaid exchange calls and duplicate PlaidItems.
+#
+#   python -m benchmarks.bench_link_exchange --tokens 500 --duplicates 3 --latency-ms 100
+#   python -m benchmarks.bench_link_exchange --mongo-url mongodb://localhost:27017/bench_link_exchange
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.common import ServerProcess, configure_env, init_bench_db, summarize
+
+
+async def legacy_exchange(public_token: str, user_id: str) -> str:
+    """The exchange route before the upsert path: two round trips and a find-then-insert race."""
+    from app.models.plaid_item_model import PlaidItem
+    from app.services.plaid_service import plaid_service
+    from app.utils.encryption import encrypt_token
+
+    access_token, item_id = await plaid_service.exchange_public_token(public_token)
+    encrypted_access_token = encrypt_token(access_token)
+    existing_item = await PlaidItem.find_one(PlaidItem.item_id == item_id)
+    if existing_item:
+        existing_item.access_token = encrypted_access_token
+        existing_item.updated_at = datetime.utcnow()
+        await existing_item.save()
+    else:
+        await PlaidItem(item_id=item_id, user_id=user_id, access_token=encrypted_access_token).insert()
+    return item_id
+
+
+async def upsert_exchange(public_token: str, user_id: str) -> str:
+    from app.services.item_service import link_public_token
+
+    return (await link_public_token(public_token, user_id)).item_id
+
+
+def exchange_calls() -> float:
+    from app.utils.metrics import upstream_duration
+
+    return upstream_duration.count(upstream="plaid", operation="/item/public_token/exchange")
+
+
+async def measure(name: str, exchange: Callable[[str, str], Awaitable[str]], public_tokens: List[str],
+                  args: argparse.Namespace) -> Dict[str, Any]:
+    from app.models.plaid_item_model import PlaidItem
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    calls_before = exchange_calls()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def submit(public_token: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await exchange(public_token, "bench-user")
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    # Every token's duplicates are submitted back to back, so they overlap in flight
+    submissions = [token for token in public_tokens for _ in range(args.duplicates)]
+    start = time.perf_counter()
+    await asyncio.gather(*(submit(token) for token in submissions))
+    elapsed = time.perf_counter() - start
+
+    pipeline = [{"$group": {"_id": "$item_id", "n": {"$sum": 1}}}, {"$match": {"n": {"$gt": 1}}}]
+    duplicated = await PlaidItem.get_motor_collection().aggregate(pipeline).to_list(None)
+    return {
+        "path": name,
+        "submissions": len(submissions),
+        "submissions_per_s": round(len(submissions) / elapsed, 1),
+        "failed": sum(errors.values()),
+        "errors": errors,
+        "plaid_exchange_calls": int(exchange_calls() - calls_before),
+        "stored_items": await PlaidItem.get_motor_collection().count_documents({}),
+        "duplicated_item_ids": len(duplicated),
+        "latency": summarize(latencies),
+    }
+
+
+async def run(args: argparse.Namespace, plaid_url: str) -> List[Dict[str, Any]]:
+    from app.models.plaid_item_model import PlaidItem
+    from app.services.plaid_service import plaid_service
+
+    await init_bench_db(args.mongo_url)
+    results = []
+    async with httpx.AsyncClient(base_url=plaid_url, timeout=None) as stub:
+        for name, exchange in (("find_then_save", legacy_exchange), ("atomic_upsert", upsert_exchange)):
+            await PlaidItem.get_motor_collection().delete_many({})
+            public_tokens = [(await stub.post("/sandbox/public_token/create", json={})).json()["public_token"]
+                             for _ in range(args.tokens)]
+            results.append(await measure(name, exchange, public_tokens, args))
+    await plaid_service.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Token exchange throughput under duplicate submissions")
+    parser.add_argument("--tokens", type=int, default=500, help="Distinct public tokens")
+    parser.add_argument("--duplicates", type=int, default=3, help="Concurrent submissions per token")
+    parser.add_argument("--concurrency", type=int, default=60, help="Submissions in flight")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Plaid stub latency per call")
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB (default: in-memory mongomock)")
+    args = parser.parse_args()
+
+    with ServerProcess("benchmarks.fake_plaid", "--latency-ms", str(args.latency_ms)) as stub:
+        configure_env(PLAID_HOST=stub.url, PLAID_ENV="development",
+                      PLAID_MAX_CONCURRENCY=str(args.concurrency), PLAID_MAX_CONNECTIONS=str(args.concurrency))
+        results = asyncio.run(run(args, stub.url))
+    print(json.dumps({"tokens": args.tokens, "duplicates": args.duplicates, "concurrency": args.concurrency,
+                      "latency_ms": args.latency_ms, "db": args.mongo_url or "mongomock", "results": results},
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
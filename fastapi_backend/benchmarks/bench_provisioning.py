@@ -0,0 +1,74 @@
+# benchmarks/bench_provisioning.py
+# Seeding throughput: the one-item-at-a-time flow (create_custom_item, exchange_public_token,
+# encrypt, PlaidItem.insert) against provision_sandbox_items (bounded concurrency, batched Fernet,
+# insert_many), both against the local Plaid stub, with a projected time for 10k items.
+#
+#   python -m benchmarks.bench_provisioning --count 2000 --sequential-count 100 --latency-ms 100
+#   python -m benchmarks.bench_provisioning --mongo-url mongodb://localhost:27017/bench_provisioning
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+from benchmarks.common import ServerProcess, configure_env, init_bench_db
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.models.plaid_item_model import PlaidItem
+    from app.services.plaid_service import plaid_service
+    from app.services.provisioning_service import SANDBOX_INSTITUTION_ID, provision_sandbox_items
+    from app.utils.encryption import encrypt_token
+
+    await init_bench_db(args.mongo_url)
+    await PlaidItem.get_motor_collection().delete_many({})
+    if not args.mongo_url:
+        # mongomock enforces unique indexes with a full scan per write, stalling the loop on every batch
+        await PlaidItem.get_motor_collection().drop_indexes()
+
+    start = time.perf_counter()
+    for n in range(args.sequential_count):
+        public_token = await plaid_service.create_sandbox_public_token(SANDBOX_INSTITUTION_ID, ["transactions"])
+        access_token, item_id = await plaid_service.exchange_public_token(public_token)
+        await PlaidItem(item_id=item_id, user_id=f"bench-seq-{n % args.users}",
+                        access_token=encrypt_token(access_token)).insert()
+    sequential_s = time.perf_counter() - start
+
+    bulk = await provision_sandbox_items(args.count, "bench-bulk", args.users,
+                                         concurrency=args.concurrency, batch_size=args.batch_size)
+    stored = await PlaidItem.get_motor_collection().count_documents({})
+    await plaid_service.aclose()
+
+    sequential_per_s = args.sequential_count / sequential_s
+    return {
+        "sequential": {"items": args.sequential_count, "items_per_s": round(sequential_per_s, 1),
+                       "projected_10k_min": round(10000 / sequential_per_s / 60, 1)},
+        "bulk": {**{k: bulk[k] for k in ("created", "existing", "failed", "errors", "batches", "elapsed_s", "items_per_s")},
+                 "projected_10k_min": round(10000 / bulk["items_per_s"] / 60, 1) if bulk["items_per_s"] else None},
+        "stored_items": stored,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sequential vs bulk sandbox item provisioning")
+    parser.add_argument("--count", type=int, default=2000, help="Items created by the bulk path")
+    parser.add_argument("--sequential-count", type=int, default=100, help="Items created one at a time")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Plaid stub latency per call")
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB (default: in-memory mongomock)")
+    args = parser.parse_args()
+
+    with ServerProcess("benchmarks.fake_plaid", "--latency-ms", str(args.latency_ms)) as stub:
+        # The shared Plaid client's limit would otherwise cap the bulk path's concurrency
+        configure_env(PLAID_HOST=stub.url, PLAID_ENV="development",
+                      PLAID_MAX_CONCURRENCY=str(args.concurrency), PLAID_MAX_CONNECTIONS=str(args.concurrency))
+        results = asyncio.run(run(args))
+    print(json.dumps({"count": args.count, "concurrency": args.concurrency, "latency_ms": args.latency_ms,
+                      "db": args.mongo_url or "mongomock", **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# benchmarks/bench_scenarios.py
+# Scripted end-to-end load test. Starts the app (in its own process, on mongomock or --mongo-url)
+# with local Plaid and Auth0 stand-ins, then runs `--concurrency` virtual users through:
+#   login     POST /auth/login (Auth0 code exchange against the stub, user upsert, session JWT)
+#   link      create_link_token -> (Link: stub public token) -> exchange_public_token
+#   dashboard user transactions, spending summary, budget evaluation and time series, in parallel
+#   paging    an item's last year of transactions, page by page through next_cursor
+# and reports throughput plus p50/p95/p99 per route and per scenario as JSON.
+#
+#   python -m benchmarks.bench_scenarios --concurrency 20 --iterations 5 --output results.json
+#   python -m benchmarks.bench_scenarios --compare baseline.json   # non-zero exit on p95 regressions
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import ServerProcess, configure_env, init_bench_db, summarize
+from benchmarks.fake_auth0 import generate_signing_key
+
+API = "/api/v1"
+
+
+# --- Server side (child process) ---
+def serve(args: argparse.Namespace) -> None:
+    import uvicorn
+    from app.main import app
+    from app.models.transaction_model import Transaction
+    from app.routers import auth
+
+    # The login route is not mounted in app.main yet; the benchmark exercises it anyway
+    if not any(getattr(route, "path", "").startswith(f"{API}/auth") for route in app.routes):
+        app.include_router(auth.router)
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+
+    async def main() -> None:
+        # Initialize on the loop uvicorn will run, so Motor/mongomock clients are bound to it
+        await init_bench_db(args.mongo_url)
+        if not args.mongo_url:
+            # mongomock enforces unique indexes with a full scan per write
+            await Transaction.get_motor_collection().drop_indexes()
+        await server.serve()
+
+    asyncio.run(main())
+
+
+# --- Client side ---
+class Recorder:
+    """Latencies and errors per route template and per scenario."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, List[float]] = defaultdict(list)
+        self.route_errors: Dict[str, int] = defaultdict(int)
+        self.scenarios: Dict[str, List[float]] = defaultdict(list)
+        self.scenario_errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, method: str, route: str, url: str, **kwargs: Any) -> httpx.Response:
+        label = f"{method} {route}"
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.route_errors[label] += 1
+            raise
+        self.routes[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.route_errors[label] += 1
+            response.raise_for_status()
+        return response
+
+    async def scenario(self, name: str, coro: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except httpx.HTTPError as e:
+            self.scenario_errors[name] += 1
+            print(f"Scenario {name} failed: {e}", file=sys.stderr)
+            return None
+        self.scenarios[name].append(time.perf_counter() - start)
+        return result
+
+
+async def login(rec: Recorder, client: httpx.AsyncClient, code: str) -> str:
+    response = await rec.request(client, "POST", f"{API}/auth/login", f"{API}/auth/login",
+                                 json={"authorizationCode": code, "redirectUri": "http://localhost:5173/callback"})
+    return response.json()["user"]["user_id"]
+
+
+async def link(rec: Recorder, client: httpx.AsyncClient, plaid: httpx.AsyncClient, user_id: str) -> str:
+    await rec.request(client, "POST", f"{API}/plaid/create_link_token", f"{API}/plaid/create_link_token",
+                      json={"user_id": user_id})
+    # Plaid Link runs in the browser; the stub hands out the public token it would return
+    public_token = (await plaid.post("/sandbox/public_token/create", json={})).json()["public_token"]
+    response = await rec.request(client, "POST", f"{API}/plaid/exchange_public_token",
+                                 f"{API}/plaid/exchange_public_token",
+                                 json={"public_token": public_token, "user_id": user_id})
+    return response.json()["item_id"]
+
+
+async def dashboard(rec: Recorder, client: httpx.AsyncClient, user_id: str) -> None:
+    end = date.today()
+    start = end - timedelta(days=90)
+    dates = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    await asyncio.gather(
+        rec.request(client, "POST", f"{API}/plaid/users/{{user_id}}/transactions",
+                    f"{API}/plaid/users/{user_id}/transactions", json=dates),
+        rec.request(client, "GET", f"{API}/spending/users/{{user_id}}",
+                    f"{API}/spending/users/{user_id}", params=dates),
+        rec.request(client, "GET", f"{API}/budgets/users/{{user_id}}/evaluation",
+                    f"{API}/budgets/users/{user_id}/evaluation"),
+        rec.request(client, "GET", f"{API}/spending/users/{{user_id}}/timeseries",
+                    f"{API}/spending/users/{user_id}/timeseries", params={**dates, "points": 60}),
+    )
+
+
+async def paging(rec: Recorder, client: httpx.AsyncClient, item_id: str, page_size: int) -> int:
+    end = date.today()
+    body: Dict[str, Any] = {"start_date": (end - timedelta(days=365)).isoformat(), "end_date": end.isoformat(),
+                            "page_size": page_size}
+    rows = 0
+    while True:
+        response = await rec.request(client, "POST", f"{API}/plaid/items/{{item_id}}/transactions",
+                                     f"{API}/plaid/items/{item_id}/transactions", json=body)
+        page = response.json()
+        rows += len(page["transactions"])
+        if not page.get("next_cursor"):
+            return rows
+        body["cursor"] = page["next_cursor"]
+
+
+async def run(args: argparse.Namespace, app_url: str, plaid_url: str) -> Dict[str, Any]:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency * 4, max_keepalive_connections=args.concurrency * 4)
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=60, limits=limits) as client, \
+            httpx.AsyncClient(base_url=plaid_url, timeout=60) as plaid:
+
+        async def virtual_user(n: int) -> None:
+            user_id = await rec.scenario("login", login(rec, client, f"vu{n}"))
+            if user_id is None:
+                return
+            item_id = await rec.scenario("link", link(rec, client, plaid, user_id))
+            if item_id is None:
+                return
+            for _ in range(args.iterations):
+                await rec.scenario("dashboard", dashboard(rec, client, user_id))
+                await rec.scenario("paging", paging(rec, client, item_id, args.page_size))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(n) for n in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    def report(latencies: Dict[str, List[float]], errors: Dict[str, int]) -> Dict[str, Any]:
+        return {
+            name: {**summarize(values), "errors": errors.get(name, 0), "per_s": round(len(values) / elapsed, 1)}
+            for name, values in sorted(latencies.items())
+        } | {name: {"count": 0, "errors": count} for name, count in errors.items() if name not in latencies}
+
+    total = sum(len(v) for v in rec.routes.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "requests_per_s": round(total / elapsed, 1),
+        "errors": sum(rec.route_errors.values()),
+        "routes": report(rec.routes, rec.route_errors),
+        "scenarios": report(rec.scenarios, rec.scenario_errors),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Routes/scenarios whose p95 grew by more than `threshold` (fraction) against the baseline."""
+    regressions = []
+    for section in ("routes", "scenarios"):
+        for name, stats in current[section].items():
+            before = baseline.get(section, {}).get(name, {}).get("p95_ms")
+            after = stats.get("p95_ms")
+            if before and after and after > before * (1 + threshold):
+                regressions.append(f"{section[:-1]} {name}: p95 {before} ms -> {after} ms (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scripted login/link/dashboard/paging load test")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users running at once")
+    parser.add_argument("--iterations", type=int, default=5, help="Dashboard + paging rounds per virtual user")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--transactions-per-item", type=int, default=200)
+    parser.add_argument("--plaid-latency-ms", type=float, default=100.0)
+    parser.add_argument("--auth0-latency-ms", type=float, default=50.0)
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB (default: in-memory mongomock)")
+    parser.add_argument("--output", default="bench_scenarios.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="Baseline results file; exit 1 on p95 regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 growth against --compare")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    private_pem, jwks = generate_signing_key()
+    with tempfile.TemporaryDirectory() as tmp:
+        jwks_file, key_file = os.path.join(tmp, "jwks.json"), os.path.join(tmp, "key.pem")
+        with open(jwks_file, "w") as f:
+            json.dump(jwks, f)
+        with open(key_file, "w") as f:
+            f.write(private_pem)
+
+        with ServerProcess("benchmarks.fake_plaid", "--latency-ms", str(args.plaid_latency_ms),
+                           "--transactions-per-item", str(args.transactions_per_item)) as plaid, \
+                ServerProcess("benchmarks.fake_auth0", "--jwks-file", jwks_file, "--key-file", key_file,
+                              "--latency-ms", str(args.auth0_latency_ms)) as auth0:
+            # Inherited by the app process below
+            configure_env(
+                PLAID_HOST=plaid.url, PLAID_ENV="development",
+                AUTH0_TOKEN_URL=f"{auth0.url}/oauth/token", AUTH0_JWKS_URL=f"{auth0.url}/.well-known/jwks.json",
+            )
+            server_args = ["--serve"] + (["--mongo-url", args.mongo_url] if args.mongo_url else [])
+            with ServerProcess("benchmarks.bench_scenarios", *server_args, startup_timeout=60) as server:
+                results = asyncio.run(run(args, server.url, plaid.url))
+
+    document = {
+        "benchmark": "scenarios",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "db": args.mongo_url or "mongomock",
+        "config": {key: getattr(args, key) for key in ("concurrency", "iterations", "page_size",
+                                                       "transactions_per_item", "plaid_latency_ms", "auth0_latency_ms")},
+        **results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(json.dumps({k: document[k] for k in ("elapsed_s", "requests", "requests_per_s", "errors")}, indent=2))
+    for name, stats in {**results["routes"], **results["scenarios"]}.items():
+        print(f"  {name:<58} n={stats['count']:<5} p50={stats.get('p50_ms')} p95={stats.get('p95_ms')} "
+              f"p99={stats.get('p99_ms')} errors={stats['errors']}")
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(document, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_serialization.py
+# Per-transaction memory and serialization throughput for the transaction list endpoints:
+# the previous path (Beanie model -> model_dump dict -> TransactionsResponse validation -> JSON)
+# versus CompactTransaction + OrjsonResponse. Input is app/db/custom_gig_user.json scaled up.
+#
+#   python -m benchmarks.bench_serialization --transactions 50000
+
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import configure_env, init_bench_db, scaled_gig_transactions
+
+
+def retained_bytes(build: Callable[[], List[Any]]) -> int:
+    """Bytes still allocated after building the list (i.e. what a response holds in memory)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return after - before
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from pydantic import TypeAdapter
+    from app.models.transaction_model import Transaction
+    from app.schemas.plaid_schemas import TransactionsResponse
+    from app.schemas.transaction_schemas import CompactTransaction
+    from app.services.transaction_service import PLAID_TRANSACTION_FIELDS
+    from app.utils.responses import OrjsonResponse
+
+    await init_bench_db(None) # Beanie documents need an initialized model
+    docs = list(scaled_gig_transactions(args.transactions))
+    include = set(PLAID_TRANSACTION_FIELDS)
+    response_adapter = TypeAdapter(TransactionsResponse)
+
+    def legacy_rows() -> List[Dict[str, Any]]:
+        return [Transaction(**doc).model_dump(include=include) for doc in docs]
+
+    def compact_rows() -> List[CompactTransaction]:
+        return [CompactTransaction.from_document(doc) for doc in docs]
+
+    legacy = legacy_rows()
+    compact = compact_rows()
+
+    def legacy_encode() -> bytes:
+        # What FastAPI does with response_model=TransactionsResponse: validate, then dump to JSON
+        return response_adapter.dump_json(response_adapter.validate_python({"transactions": legacy}))
+
+    def compact_encode() -> bytes:
+        return OrjsonResponse({"transactions": compact, "total_transactions": None}).body
+
+    n = args.transactions
+    results: Dict[str, Any] = {}
+    for name, build, encode in (("legacy", legacy_rows, legacy_encode), ("compact", compact_rows, compact_encode)):
+        build_s = best_of(args.repeat, build)
+        encode_s = best_of(args.repeat, encode)
+        body = encode()
+        results[name] = {
+            "bytes_per_transaction_in_memory": round(retained_bytes(build) / n),
+            "build_tx_per_s": round(n / build_s),
+            "encode_tx_per_s": round(n / encode_s),
+            "end_to_end_tx_per_s": round(n / (build_s + encode_s)),
+            "response_bytes_per_transaction": round(len(body) / n),
+        }
+    assert len(json.loads(compact_encode())["transactions"]) == n
+    results["speedup_end_to_end"] = round(
+        results["compact"]["end_to_end_tx_per_s"] / results["legacy"]["end_to_end_tx_per_s"], 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Transaction representation memory and JSON throughput")
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    configure_env()
+    results = asyncio.run(run(args))
+    print(json.dumps({"transactions": args.transactions, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# benchmarks/bench_streaming.py
+# Peak server RSS and time-to-first-byte for a large transaction range: the buffered list endpoint
+# (POST /items/{id}/transactions) versus NDJSON streaming (POST /items/{id}/transactions/stream).
+#
+#   python -m benchmarks.bench_streaming --transactions 100000
+#   python -m benchmarks.bench_streaming --transactions 100000 --mongo-url mongodb://localhost:27017/bench_stream
+#
+# Each mode runs in a fresh server process that seeds the store, so one mode's allocations do not
+# inflate the other's peak. With the in-memory default, mongomock materializes and copies the whole
+# result set inside find(), which adds the same large constant to both modes; use --mongo-url for
+# numbers that reflect a real deployment.
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from benchmarks.common import ServerProcess, configure_env, init_bench_db, scaled_gig_transactions
+
+ITEM_ID = "bench-stream-item"
+MODES = {
+    "list": "/api/v1/plaid/items/{item_id}/transactions",
+    "stream": "/api/v1/plaid/items/{item_id}/transactions/stream",
+}
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (Linux /proc, falling back to ru_maxrss)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    """Samples RSS every `interval` seconds in a thread and keeps the peak since the last reset."""
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.baseline = self.peak = current_rss()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            self.peak = max(self.peak, current_rss())
+            time.sleep(self.interval)
+
+    def reset(self) -> None:
+        self.baseline = self.peak = current_rss()
+
+
+# --- Server side (child process) ---
+def serve(args: argparse.Namespace) -> None:
+    configure_env(PLAID_ENV="development") # Disable sandbox sampling on the list endpoint
+    import gc
+    import uvicorn
+    from app.main import app
+    from app.models.plaid_item_model import PlaidItem
+    from app.models.transaction_model import Transaction
+
+    async def seed() -> None:
+        await init_bench_db(args.mongo_url)
+        await PlaidItem.find(PlaidItem.item_id == ITEM_ID).delete()
+        await Transaction.find(Transaction.item_id == ITEM_ID).delete()
+        await PlaidItem(item_id=ITEM_ID, user_id="bench-user", access_token="unused",
+                        transactions_cursor="bench").insert() # Already "synced": never calls Plaid
+        if not args.mongo_url:
+            # mongomock enforces unique indexes with a full scan per insert (quadratic seeding)
+            await Transaction.get_motor_collection().drop_indexes()
+        batch = []
+        for doc in scaled_gig_transactions(args.transactions, item_id=ITEM_ID):
+            batch.append(doc)
+            if len(batch) == 5000:
+                await Transaction.get_motor_collection().insert_many(batch)
+                batch = []
+        if batch:
+            await Transaction.get_motor_collection().insert_many(batch)
+
+    sampler: Optional[RssSampler] = None
+
+    @app.post("/__bench/rss/reset")
+    async def rss_reset() -> Dict[str, int]:
+        gc.collect()
+        sampler.reset()
+        return {"baseline": sampler.baseline}
+
+    @app.get("/__bench/rss")
+    async def rss() -> Dict[str, int]:
+        return {"baseline": sampler.baseline, "peak": sampler.peak}
+
+    # Seed on the loop uvicorn will run, so Motor/mongomock clients are bound to it
+    config = uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+
+    async def main() -> None:
+        nonlocal sampler
+        await seed()
+        gc.collect()
+        sampler = RssSampler()
+        await server.serve()
+
+    asyncio.run(main())
+
+
+# --- Client side ---
+async def measure(url: str, mode: str) -> Dict[str, Any]:
+    body = {"start_date": "2000-01-01", "end_date": "2100-01-01"}
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        await client.post("/__bench/rss/reset")
+        start = time.perf_counter()
+        ttfb = None
+        size = 0
+        async with client.stream("POST", MODES[mode].format(item_id=ITEM_ID), json=body) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+                size += len(chunk)
+        total = time.perf_counter() - start
+        rss = (await client.get("/__bench/rss")).json()
+    return {
+        "ttfb_ms": round(ttfb * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "response_mb": round(size / 2**20, 1),
+        "peak_rss_increase_mb": round((rss["peak"] - rss["baseline"]) / 2**20, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Peak RSS and TTFB: buffered list vs NDJSON streaming")
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB (default: in-memory mongomock)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    configure_env()
+    server_args = ["--serve", "--transactions", str(args.transactions)]
+    if args.mongo_url:
+        server_args += ["--mongo-url", args.mongo_url]
+    results = {}
+    for mode in MODES:
+        with ServerProcess("benchmarks.bench_streaming", *server_args, startup_timeout=600) as server:
+            results[mode] = asyncio.run(measure(server.url, mode))
+    print(json.dumps({"transactions": args.transactions, "db": args.mongo_url or "mongomock",
+                      **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_token_cache.py
+# Microbenchmark: resolving a Plaid access token by item_id with the previous path
+# (PlaidItem.find_one + decrypt_token) versus AccessTokenCache (warm hits, and a cold batch).
+#
+#   python -m benchmarks.bench_token_cache --items 200 --rounds 20
+#   python -m benchmarks.bench_token_cache --mongo-url mongodb://localhost:27017/bench_tokens
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import configure_env, init_bench_db
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.models.plaid_item_model import PlaidItem
+    from app.services.access_token_cache import AccessTokenCache
+    from app.utils.encryption import decrypt_token, encrypt_token
+
+    await init_bench_db(args.mongo_url)
+    await PlaidItem.find_all().delete()
+    item_ids = [f"bench-item-{i}" for i in range(args.items)]
+    await PlaidItem.insert_many([
+        PlaidItem(item_id=item_id, user_id="bench-user", access_token=encrypt_token(f"access-sandbox-{item_id}"))
+        for item_id in item_ids
+    ])
+    lookups = item_ids * args.rounds
+
+    async def legacy(item_id: str) -> str:
+        item = await PlaidItem.find_one(PlaidItem.item_id == item_id)
+        return decrypt_token(item.access_token)
+
+    cache = AccessTokenCache(maxsize=args.items, ttl=3600)
+    results: Dict[str, Any] = {}
+
+    start = time.perf_counter()
+    for item_id in lookups:
+        await legacy(item_id)
+    results["find_one_plus_decrypt_us"] = (time.perf_counter() - start) / len(lookups) * 1e6
+
+    # Crypto alone, to separate it from the MongoDB round trip
+    encrypted = [(await PlaidItem.find_one(PlaidItem.item_id == i)).access_token for i in item_ids]
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for token in encrypted:
+            decrypt_token(token)
+    results["decrypt_only_us"] = (time.perf_counter() - start) / len(lookups) * 1e6
+
+    start = time.perf_counter()
+    await cache.get_tokens(item_ids) # Cold: one $in query + one batch decrypt
+    results["cold_batch_per_item_us"] = (time.perf_counter() - start) / len(item_ids) * 1e6
+
+    start = time.perf_counter()
+    for item_id in lookups:
+        cache.get(item_id)
+    results["cached_hit_us"] = (time.perf_counter() - start) / len(lookups) * 1e6
+
+    items: List[PlaidItem] = await PlaidItem.find_all().to_list()
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        cache.tokens_for(items) # Hit path used by sync_item: ciphertext check, no decrypt
+    results["cached_hit_with_ciphertext_check_us"] = (time.perf_counter() - start) / len(lookups) * 1e6
+
+    results = {k: round(v, 2) for k, v in results.items()}
+    results["speedup_vs_find_one_plus_decrypt"] = round(
+        results["find_one_plus_decrypt_us"] / results["cached_hit_us"], 1)
+    results["cache_stats"] = cache.stats()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Access-token resolution: find_one + decrypt vs AccessTokenCache")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20, help="Lookups per item")
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB (default: in-memory mongomock)")
+    args = parser.parse_args()
+
+    configure_env()
+    results = asyncio.run(run(args))
+    print(json.dumps({"items": args.items, "rounds": args.rounds,
+                      "db": args.mongo_url or "mongomock", **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_webhooks.py
+# Load test for the webhook pipeline: replays synthetic SYNC_UPDATES_AVAILABLE webhooks (each
+# preceded by new activity on the local Plaid stub) and reports receiver throughput, processing
+# throughput, coalescing, write batching and end-to-end lag (webhook received -> covering sync written).
+#
+#   python -m benchmarks.bench_webhooks --items 100 --events 3000 --rate 500
+#   python -m benchmarks.bench_webhooks --mongo-url mongodb://localhost:27017/bench_webhooks
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import ServerProcess, configure_env, init_bench_db, summarize
+
+
+async def run(args: argparse.Namespace, plaid_url: str) -> Dict[str, Any]:
+    from app.main import app
+    from app.models.plaid_item_model import PlaidItem
+    from app.models.transaction_model import Transaction
+    from app.services.webhook_service import WebhookProcessor
+    from app.routers import plaid as plaid_router
+    from app.utils.encryption import encrypt_token
+
+    await init_bench_db(args.mongo_url)
+    if not args.mongo_url:
+        # mongomock enforces unique indexes with a full scan per write
+        await Transaction.get_motor_collection().drop_indexes()
+    tokens = {f"bench-item-{i}": f"access-sandbox-webhook-{i}" for i in range(args.items)}
+    await PlaidItem.insert_many([
+        PlaidItem(item_id=item_id, user_id=f"bench-user-{i % 10}", access_token=encrypt_token(token))
+        for i, (item_id, token) in enumerate(tokens.items())
+    ])
+
+    processor = WebhookProcessor(workers=args.workers, max_pending=args.items, write_batch=args.write_batch)
+    plaid_router.webhook_processor = processor # The route reads the module-level name
+    await processor.start()
+    rng = random.Random(args.seed)
+    # Skewed activity: a few busy items receive most events, as with real accounts
+    weights = [1.0 / (rank + 1) for rank in range(args.items)]
+    item_ids = list(tokens)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client, \
+            httpx.AsyncClient(base_url=plaid_url, timeout=None) as stub:
+        # Initial history for every item, outside the measurement
+        for item_id in item_ids:
+            processor.enqueue(item_id)
+        await processor.drain()
+        processor.counters = {k: 0 for k in processor.counters}
+        processor.writer.counters = {k: 0 for k in processor.writer.counters}
+        processor._lags.clear()
+
+        ack_latencies: List[float] = []
+        interval = 1.0 / args.rate if args.rate else 0.0
+        start = time.perf_counter()
+
+        async def send(i: int) -> None:
+            item_id = rng.choices(item_ids, weights)[0]
+            appended = await stub.post("/__bench/append", json={
+                "access_token": tokens[item_id], "count": args.transactions_per_event, "item_id": item_id,
+            })
+            webhook = appended.json()["webhook"] # Signed by the stub, as Plaid would
+            sent = time.perf_counter()
+            response = await client.post("/api/v1/plaid/webhook", content=webhook["body"], headers={
+                "Content-Type": "application/json", "Plaid-Verification": webhook["plaid_verification"],
+            })
+            ack_latencies.append(time.perf_counter() - sent)
+            response.raise_for_status()
+
+        senders = []
+        for i in range(args.events):
+            senders.append(asyncio.create_task(send(i)))
+            if interval:
+                await asyncio.sleep(max(0.0, start + (i + 1) * interval - time.perf_counter()))
+        await asyncio.gather(*senders)
+        sent_s = time.perf_counter() - start
+        await processor.drain()
+        total_s = time.perf_counter() - start
+
+    await processor.stop()
+    stats = processor.stats()
+    stored = await Transaction.get_motor_collection().count_documents({})
+    return {
+        "sent_events_per_s": round(args.events / sent_s, 1),
+        "processed_events_per_s": round(args.events / total_s, 1),
+        "transactions_written_per_s": round(stats["transactions"] / total_s, 1),
+        "syncs": stats["syncs"],
+        "write_batches": stats["write_batches"],
+        "items_per_write": round(stats["batched_items"] / stats["write_batches"], 1) if stats["write_batches"] else None,
+        "coalesced_events": stats["coalesced"],
+        "failures": stats["failures"],
+        "ack_latency": summarize(ack_latencies),
+        "end_to_end_lag_ms": {k: stats[k] for k in ("lag_p50_ms", "lag_p95_ms", "lag_p99_ms", "lag_max_ms")},
+        "stored_transactions": stored,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Webhook ingest throughput and end-to-end lag")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=500.0, help="Webhooks per second (0 = as fast as possible)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--write-batch", type=int, default=100, help="Most items per bulk_write (1 = one write per sync)")
+    parser.add_argument("--transactions-per-event", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Plaid stub latency per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongo-url", default=None, help="Real MongoDB (default: in-memory mongomock)")
+    args = parser.parse_args()
+
+    with ServerProcess("benchmarks.fake_plaid", "--latency-ms", str(args.latency_ms),
+                       "--transactions-per-item", "5") as stub:
+        configure_env(PLAID_HOST=stub.url, PLAID_ENV="development")
+        results = asyncio.run(run(args, stub.url))
+    print(json.dumps({"items": args.items, "events": args.events, "rate": args.rate,
+                      "workers": args.workers, "write_batch": args.write_batch, "db": args.mongo_url or "mongomock", **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# benchmarks/common.py
+# Shared helpers for the benchmark scripts: environment setup, background servers and latency stats.
+
+import copy
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+import uvicorn
+
+# Settings() requires these; benchmarks never talk to the real services.
+_DUMMY_ENV = {
+    "DATABASE_URL": "mongodb://localhost:27017",
+    "PLAID_CLIENT_ID": "bench-client-id",
+    "PLAID_SECRET_KEY": "bench-secret",
+    "AUTH0_DOMAIN": "bench.auth0.local",
+    "AUTH0_API_AUDIENCE": "https://bench-api",
+    "AUTH0_CLIENT_ID": "bench-auth0-client",
+    "AUTH0_CLIENT_SECRET": "bench-auth0-secret",
+    "JWT_SECRET_KEY": "bench-jwt-secret",
+    "ENCRYPTION_KEY": "YmVuY2gta2V5LWJlbmNoLWtleS1iZW5jaC1rZXktMDA=",
+    "DEV_MODE": "true",
+}
+
+GIG_USER_FIXTURE = os.path.join(os.path.dirname(__file__), "..", "app", "db", "custom_gig_user.json")
+
+
+def configure_env(**overrides: str) -> None:
+    """Populates the environment for app.core.config.Settings. Must run before importing `app`."""
+    for key, value in _DUMMY_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.update(overrides)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerThread:
+    """Runs an ASGI app under uvicorn in a daemon thread with its own event loop."""
+
+    def __init__(self, app: Any, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class ServerProcess:
+    """Runs `python -m <module> --port N [args]` in a child process so the server does not share our GIL."""
+
+    def __init__(self, module: str, *args: str, port: Optional[int] = None, startup_timeout: float = 15.0):
+        self.port = port or free_port()
+        self.startup_timeout = startup_timeout
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._cmd = [sys.executable, "-m", module, "--port", str(self.port), *args]
+        self._proc: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "ServerProcess":
+        self._proc = subprocess.Popen(self._cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return self
+            except OSError:
+                if self._proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{self._cmd} did not start")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.wait(timeout=5)
+
+
+async def init_bench_db(mongo_url: Optional[str] = None) -> None:
+    """Initializes Beanie against `mongo_url`, or an in-memory mongomock client when omitted."""
+    from app.db.database import init_db
+
+    if mongo_url:
+        import motor.motor_asyncio
+        client = motor.motor_asyncio.AsyncIOMotorClient(mongo_url)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    await init_db(client)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; `values` need not be sorted."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies_s: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    ms = [v * 1000.0 for v in latencies_s]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2) if ms else float("nan"),
+    }
+
+
+def scaled_gig_transactions(count: int, item_id: str = "bench-item", user_id: str = "bench-user",
+                            seed: int = 0, end: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields `count` stored-transaction documents cloned from app/db/custom_gig_user.json with unique
+    ids, jittered amounts and dates spread backwards from `end` (about 40 per day), newest first.
+    """
+    with open(GIG_USER_FIXTURE) as f:
+        templates = json.load(f)
+    rng = random.Random(seed)
+    end = end or date.today()
+    for i in range(count):
+        doc = copy.deepcopy(templates[i % len(templates)])
+        doc["transaction_id"] = f"{item_id}-txn-{i:08d}"
+        doc["amount"] = round(doc["amount"] * rng.uniform(0.5, 1.5), 2)
+        day = (end - timedelta(days=i // 40)).isoformat()
+        doc["date"] = doc["authorized_date"] = day
+        doc["item_id"] = item_id
+        doc["user_id"] = user_id
+        yield doc
@@ -0,0 +1,341 @@
+# benchmarks/datagen.py
+# Synthetic transaction histories for scale tests, learned from app/db/custom_gig_user.json.
+#
+# The fixture is split into streams (same description once ids/codes are masked, e.g. "Slack
+# Software Subscription" or "Client Invoice - Client_### Branding Work"). Each stream keeps its
+# category fields, direction, log-normal amount parameters and cadence: streams seen more than once
+# recur at their mean interval, one-offs arrive as a Poisson process at the fixture's rate. Every
+# synthetic user gets a seeded, perturbed subset of the streams spread over 1..N items.
+#
+# Users are generated one at a time from Random(f"{seed}:{user}"), so memory is bounded by one
+# user's history and any slice of users can be regenerated identically.
+#
+#   python -m benchmarks.datagen --users 10000 --months 24 --ndjson /tmp/synthetic
+#   python -m benchmarks.datagen --users 10000 --mongo-url mongodb://localhost:27017/bench
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import re
+import resource
+import statistics
+import string
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from benchmarks.common import GIG_USER_FIXTURE
+
+# Reference-like tokens in descriptions: client handles, order numbers and mixed letter/digit codes
+TOKEN = re.compile(r"Client_[A-Z]{3}\d{2}|\b\d{5}\b|\b(?=[A-Z0-9]*\d)(?=[A-Z0-9]*[A-Z])[A-Z0-9]{4,8}\b")
+COPIED_FIELDS = ("category", "category_id", "personal_finance_category", "personal_finance_category_icon_url",
+                 "payment_channel", "transaction_type", "website", "logo_url", "iso_currency_code")
+NULL_LOCATION = {"address": None, "city": None, "region": None, "postal_code": None,
+                 "country": None, "lat": None, "lon": None, "store_number": None}
+NULL_PAYMENT_META = {"by_order_of": None, "payee": None, "payer": None, "payment_method": None,
+                     "payment_processor": None, "ppd_id": None, "reason": None, "reference_number": None}
+
+
+@dataclass(slots=True)
+class Stream:
+    """One learned transaction stream."""
+    name: str # Template with the original tokens; re-rendered per user
+    merchant_name: Optional[str]
+    fields: Dict[str, Any]
+    income: bool
+    log_mu: float
+    log_sigma: float
+    count: int
+    interval_days: Optional[float] # Mean gap for recurring streams, None for one-offs
+
+
+def _is_income(row: Dict[str, Any]) -> bool:
+    pfc = row.get("personal_finance_category") or {}
+    category = row.get("category") or []
+    return pfc.get("primary") == "INCOME" or (category[:1] == ["Transfer"] and "Deposit" in category)
+
+
+def learn_streams(path: str = GIG_USER_FIXTURE) -> Tuple[List[Stream], float]:
+    """Returns the fixture's streams and its span in days."""
+    with open(path) as f:
+        rows = orjson.loads(f.read())
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(TOKEN.sub("#", row["name"]).lower(), []).append(row)
+
+    days = [date.fromisoformat(row["date"]) for row in rows]
+    span_days = float((max(days) - min(days)).days + 1)
+    # Spread of log amounts per direction, for streams with too few samples to estimate their own
+    pooled = {
+        income: statistics.pstdev([math.log(abs(r["amount"])) for r in rows if _is_income(r) == income] or [0.0])
+        for income in (True, False)
+    }
+
+    streams = []
+    for members in groups.values():
+        first = members[0]
+        logs = [math.log(max(abs(r["amount"]), 0.01)) for r in members]
+        dates = sorted(date.fromisoformat(r["date"]) for r in members)
+        income = _is_income(first)
+        streams.append(Stream(
+            name=first["name"],
+            merchant_name=first.get("merchant_name"),
+            fields={name: first.get(name) for name in COPIED_FIELDS},
+            income=income,
+            log_mu=statistics.fmean(logs),
+            log_sigma=statistics.pstdev(logs) if len(logs) > 1 else pooled[income],
+            count=len(members),
+            interval_days=max(1.0, (dates[-1] - dates[0]).days / (len(dates) - 1)) if len(dates) > 1 else None,
+        ))
+    return streams, span_days
+
+
+def _fresh_token(token: str, rng: random.Random) -> str:
+    if token.startswith("Client_"):
+        return "Client_" + "".join(rng.choices(string.ascii_uppercase, k=3)) + f"{rng.randrange(100):02d}"
+    if token.isdigit():
+        return "".join(rng.choices(string.digits, k=len(token)))
+    body = rng.choices(string.ascii_uppercase + string.digits, k=len(token) - 1)
+    return "".join(body) + rng.choice(string.digits)
+
+
+class SyntheticGenerator:
+    """Deterministic per-user generator over the learned streams."""
+
+    def __init__(self, seed: int = 0, months: int = 24, max_items: int = 3, activity: float = 1.0,
+                 end: Optional[date] = None, fixture: str = GIG_USER_FIXTURE):
+        self.seed = seed
+        self.days = int(months * 30.4)
+        self.max_items = max_items
+        self.activity = activity
+        self.end = end or date.today()
+        self.streams, self.span_days = learn_streams(fixture)
+
+    def user(self, index: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(user, items, transactions newest first) for synthetic user `index`."""
+        rng = random.Random(f"{self.seed}:{index}")
+        user_id = f"syn-user-{index:07d}"
+        items = [
+            {"item_id": f"syn-item-{index:07d}-{i}", "user_id": user_id,
+             "accounts": [f"syn-acc-{index:07d}-{i}-{a}" for a in range(rng.randint(1, 2))]}
+            for i in range(rng.randint(1, self.max_items))
+        ]
+        user_activity = self.activity * rng.lognormvariate(0, 0.4)
+        start = self.end - timedelta(days=self.days)
+
+        transactions: List[Dict[str, Any]] = []
+        for stream in self.streams:
+            if rng.random() < 0.3: # Users do not share every habit
+                continue
+            item = rng.choice(items)
+            account_id = rng.choice(item["accounts"])
+            tokens = {t: _fresh_token(t, rng) for t in TOKEN.findall(stream.name)}
+            name = TOKEN.sub(lambda m: tokens[m.group(0)], stream.name)
+            merchant = tokens.get(stream.merchant_name, stream.merchant_name)
+            for day, amount in self._arrivals(stream, rng, user_activity, start):
+                transactions.append(self._transaction(rng, stream, item, account_id, name, merchant, day, amount))
+
+        transactions.sort(key=lambda t: t["date"], reverse=True)
+        for n, t in enumerate(transactions):
+            t["transaction_id"] = f"syn-{self.seed}-{index:07d}-{n:06d}"
+        user = {"user_id": user_id, "email": f"{user_id}@synthetic.example.com"}
+        return user, [{k: v for k, v in item.items() if k != "accounts"} for item in items], transactions
+
+    def _arrivals(self, stream: Stream, rng: random.Random, user_activity: float,
+                  start: date) -> Iterator[Tuple[date, float]]:
+        if stream.interval_days is not None:
+            # Recurring: the user's own period around the learned one, small jitter, steadier amounts
+            period = stream.interval_days * rng.lognormvariate(0, 0.2)
+            mu = stream.log_mu + rng.gauss(0, 0.2)
+            t = rng.uniform(0, period)
+            while t < self.days:
+                yield start + timedelta(days=int(t)), math.exp(rng.gauss(mu, stream.log_sigma * 0.5))
+                t += period * rng.uniform(0.9, 1.1)
+        else:
+            # One-off: Poisson arrivals at the fixture's rate for this stream, scaled by user activity
+            rate = stream.count / self.span_days * user_activity * rng.lognormvariate(0, 0.5)
+            t = rng.expovariate(rate) if rate > 0 else self.days
+            while t < self.days:
+                yield start + timedelta(days=int(t)), math.exp(rng.gauss(stream.log_mu, stream.log_sigma))
+                t += rng.expovariate(rate)
+
+    def _transaction(self, rng: random.Random, stream: Stream, item: Dict[str, Any], account_id: str,
+                     name: str, merchant: Optional[str], day: date, amount: float) -> Dict[str, Any]:
+        recent = (self.end - day).days < 2
+        return {
+            "transaction_id": "", # Assigned once the user's rows are ordered
+            "item_id": item["item_id"],
+            "user_id": item["user_id"],
+            "account_id": account_id,
+            # Plaid convention: inflows are negative
+            "amount": round(-amount if stream.income else amount, 2),
+            "date": day.isoformat(),
+            "authorized_date": (day - timedelta(days=rng.randint(0, 2))).isoformat(),
+            "authorized_datetime": None,
+            "datetime": None,
+            "name": name,
+            "merchant_name": merchant,
+            "merchant_entity_id": None,
+            **stream.fields,
+            "pending": recent and rng.random() < 0.3,
+            "pending_transaction_id": None,
+            "unofficial_currency_code": None,
+            "account_owner": None,
+            "check_number": None,
+            "counterparties": [],
+            "location": NULL_LOCATION,
+            "payment_meta": NULL_PAYMENT_META,
+            "transaction_code": None,
+        }
+
+    def users(self, first: int, count: int) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        for index in range(first, first + count):
+            yield self.user(index)
+
+
+# --- Sinks ---
+class NdjsonSink:
+    """users.ndjson, items.ndjson and transactions-NNNNN.ndjson (rotated every rows_per_file)."""
+
+    def __init__(self, directory: str, rows_per_file: int = 1_000_000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rows_per_file = rows_per_file
+        self._users = open(os.path.join(directory, "users.ndjson"), "wb")
+        self._items = open(os.path.join(directory, "items.ndjson"), "wb")
+        self._transactions = None
+        self._rows_in_file = 0
+        self._file_index = 0
+
+    async def write(self, user: Dict[str, Any], items: List[Dict[str, Any]], transactions: List[Dict[str, Any]]) -> None:
+        self._users.write(orjson.dumps(user) + b"\n")
+        self._items.write(b"".join(orjson.dumps(item) + b"\n" for item in items))
+        for t in transactions:
+            if self._transactions is None or self._rows_in_file >= self.rows_per_file:
+                self._rotate()
+            self._transactions.write(orjson.dumps(t) + b"\n")
+            self._rows_in_file += 1
+
+    def _rotate(self) -> None:
+        if self._transactions is not None:
+            self._transactions.close()
+        path = os.path.join(self.directory, f"transactions-{self._file_index:05d}.ndjson")
+        self._transactions = open(path, "wb")
+        self._file_index += 1
+        self._rows_in_file = 0
+
+    async def close(self) -> None:
+        for f in (self._users, self._items, self._transactions):
+            if f is not None:
+                f.close()
+
+
+class MongoSink:
+    """
+    Buffered insert_many into users, plaid_items and transactions, with the spending rollups
+    advanced from the same batches (rollup_service), so summaries and charts match the raw rows.
+    Items get an encrypted placeholder token and a cursor, so reads never call Plaid for them.
+    """
+
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+        self._users: List[Dict[str, Any]] = []
+        self._items: List[Dict[str, Any]] = []
+        self._transactions: List[Dict[str, Any]] = []
+
+    async def write(self, user: Dict[str, Any], items: List[Dict[str, Any]], transactions: List[Dict[str, Any]]) -> None:
+        from app.utils.encryption import encrypt_token
+
+        now = datetime.utcnow()
+        self._users.append({**user, "created_at": now, "updated_at": now})
+        self._items.extend({
+            **item, "access_token": encrypt_token(f"access-synthetic-{item['item_id']}"),
+            "institution_name": "Synthetic Bank", "transactions_cursor": "synthetic", "created_at": now,
+            "updated_at": now, "last_sync_time": now, "last_sync_status": "ok", "last_sync_changes": 0,
+            "consecutive_failures": 0,
+        } for item in items)
+        self._transactions.extend(transactions)
+        if len(self._transactions) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        from app.models.plaid_item_model import PlaidItem
+        from app.models.transaction_model import Transaction
+        from app.models.user_model import User
+        from app.services import rollup_service
+
+        if self._users:
+            await User.get_motor_collection().insert_many(self._users, ordered=False)
+            await PlaidItem.get_motor_collection().insert_many(self._items, ordered=False)
+        if self._transactions:
+            await Transaction.get_motor_collection().insert_many(self._transactions, ordered=False)
+            await rollup_service.apply_deltas(rollup_service.compute_deltas([], self._transactions))
+        self._users, self._items, self._transactions = [], [], []
+
+    async def close(self) -> None:
+        await self.flush()
+
+
+async def generate(generator: SyntheticGenerator, sink: Any, first: int, count: int,
+                   progress_every: int = 1000) -> Dict[str, Any]:
+    started = time.perf_counter()
+    items = transactions = 0
+    for n, (user, user_items, user_transactions) in enumerate(generator.users(first, count), 1):
+        await sink.write(user, user_items, user_transactions)
+        items += len(user_items)
+        transactions += len(user_transactions)
+        if progress_every and n % progress_every == 0:
+            print(f"  {n} users, {transactions} transactions, {transactions / (time.perf_counter() - started):.0f} tx/s")
+    await sink.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "users": count,
+        "items": items,
+        "transactions": transactions,
+        "elapsed_s": round(elapsed, 1),
+        "transactions_per_s": round(transactions / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic transaction histories learned from custom_gig_user.json")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--first-user", type=int, default=0, help="Index of the first user (for sharded runs)")
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--max-items", type=int, default=3, help="Items per user are 1..max-items")
+    parser.add_argument("--activity", type=float, default=1.0, help="Scales one-off transaction rates")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day of history (default today)")
+    sinks = parser.add_mutually_exclusive_group(required=True)
+    sinks.add_argument("--ndjson", metavar="DIR", help="Write NDJSON files to DIR")
+    sinks.add_argument("--mongo-url", help="Insert into MongoDB ('mongomock' for an in-memory dry run)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Transactions per insert_many")
+    parser.add_argument("--rows-per-file", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    generator = SyntheticGenerator(seed=args.seed, months=args.months, max_items=args.max_items,
+                                   activity=args.activity, end=args.end_date)
+    print(f"Learned {len(generator.streams)} streams "
+          f"({sum(s.interval_days is not None for s in generator.streams)} recurring) from the fixture")
+
+    async def run() -> Dict[str, Any]:
+        if args.ndjson:
+            sink: Any = NdjsonSink(args.ndjson, args.rows_per_file)
+        else:
+            from benchmarks.common import configure_env, init_bench_db
+            configure_env()
+            await init_bench_db(None if args.mongo_url == "mongomock" else args.mongo_url)
+            sink = MongoSink(args.batch_size)
+        return await generate(generator, sink, args.first_user, args.users)
+
+    print(orjson.dumps(asyncio.run(run()), option=orjson.OPT_INDENT_2).decode())
+
+
+if __name__ == "__main__":
+    main()
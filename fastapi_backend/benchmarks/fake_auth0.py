@@ -0,0 +1,101 @@
+# benchmarks/fake_auth0.py
+# Local stand-in for Auth0's JWKS and /oauth/token endpoints. The benchmark generates the RSA key
+# pair and hands the public JWKS (and, for /oauth/token, the private key) to this server in files.
+# Run standalone with `python -m benchmarks.fake_auth0 --port 8200 --jwks-file jwks.json [--key-file key.pem]`.
+
+import argparse
+import asyncio
+import base64
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, HTTPException, Request
+
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def generate_signing_key(kid: str = "bench-kid") -> Tuple[str, Dict[str, Any]]:
+    """Returns (private key PEM, public JWKS document) for a fresh RSA-2048 key."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    numbers = private_key.public_key().public_numbers()
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    jwks = {"keys": [{"kty": "RSA", "kid": kid, "use": "sig", "alg": "RS256",
+                      "n": _b64url_uint(numbers.n), "e": _b64url_uint(numbers.e)}]}
+    return pem, jwks
+
+
+def create_app(jwks: Dict[str, Any], latency_ms: float = 0.0, private_pem: Optional[str] = None,
+               issuer: str = "https://bench.auth0.local/", audience: str = "https://bench-api") -> FastAPI:
+    app = FastAPI(title="Fake Auth0")
+    app.state.latency_ms = latency_ms
+    app.state.jwks_fetches = 0
+    app.state.token_requests = 0
+
+    @app.get("/.well-known/jwks.json")
+    async def jwks_endpoint():
+        app.state.jwks_fetches += 1
+        if app.state.latency_ms:
+            await asyncio.sleep(app.state.latency_ms / 1000.0)
+        return jwks
+
+    @app.post("/oauth/token")
+    async def oauth_token(request: Request):
+        """
+        authorization_code grant: any code is accepted and identifies the user, so code "alice"
+        logs in auth0|alice <alice@bench.example.com>. Returns a signed ID token and API access token.
+        """
+        app.state.token_requests += 1
+        if app.state.latency_ms:
+            await asyncio.sleep(app.state.latency_ms / 1000.0)
+        if private_pem is None:
+            raise HTTPException(status_code=501, detail="Started without --key-file")
+        form = {k: v[0] for k, v in parse_qs((await request.body()).decode()).items()}
+        code = form.get("code")
+        if form.get("grant_type") != "authorization_code" or not code:
+            raise HTTPException(status_code=400, detail={"error": "invalid_grant", "error_description": "Bad code"})
+        from jose import jwt
+
+        now = int(time.time())
+        headers = {"kid": jwks["keys"][0]["kid"]}
+        sub = f"auth0|{code}"
+        id_token = jwt.encode({"sub": sub, "email": f"{code}@bench.example.com", "aud": form.get("client_id"),
+                               "iss": issuer, "iat": now, "exp": now + 3600, "nonce": uuid.uuid4().hex},
+                              private_pem, algorithm="RS256", headers=headers)
+        access_token = jwt.encode({"sub": sub, "aud": audience, "iss": issuer, "iat": now, "exp": now + 3600},
+                                  private_pem, algorithm="RS256", headers=headers)
+        return {"access_token": access_token, "id_token": id_token, "token_type": "Bearer", "expires_in": 3600}
+
+    @app.get("/stats")
+    async def stats():
+        return {"jwks_fetches": app.state.jwks_fetches, "token_requests": app.state.token_requests}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Auth0 JWKS server")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--jwks-file", required=True)
+    parser.add_argument("--key-file", default=None, help="Private key PEM; enables /oauth/token")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    with open(args.jwks_file) as f:
+        jwks_doc = json.load(f)
+    pem = None
+    if args.key_file:
+        with open(args.key_file) as f:
+            pem = f.read()
+    uvicorn.run(create_app(jwks_doc, args.latency_ms, pem), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,177 @@
+# benchmarks/fake_plaid.py
+# Minimal local stand-in for the Plaid endpoints the backend calls, with configurable latency.
+# Run standalone with `python -m benchmarks.fake_plaid --port 8100 --latency-ms 300`.
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from jose import jwt
+
+
+def _b64url(n: int) -> str:
+    return base64.urlsafe_b64encode(n.to_bytes(32, "big")).rstrip(b"=").decode()
+
+
+def make_transaction(rng: random.Random, account_id: str, day: date) -> Dict[str, Any]:
+    """One Plaid-shaped transaction with the same field set as app/db/custom_gig_user.json."""
+    merchant = rng.choice(["Uber", "DoorDash", "Shell", "Starbucks", "Costco", "Spotify"])
+    return {
+        "account_id": account_id,
+        "account_owner": None,
+        "amount": round(rng.uniform(-400, 250), 2),
+        "authorized_date": day.isoformat(),
+        "authorized_datetime": None,
+        "category": ["Food and Drink", "Restaurants"],
+        "category_id": "13005000",
+        "check_number": None,
+        "counterparties": [],
+        "date": day.isoformat(),
+        "datetime": None,
+        "iso_currency_code": "USD",
+        "location": {"address": None, "city": None, "region": None, "postal_code": None,
+                     "country": None, "lat": None, "lon": None, "store_number": None},
+        "logo_url": None,
+        "merchant_entity_id": None,
+        "merchant_name": merchant,
+        "name": f"{merchant} purchase",
+        "payment_channel": "in store",
+        "payment_meta": {"by_order_of": None, "payee": None, "payer": None, "payment_method": None,
+                         "payment_processor": None, "ppd_id": None, "reason": None, "reference_number": None},
+        "pending": False,
+        "pending_transaction_id": None,
+        "personal_finance_category": {"primary": "FOOD_AND_DRINK", "detailed": "FOOD_AND_DRINK_RESTAURANT",
+                                      "confidence_level": "HIGH"},
+        "transaction_code": None,
+        "transaction_id": uuid.UUID(int=rng.getrandbits(128)).hex,
+        "transaction_type": "place",
+        "unofficial_currency_code": None,
+    }
+
+
+def create_app(latency_ms: float = 0.0, transactions_per_item: int = 100) -> FastAPI:
+    """Builds the fake Plaid app. `app.state.latency_ms` can be changed while it runs."""
+    app = FastAPI(title="Fake Plaid")
+    app.state.latency_ms = latency_ms
+    app.state.transactions_per_item = transactions_per_item
+    app.state.calls = {}
+    app.state.appended = {} # access_token -> transactions added after the initial history
+
+    # Webhook signing key, served like Plaid's /webhook_verification_key/get
+    signing_key = ec.generate_private_key(ec.SECP256R1())
+    signing_pem = signing_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                            serialization.NoEncryption())
+    public_numbers = signing_key.public_key().public_numbers()
+    key_id = uuid.uuid4().hex
+    public_jwk = {"alg": "ES256", "kty": "EC", "crv": "P-256", "kid": key_id, "use": "sig",
+                  "x": _b64url(public_numbers.x), "y": _b64url(public_numbers.y),
+                  "created_at": int(time.time()), "expired_at": None}
+
+    async def respond(request: Request, path: str) -> None:
+        app.state.calls[path] = app.state.calls.get(path, 0) + 1
+        if app.state.latency_ms:
+            await asyncio.sleep(app.state.latency_ms / 1000.0)
+
+    def history(access_token: str) -> List[Dict[str, Any]]:
+        rng = random.Random(access_token)
+        account_id = f"acc_{access_token[-12:]}"
+        today = date.today()
+        count = app.state.transactions_per_item
+        return [make_transaction(rng, account_id, today - timedelta(days=i * 365 // max(count, 1)))
+                for i in range(count)] + app.state.appended.get(access_token, [])
+
+    @app.post("/link/token/create")
+    async def link_token_create(request: Request):
+        await respond(request, "/link/token/create")
+        return {"link_token": f"link-sandbox-{uuid.uuid4()}", "request_id": uuid.uuid4().hex}
+
+    @app.post("/sandbox/public_token/create")
+    async def sandbox_public_token_create(request: Request):
+        await respond(request, "/sandbox/public_token/create")
+        return {"public_token": f"public-sandbox-{uuid.uuid4()}", "request_id": uuid.uuid4().hex}
+
+    @app.post("/item/public_token/exchange")
+    async def item_public_token_exchange(request: Request):
+        await respond(request, "/item/public_token/exchange")
+        body = await request.json()
+        suffix = body["public_token"].rsplit("-", 1)[-1]
+        return {"access_token": f"access-sandbox-{suffix}", "item_id": f"item-{suffix}",
+                "request_id": uuid.uuid4().hex}
+
+    @app.post("/transactions/get")
+    async def transactions_get(request: Request):
+        await respond(request, "/transactions/get")
+        body = await request.json()
+        start, end = body["start_date"], body["end_date"]
+        txs = [t for t in history(body["access_token"]) if start <= t["date"] <= end]
+        count = body.get("options", {}).get("count", 100)
+        offset = body.get("options", {}).get("offset", 0)
+        return {"transactions": txs[offset:offset + count], "total_transactions": len(txs),
+                "accounts": [], "request_id": uuid.uuid4().hex}
+
+    @app.post("/transactions/sync")
+    async def transactions_sync(request: Request):
+        # Cursor is the offset into the item's (static) history, so a fresh cursor replays everything
+        await respond(request, "/transactions/sync")
+        body = await request.json()
+        txs = history(body["access_token"])
+        offset = int(body.get("cursor") or 0)
+        count = min(int(body.get("count", 100)), 500)
+        page = txs[offset:offset + count]
+        next_offset = offset + len(page)
+        return {"added": page, "modified": [], "removed": [], "next_cursor": str(next_offset),
+                "has_more": next_offset < len(txs), "accounts": [], "request_id": uuid.uuid4().hex}
+
+    @app.post("/webhook_verification_key/get")
+    async def webhook_verification_key_get(request: Request):
+        await respond(request, "/webhook_verification_key/get")
+        body = await request.json()
+        if body.get("key_id") != key_id:
+            return JSONResponse(status_code=400, content={"error_code": "INVALID_WEBHOOK_VERIFICATION_KEY_ID"})
+        return {"key": public_jwk, "request_id": uuid.uuid4().hex}
+
+    @app.post("/__bench/append")
+    async def append_transactions(request: Request):
+        """
+        Simulates new activity: adds `count` transactions dated today to an item's history. With an
+        `item_id`, also returns the SYNC_UPDATES_AVAILABLE webhook Plaid would send for it: the exact
+        body and its signed Plaid-Verification header.
+        """
+        body = await request.json()
+        access_token = body["access_token"]
+        appended = app.state.appended.setdefault(access_token, [])
+        rng = random.Random(f"{access_token}-{len(appended)}")
+        new = [make_transaction(rng, f"acc_{access_token[-12:]}", date.today()) for _ in range(body.get("count", 1))]
+        appended.extend(new)
+        response: Dict[str, Any] = {"transaction_ids": [t["transaction_id"] for t in new]}
+        if body.get("item_id"):
+            webhook = json.dumps({"webhook_type": "TRANSACTIONS", "webhook_code": "SYNC_UPDATES_AVAILABLE",
+                                  "item_id": body["item_id"]})
+            claims = {"iat": int(time.time()), "request_body_sha256": hashlib.sha256(webhook.encode()).hexdigest()}
+            response["webhook"] = {"body": webhook, "plaid_verification": jwt.encode(
+                claims, signing_pem, algorithm="ES256", headers={"kid": key_id})}
+        return response
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--transactions-per-item", type=int, default=100)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.transactions_per_item), host="127.0.0.1", port=args.port)